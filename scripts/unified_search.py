@@ -1,86 +1,488 @@
 #!/usr/bin/env python3
 import argparse
+import atexit
+import collections
+import contextlib
+import glob
+import importlib.util
+import itertools
 import json
+import os
+import queue
 import subprocess
 import sys
+import threading
+import time
 from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-WORKSPACE = Path('/Users/gudaiping/.openclaw/workspace')
+WORKSPACE = Path(os.environ.get('OPENCLAW_WORKSPACE', '/Users/gudaiping/.openclaw/workspace'))
 SERPER_DIR = WORKSPACE / 'skills' / 'openclaw-serper'
 BRAVE_DIR = WORKSPACE / 'skills' / 'brave-search'
 BING_SCRIPT = WORKSPACE / 'skills' / 'bing-search' / 'scripts' / 'search.py'
 
+PROVIDERS = ('serper', 'brave', 'bing')   # fallback order
+PROVIDER_TIMEOUT = 20.0                   # seconds each provider gets before the next is tried
+RRF_K = 60                                # reciprocal rank fusion damping for --merge
+SNIPPET_CHARS = 300
 
-def run_cmd(cmd, cwd=None):
-    p = subprocess.run(cmd, cwd=cwd, text=True, capture_output=True)
-    return p.returncode, p.stdout.strip(), p.stderr.strip()
+# Query parameters that never change page content
+_TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid', 'ref_src'}
 
+# Providers are loaded once and called in-process (Serper, Bing) or through a
+# long-lived worker (Brave), so repeated queries skip interpreter/node startup.
+_modules = {}
+_modules_lock = threading.Lock()
 
-def run_serper(query: str, mode: str):
-    cmd = ['bash', '-lc', f'. .venv/bin/activate && python scripts/search.py -q {json.dumps(query)} --mode {mode}']
-    code, out, err = run_cmd(cmd, cwd=SERPER_DIR)
-    if code != 0:
-        return False, {'provider': 'serper', 'error': err or out}
-    return True, {'provider': 'serper', 'raw': out}
 
+def load_module(name: str, path: Path):
+    """Import a provider script by path under a unique module name (cached)."""
+    with _modules_lock:
+        if name in _modules:
+            return _modules[name]
+        spec = importlib.util.spec_from_file_location(name, path)
+        if spec is None or spec.loader is None:
+            raise ImportError(f'cannot load {path}')
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            # Keep any import-time output off our stdout, which carries the JSON result
+            with contextlib.redirect_stdout(sys.stderr):
+                spec.loader.exec_module(module)
+        except BaseException as e:
+            # Provider scripts print a JSON hint and sys.exit() when a dependency is missing
+            sys.modules.pop(name, None)
+            raise ImportError(f'cannot load {path}: {e!r}') from None
+        _modules[name] = module
+        return module
 
-def run_brave(query: str, n: int, content: bool):
-    flags = f'-n {n}' + (' --content' if content else '')
-    cmd = ['node', 'search.js', query] + flags.split()
-    code, out, err = run_cmd(cmd, cwd=BRAVE_DIR)
-    if code != 0:
-        return False, {'provider': 'brave', 'error': err or out}
-    return True, {'provider': 'brave', 'raw': out}
 
+def _add_venv(skill_dir: Path):
+    """Make a skill's .venv packages importable (the old path ran `. .venv/bin/activate`)."""
+    for site in glob.glob(str(skill_dir / '.venv' / 'lib' / 'python*' / 'site-packages')):
+        if site not in sys.path:
+            sys.path.append(site)
 
-def run_bing(query: str):
-    cmd = ['python3', str(BING_SCRIPT), query]
-    code, out, err = run_cmd(cmd)
-    if code != 0:
-        return False, {'provider': 'bing', 'error': err or out}
-    return True, {'provider': 'bing', 'raw': out}
+
+# Every provider's output is parsed into the same record:
+#   {title, url, snippet, provider, rank[, content][, date][, source]}
+# rank is 1-based within that provider's answer.
+
+def _result(provider: str, rank: int, title: str, url: str, snippet: str = '',
+            content: str = None, date: str = None, source: str = None) -> dict:
+    out = {'title': (title or '').strip(), 'url': url, 'snippet': (snippet or '').strip(),
+           'provider': provider, 'rank': rank}
+    if content:
+        out['content'] = content
+    if date:
+        out['date'] = date
+    if source:
+        out['source'] = source
+    return out
+
+
+def parse_serper(items: list) -> list:
+    # Enriched items carry page text (or the snippet when extraction failed) in `content`
+    out = []
+    for i, r in enumerate(items, 1):
+        content = r.get('content') or ''
+        snippet = content if len(content) <= SNIPPET_CHARS else content[:SNIPPET_CHARS].rsplit(' ', 1)[0] + '…'
+        out.append(_result('serper', i, r.get('title'), r.get('url'), snippet,
+                           content=content if len(content) > SNIPPET_CHARS else None,
+                           date=r.get('date'), source=r.get('source')))
+    return out
+
+
+def parse_brave(items: list) -> list:
+    out = []
+    for i, r in enumerate(items, 1):
+        content = r.get('content')
+        if content and content.startswith('(') and content.endswith(')'):
+            content = None  # "(HTTP 403)", "(Error: ...)", "(Could not extract content)"
+        out.append(_result('brave', i, r.get('title'), r.get('link'), r.get('snippet'), content=content))
+    return out
+
+
+def parse_bing(items: list) -> list:
+    return [_result('bing', i, r.get('title'), r.get('url'), r.get('snippet')) for i, r in enumerate(items, 1)]
+
+
+def run_serper(query: str, mode: str, cancel: threading.Event = None, deadline: float = None):
+    # `deadline` (time.monotonic()) bounds the search and its page enrichment, so a
+    # cancelled or timed-out call stops working by then instead of running on
+    try:
+        _add_venv(SERPER_DIR)
+        serper = load_module('_unified_serper', SERPER_DIR / 'scripts' / 'search.py')
+        # Importing the module loads the skill's .env into os.environ
+        api_key = os.environ.get('SERPER_API_KEY') or os.environ.get('SERP_API_KEY')
+        if not api_key:
+            return False, {'provider': 'serper', 'error': 'SERPER_API_KEY not set'}
+        meta, enriched = serper.run_search(query, api_key, mode=mode, deadline=deadline)
+        results = []
+        for item in enriched:
+            if cancel is not None and cancel.is_set():
+                enriched.close()  # cancels the page fetches still in flight
+                return False, {'provider': 'serper', 'error': 'cancelled'}
+            results.append(item)
+    except Exception as e:
+        return False, {'provider': 'serper', 'error': str(e)}
+    if meta is None:
+        return False, {'provider': 'serper', 'error': 'no results'}
+    return True, {'provider': 'serper', 'query': meta['query'], 'locale': meta['locale'],
+                  'results': parse_serper(results)}
+
+
+class BraveWorker:
+    """`node search.js --serve` kept alive; one JSON line per request and per response."""
+
+    STDERR_LINES = 20   # tail of the worker's stderr kept for error messages
+
+    def __init__(self, cwd: Path):
+        self.cwd = cwd
+        self._proc = None
+        self._stderr = collections.deque(maxlen=self.STDERR_LINES)
+        self._drainer = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._current = None   # cancel event of the request holding the worker
+
+    def _ensure(self):
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                ['node', 'search.js', '--serve'], cwd=self.cwd, text=True, bufsize=1,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            # Drain stderr so node never blocks on a full pipe; keep the tail for errors
+            tail = self._stderr = collections.deque(maxlen=self.STDERR_LINES)
+            self._drainer = threading.Thread(target=self._drain, args=(self._proc.stderr, tail),
+                                             name='brave-stderr', daemon=True)
+            self._drainer.start()
+        return self._proc
+
+    def _exit_reason(self) -> str:
+        """'brave worker exited', plus what node printed: its Error line, else the last lines."""
+        lines = list(self._stderr)
+        errors = [line.strip() for line in lines if 'Error' in line]
+        detail = errors[0] if errors else ' | '.join(line.strip() for line in lines[-3:])
+        return f'brave worker exited: {detail}' if detail else 'brave worker exited'
+
+    @staticmethod
+    def _drain(stream, tail):
+        for line in stream:
+            if line.strip():
+                tail.append(line.rstrip())
+
+    def search(self, query: str, n: int, content: bool, cancel: threading.Event = None):
+        with self._lock:
+            self._current = cancel
+            try:
+                reply = self._request(query, n, content, cancel)
+            finally:
+                self._current = None
+        if 'error' in reply:
+            raise RuntimeError(reply['error'])
+        return reply['results']
+
+    def _request(self, query: str, n: int, content: bool, cancel: threading.Event = None):
+        # Checked after _current is published, so a kill() racing with this either
+        # is seen here or finds the worker to kill
+        proc = self._ensure()
+        if cancel is not None and cancel.is_set():
+            raise RuntimeError('cancelled')
+        request_id = next(self._ids)
+        try:
+            proc.stdin.write(json.dumps({'id': request_id, 'query': query, 'n': n, 'content': content}) + '\n')
+            proc.stdin.flush()
+            line = proc.stdout.readline()
+            reply = json.loads(line) if line else None
+        except (OSError, ValueError):
+            reply = None
+        if reply is None or reply.get('id') != request_id:
+            # Worker died, was killed, or lost sync: drop it so the next call starts fresh
+            proc.kill()
+            proc.wait()
+            self._proc = None
+            self._drainer.join(timeout=1)   # stderr hits EOF once node is gone
+            if cancel is not None and cancel.is_set():
+                raise RuntimeError('cancelled')
+            raise RuntimeError(self._exit_reason())
+        return reply
+
+    def close(self):
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.stdin.close()
+            try:
+                self._proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+        self._proc = None
+
+    def kill(self, cancel: threading.Event):
+        """
+        Abort the request made with `cancel` from another thread. If it still waits
+        for the worker it gives up without sending; if it is running, the worker is
+        killed and the next search starts a fresh one. Other requests are untouched.
+        """
+        cancel.set()
+        proc = self._proc
+        if self._current is cancel and proc is not None and proc.poll() is None:
+            proc.kill()
+
+
+_brave = BraveWorker(BRAVE_DIR)
+atexit.register(_brave.close)
+
+
+def run_brave(query: str, n: int, content: bool, cancel: threading.Event = None):
+    try:
+        results = _brave.search(query, n, content, cancel)
+    except (OSError, RuntimeError) as e:
+        return False, {'provider': 'brave', 'error': str(e)}
+    if not results:
+        return False, {'provider': 'brave', 'error': 'no results'}
+    return True, {'provider': 'brave', 'results': parse_brave(results)}
+
+
+def run_bing(query: str, n: int = 10, timeout: float = 15):
+    try:
+        bing = load_module('_unified_bing', BING_SCRIPT)
+    except ImportError as e:
+        return False, {'provider': 'bing', 'error': str(e)}
+    proxy = os.environ.get('ALL_PROXY') or os.environ.get('HTTP_PROXY')
+    data = bing.search_bing(query, proxy, num_results=n, timeout=timeout)
+    if data.get('status') != 'success':
+        return False, {'provider': 'bing', 'error': data.get('message', 'unknown error')}
+    if not data['results']:
+        return False, {'provider': 'bing', 'error': 'no results'}
+    return True, {'provider': 'bing', 'results': parse_bing(data['results'])}
+
+
+def _launch(name: str, fn, done: queue.Queue):
+    """Run one provider on a daemon thread; (name, ok, data, seconds) lands on `done`."""
+    started = time.monotonic()
+
+    def run():
+        try:
+            ok, data = fn()
+        except Exception as e:
+            ok, data = False, {'provider': name, 'error': str(e)}
+        done.put((name, ok, data, time.monotonic() - started))
+
+    threading.Thread(target=run, name=f'unified-{name}', daemon=True).start()
+    return started
+
+
+def _provider_calls(query: str, args):
+    """Zero-argument callables per provider, plus a function that cancels one in flight."""
+    cancels = {name: threading.Event() for name in PROVIDERS}
+    calls = {
+        # Serper wraps up at 90% of its timeout so snippet-only results still arrive in time
+        'serper': lambda: run_serper(query, args.mode, cancels['serper'], time.monotonic() + 0.9 * args.timeout),
+        'brave': lambda: run_brave(query, args.n, args.content, cancels['brave']),
+        'bing': lambda: run_bing(query, args.n, timeout=args.timeout),
+    }
+
+    def cancel(name):
+        cancels[name].set()
+        if name == 'brave':
+            _brave.kill(cancels['brave'])
+
+    return calls, cancel
+
+
+def run_chain(query: str, args, order=PROVIDERS):
+    """
+    Try providers in `order` until one succeeds, each under its own deadline.
+
+    Sequential by default: the next provider starts when the previous one fails
+    or times out. With --race, providers also start every --stagger seconds
+    (0 = all at once) while earlier ones are still running; the first success
+    wins and the rest are cancelled. Every answer carries per-provider latency.
+    """
+    calls, cancel = _provider_calls(query, args)
+    done = queue.Queue()
+    pending = list(order)
+    running = {}   # name -> start time
+    latency = {}
+    errors = []
+    last_launch = 0.0
+    while pending or running:
+        now = time.monotonic()
+        if pending and (not running or (args.race and now - last_launch >= args.stagger)):
+            name = pending.pop(0)
+            running[name] = last_launch = _launch(name, calls[name], done)
+            continue
+
+        wake = min(start + args.timeout for start in running.values())
+        if args.race and pending:
+            wake = min(wake, last_launch + args.stagger)
+        try:
+            name, ok, data, elapsed = done.get(timeout=max(0.0, wake - now))
+        except queue.Empty:
+            now = time.monotonic()
+            for name, start in list(running.items()):
+                if now - start >= args.timeout:
+                    del running[name]
+                    cancel(name)
+                    latency[name] = {'status': 'timeout', 'ms': round((now - start) * 1000)}
+                    errors.append({'provider': name, 'error': f'timed out after {args.timeout:g}s'})
+            continue
+
+        if name not in running:
+            continue  # late answer from a provider that already timed out
+        del running[name]
+        latency[name] = {'status': 'ok' if ok else 'error', 'ms': round(elapsed * 1000)}
+        if ok:
+            now = time.monotonic()
+            for other, start in running.items():
+                cancel(other)
+                latency[other] = {'status': 'cancelled', 'ms': round((now - start) * 1000)}
+            data['latency'] = {p: latency.get(p, {'status': 'skipped'}) for p in order}
+            return True, data
+        errors.append(data)
+
+    return False, {'error': 'all providers failed', 'details': errors,
+                   'latency': {p: latency.get(p, {'status': 'skipped'}) for p in order}}
+
+
+def canonical_url(url: str) -> str:
+    """Dedup key for a URL: scheme, www., fragment, tracking params and trailing slash don't matter."""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f'{host}:{parts.port}'
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in _TRACKING_PARAMS and not k.lower().startswith('utm_')
+    )
+    return urlunsplit(('', host, parts.path.rstrip('/') or '/', urlencode(query), ''))
+
+
+def fuse_results(answers: dict) -> list:
+    """
+    Merge per-provider result lists by reciprocal rank fusion.
+
+    A result scores sum(1 / (RRF_K + rank)) over the providers that returned it,
+    so agreement between providers outranks a single high placement. Duplicates
+    (same canonical URL) are folded into the first copy in PROVIDERS order, which
+    picks up any snippet/content/date the others have.
+    """
+    merged = {}
+    for provider in PROVIDERS:
+        for item in answers.get(provider, ()):
+            key = canonical_url(item['url']) if item.get('url') else ('title', item['title'].lower())
+            entry = merged.get(key)
+            if entry is None:
+                entry = merged[key] = {k: v for k, v in item.items() if k not in ('provider', 'rank')}
+                entry['providers'] = []
+                entry['score'] = 0.0
+            else:
+                for field in ('snippet', 'content', 'date'):
+                    if item.get(field) and not entry.get(field):
+                        entry[field] = item[field]
+            entry['providers'].append({'provider': provider, 'rank': item['rank']})
+            entry['score'] += 1.0 / (RRF_K + item['rank'])
+
+    fused = sorted(merged.values(), key=lambda e: -e['score'])  # stable: ties keep provider order
+    for entry in fused:
+        entry['score'] = round(entry['score'], 5)
+    return fused
+
+
+def run_merge(query: str, args):
+    """Query every provider at once, wait up to --timeout, and fuse whatever answered."""
+    calls, cancel = _provider_calls(query, args)
+    done = queue.Queue()
+    running = {name: _launch(name, calls[name], done) for name in PROVIDERS}
+    deadline = min(running.values()) + args.timeout
+    answers = {}
+    latency = {}
+    errors = []
+    while running:
+        try:
+            name, ok, data, elapsed = done.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            break
+        del running[name]
+        latency[name] = {'status': 'ok' if ok else 'error', 'ms': round(elapsed * 1000)}
+        if ok:
+            answers[name] = data['results']
+        else:
+            errors.append(data)
+
+    now = time.monotonic()
+    for name, start in running.items():
+        cancel(name)
+        latency[name] = {'status': 'timeout', 'ms': round((now - start) * 1000)}
+        errors.append({'provider': name, 'error': f'timed out after {args.timeout:g}s'})
+
+    data = {'provider': 'merge', 'mode': args.mode, 'providers': [p for p in PROVIDERS if p in answers],
+            'results': fuse_results(answers), 'latency': {p: latency[p] for p in PROVIDERS}}
+    if errors:
+        data['details'] = errors
+    if not answers:
+        data['error'] = 'all providers failed'
+    return bool(answers), data
+
+
+def run_query(query: str, args):
+    if args.merge:
+        return run_merge(query, args)
+    if args.provider != 'auto':
+        ok, data = run_chain(query, args, order=(args.provider,))
+        if not ok and len(data['details']) == 1:
+            data = {**data['details'][0], 'latency': data['latency']}
+        return ok, data
+
+    ok, data = run_chain(query, args)
+    if ok:
+        data['mode'] = args.mode
+    return ok, data
 
 
 def main():
     ap = argparse.ArgumentParser(description='Unified search entry for serper/brave/bing')
-    ap.add_argument('-q', '--query', required=True)
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument('-q', '--query')
+    src.add_argument('--batch', metavar='FILE',
+                     help="Queries one per line ('-' for stdin); prints one JSON object per line, "
+                          'reusing loaded providers and the Brave worker')
     ap.add_argument('--mode', choices=['default', 'current'], default='default')
     ap.add_argument('--provider', choices=['auto', 'serper', 'brave', 'bing'], default='auto')
     ap.add_argument('-n', type=int, default=5)
     ap.add_argument('--content', action='store_true', help='Brave only: include page content')
+    ap.add_argument('--timeout', type=float, default=PROVIDER_TIMEOUT,
+                    help=f'Seconds each provider gets before it is abandoned (default: {PROVIDER_TIMEOUT:g})')
+    strategy = ap.add_mutually_exclusive_group()
+    strategy.add_argument('--race', action='store_true',
+                          help='Auto mode: start providers concurrently/staggered; first success wins, the rest are cancelled')
+    strategy.add_argument('--merge', action='store_true',
+                          help='Query all providers in parallel and merge: dedup by canonical URL, rank fusion')
+    ap.add_argument('--stagger', type=float, default=0.0,
+                    help='Race mode: seconds between provider launches (default: 0 = all at once)')
     args = ap.parse_args()
+    if args.merge and args.provider != 'auto':
+        ap.error('--merge queries every provider; it cannot be combined with --provider')
 
-    if args.provider == 'serper':
-        ok, data = run_serper(args.query, args.mode)
-        print(json.dumps(data, ensure_ascii=False, indent=2))
-        sys.exit(0 if ok else 1)
-
-    if args.provider == 'brave':
-        ok, data = run_brave(args.query, args.n, args.content)
+    if args.query is not None:
+        ok, data = run_query(args.query, args)
         print(json.dumps(data, ensure_ascii=False, indent=2))
         sys.exit(0 if ok else 1)
 
-    if args.provider == 'bing':
-        ok, data = run_bing(args.query)
-        print(json.dumps(data, ensure_ascii=False, indent=2))
-        sys.exit(0 if ok else 1)
-
-    # auto fallback chain
-    chain = [('serper', lambda: run_serper(args.query, args.mode)),
-             ('brave', lambda: run_brave(args.query, args.n, args.content)),
-             ('bing', lambda: run_bing(args.query))]
-
-    errors = []
-    for name, fn in chain:
-        ok, data = fn()
-        if ok:
-            data['mode'] = args.mode
-            print(json.dumps(data, ensure_ascii=False, indent=2))
-            return
-        errors.append(data)
-
-    print(json.dumps({'error': 'all providers failed', 'details': errors}, ensure_ascii=False, indent=2))
-    sys.exit(1)
+    # Batch mode is what makes in-process providers pay off: a one-shot run still
+    # imports every provider and starts node, a batch does that once for all queries
+    stream = sys.stdin if args.batch == '-' else open(args.batch, encoding='utf-8')
+    failed = 0
+    with stream:
+        for line in stream:
+            query = line.strip()
+            if not query:
+                continue
+            ok, data = run_query(query, args)
+            failed += not ok
+            print(json.dumps({'query': query, **data}, ensure_ascii=False), flush=True)
+    sys.exit(1 if failed else 0)
 
 
 if __name__ == '__main__':
@@ -1,8 +1,103 @@
 #!/usr/bin/env python3
 """Bing Search Skill"""
-import sys, os, re, json, urllib.request, urllib.parse, ssl
+import sys, os, json, base64, codecs, urllib.request, urllib.parse, ssl
+from html.parser import HTMLParser
 
-def search_bing(query, proxy=None, num_results=10):
+CHUNK_SIZE = 16 * 1024
+
+
+def _real_url(href):
+    """Unwrap Bing click-tracking links (/ck/a?...&u=a1<base64>) to the target URL."""
+    parts = urllib.parse.urlsplit(href)
+    if parts.netloc.endswith("bing.com") and parts.path.startswith("/ck/"):
+        u = urllib.parse.parse_qs(parts.query).get("u", [""])[0]
+        if u.startswith("a1"):
+            try:
+                return base64.urlsafe_b64decode(u[2:] + "=" * (-len(u[2:]) % 4)).decode("utf-8")
+            except Exception:
+                return None
+        return None
+    return href
+
+
+class BingResultParser(HTMLParser):
+    """Incremental parser for organic results (<li class="b_algo">); feed chunks until done."""
+
+    def __init__(self, num_results):
+        super().__init__(convert_charrefs=True)
+        self.num_results = num_results
+        self.results = []
+        self.seen = set()
+        self.done = False
+        self._item = None      # result being built
+        self._li_depth = 0     # <li> nesting inside the current b_algo
+        self._in_h2 = False
+        self._in_title = False
+        self._in_snippet = False
+        self._in_label = False  # "WEB" slug label Bing puts in front of snippets
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == "li":
+            if self._item is not None:
+                self._li_depth += 1
+            elif "b_algo" in (dict(attrs).get("class") or "").split():
+                self._item = {"title": "", "url": None, "snippet": ""}
+                self._li_depth = 1
+            return
+        if self._item is None:
+            return
+        if tag == "h2":
+            self._in_h2 = True
+        elif tag == "a" and self._in_h2 and self._item["url"] is None:
+            href = dict(attrs).get("href") or ""
+            if href.startswith("http"):
+                self._item["url"] = _real_url(href)
+                self._in_title = True
+        elif tag == "p" and not self._item["snippet"]:
+            self._in_snippet = True
+        elif tag == "span" and self._in_snippet and "algoSlug_icon" in (dict(attrs).get("class") or ""):
+            self._in_label = True
+
+    def handle_endtag(self, tag):
+        if self._item is None:
+            return
+        if tag == "a":
+            self._in_title = False
+        elif tag == "h2":
+            self._in_h2 = self._in_title = False
+        elif tag == "p":
+            self._in_snippet = False
+        elif tag == "span":
+            self._in_label = False
+        elif tag == "li":
+            self._li_depth -= 1
+            if self._li_depth == 0:
+                self._finish()
+
+    def handle_data(self, data):
+        if self._item is None:
+            return
+        if self._in_title:
+            self._item["title"] += data
+        elif self._in_snippet and not self._in_label:
+            self._item["snippet"] += data
+
+    def _finish(self):
+        item, self._item = self._item, None
+        self._in_h2 = self._in_title = self._in_snippet = self._in_label = False
+        url = item["url"]
+        if not url or url in self.seen:
+            return
+        self.seen.add(url)
+        self.results.append({"title": " ".join(item["title"].split()), "url": url,
+                             "snippet": " ".join(item["snippet"].split())})
+        if len(self.results) >= self.num_results:
+            self.done = True
+
+
+def search_bing(query, proxy=None, num_results=10, timeout=15):
     url = f"https://www.bing.com/search?q={urllib.parse.quote(query)}"
     req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
     proxy_handler = urllib.request.ProxyHandler({"http": proxy, "https": proxy}) if proxy else None
@@ -11,17 +106,18 @@ def search_bing(query, proxy=None, num_results=10):
     ctx.verify_mode = ssl.CERT_NONE
     opener = urllib.request.build_opener(proxy_handler or urllib.request.ProxyHandler(), urllib.request.HTTPSHandler(context=ctx))
     try:
-        with opener.open(req, timeout=15) as resp:
-            html = resp.read().decode("utf-8", errors="ignore")
-        links = re.findall(r'href="(https://[^"]*)"', html)
-        results = []
-        seen = set()
-        for link in links:
-            if any(x in link for x in ['bing.com', 'microsoft.com', 'r.bing.com']): continue
-            if link not in seen and link.startswith('http'):
-                seen.add(link); results.append(link)
-                if len(results) >= num_results: break
-        return {"status": "success", "results": results}
+        parser = BingResultParser(num_results)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        with opener.open(req, timeout=timeout) as resp:
+            # Parse as the page streams in and stop reading once enough results are found
+            while not parser.done:
+                chunk = resp.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                parser.feed(decoder.decode(chunk))
+        if not parser.done:
+            parser.close()
+        return {"status": "success", "results": parser.results}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
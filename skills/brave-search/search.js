@@ -7,6 +7,12 @@ import { gfm } from "turndown-plugin-gfm";
 
 const args = process.argv.slice(2);
 
+// --serve: stay resident and answer JSON-line requests on stdin, one per line:
+//   {"id": 1, "query": "...", "n": 5, "content": false}  ->  {"id": 1, "results": [...]} | {"id": 1, "error": "..."}
+const serveIndex = args.indexOf("--serve");
+const serveMode = serveIndex !== -1;
+if (serveMode) args.splice(serveIndex, 1);
+
 const contentIndex = args.indexOf("--content");
 const fetchContent = contentIndex !== -1;
 if (fetchContent) args.splice(contentIndex, 1);
@@ -20,11 +26,13 @@ if (nIndex !== -1 && args[nIndex + 1]) {
 
 const query = args.join(" ");
 
-if (!query) {
+if (!query && !serveMode) {
 	console.log("Usage: search.js <query> [-n <num>] [--content]");
+	console.log("       search.js --serve");
 	console.log("\nOptions:");
 	console.log("  -n <num>    Number of results (default: 5)");
 	console.log("  --content   Fetch readable content as markdown");
+	console.log("  --serve     Persistent worker: JSON-line requests on stdin, responses on stdout");
 	console.log("\nExamples:");
 	console.log('  search.js "javascript async await"');
 	console.log('  search.js "rust programming" -n 10');
@@ -147,21 +155,46 @@ async function fetchPageContent(url) {
 	}
 }
 
+async function search(query, numResults, fetchContent) {
+	const results = await fetchBraveResults(query, numResults);
+	if (fetchContent) {
+		for (const result of results) {
+			result.content = await fetchPageContent(result.link);
+		}
+	}
+	return results;
+}
+
+async function serve() {
+	const { createInterface } = await import("node:readline");
+	const rl = createInterface({ input: process.stdin, crlfDelay: Infinity });
+	for await (const line of rl) {
+		if (!line.trim()) continue;
+		let request = {};
+		try {
+			request = JSON.parse(line);
+			const results = await search(request.query, request.n || 5, Boolean(request.content));
+			process.stdout.write(JSON.stringify({ id: request.id, results }) + "\n");
+		} catch (e) {
+			process.stdout.write(JSON.stringify({ id: request.id, error: e.message }) + "\n");
+		}
+	}
+}
+
 // Main
+if (serveMode) {
+	await serve();
+	process.exit(0);
+}
+
 try {
-	const results = await fetchBraveResults(query, numResults);
+	const results = await search(query, numResults, fetchContent);
 	
 	if (results.length === 0) {
 		console.error("No results found.");
 		process.exit(0);
 	}
 	
-	if (fetchContent) {
-		for (const result of results) {
-			result.content = await fetchPageContent(result.link);
-		}
-	}
-	
 	for (let i = 0; i < results.length; i++) {
 		const r = results[i];
 		console.log(`--- Result ${i + 1} ---`);
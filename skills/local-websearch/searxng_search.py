@@ -4,59 +4,160 @@ SearXNG Search for Moltbot
 Privacy-respecting metasearch via self-hosted SearXNG.
 
 Environment:
-    SEARXNG_URL  Base URL of SearXNG instance (required)
+    SEARXNG_URL          Base URL of SearXNG instance (required). Several
+                         instances may be given, comma-separated; they are
+                         queried as one pool.
+    SEARXNG_HEALTH_FILE  Where per-instance latency/health is kept
+                         (default: ~/.cache/searxng_search/health.json)
 
 Examples:
     python3 searxng_search.py "python tutorial"
     python3 searxng_search.py "rust vs go" --count 10
     python3 searxng_search.py "berlin restaurants" --lang de
+    SEARXNG_URL=http://sx1:8888,http://sx2:8888 python3 searxng_search.py "query" --strategy hedged
 """
 
 import argparse
 import json
+import math
 import os
+import queue
 import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import urllib.error
 import urllib.parse
 import urllib.request
 
-__version__ = "1.0.0"
+__version__ = "1.1.0"
 
+HEALTH_FILE = os.environ.get(
+    "SEARXNG_HEALTH_FILE",
+    os.path.join(os.path.expanduser("~"), ".cache", "searxng_search", "health.json"),
+)
+COOLDOWN_STEPS = [30, 60, 120, 300]  # seconds, by consecutive failures
+LATENCY_ALPHA = 0.3                  # weight of the newest sample in the latency average
+MAX_COUNT = 100
+PAGE_SIZE = 10                       # typical results per SearXNG page, used to plan pagination
+MAX_PAGES = 10
+MAX_PAGE_WORKERS = 5                 # pages requested at once
 
-def get_base_url() -> str:
-    """Get and validate SEARXNG_URL from environment."""
-    url = os.environ.get("SEARXNG_URL", "").strip()
-    if not url:
-        return ""
+_HEALTH_LOCK = threading.Lock()
+
+
+class SearxngError(Exception):
+    """Raised when a single SearXNG instance cannot answer."""
+
+
+def _normalize_base_url(url: str) -> str:
     # Normalize: remove trailing slash, ensure no /search suffix for base
-    url = url.rstrip("/")
+    url = url.strip().rstrip("/")
     if url.endswith("/search"):
         url = url[:-7]
     return url
 
 
-def search(query: str, count: int = 5, lang: str = None) -> dict:
+def get_base_urls() -> list:
+    """Get SEARXNG_URL from environment as a list of instance base URLs."""
+    raw = os.environ.get("SEARXNG_URL", "")
+    urls = []
+    for part in raw.replace(" ", ",").split(","):
+        url = _normalize_base_url(part)
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def get_base_url() -> str:
+    """Get and validate SEARXNG_URL from environment (first instance of the pool)."""
+    urls = get_base_urls()
+    return urls[0] if urls else ""
+
+
+# ---------------------------------------------------------------------------
+# Instance health
+# ---------------------------------------------------------------------------
+
+def load_health() -> dict:
+    try:
+        with open(HEALTH_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_health(health: dict) -> None:
+    try:
+        os.makedirs(os.path.dirname(HEALTH_FILE), exist_ok=True)
+        tmp = f"{HEALTH_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(health, f, indent=2)
+        os.replace(tmp, HEALTH_FILE)
+    except OSError:
+        pass  # health tracking is best-effort
+
+
+def record_outcome(health: dict, base_url: str, ok: bool, latency_ms: float, error: str = None,
+                   answered: bool = True) -> None:
     """
-    Query SearXNG and return structured results.
-    
-    Args:
-        query: Search terms
-        count: Max results (1-20)
-        lang: Language code (optional)
-    
-    Returns:
-        Dict with query, count, and results array
+    Fold one request into an instance's latency average, counters and cooldown.
+
+    A request the pool stopped waiting for (answered=False) counts its elapsed
+    time as a latency sample, so slow instances drift down the order.
     """
-    base_url = get_base_url()
-    if not base_url:
-        return {
-            "error": "SEARXNG_URL not set",
-            "hint": "export SEARXNG_URL=http://your-searxng:8888"
-        }
+    with _HEALTH_LOCK:
+        _record_outcome(health, base_url, ok, latency_ms, error, answered)
+
+
+def _record_outcome(health: dict, base_url: str, ok: bool, latency_ms: float, error: str,
+                    answered: bool) -> None:
+    state = health.setdefault(base_url, {"requests": 0, "failures": 0, "consecutive_failures": 0})
+    state["requests"] += 1
+    state["last_used"] = time.time()
+    if ok or not answered:
+        previous = state.get("latency_ms")
+        state["latency_ms"] = round(latency_ms if previous is None
+                                    else LATENCY_ALPHA * latency_ms + (1 - LATENCY_ALPHA) * previous, 1)
+    if not answered:
+        return
+    if ok:
+        state["consecutive_failures"] = 0
+        state.pop("cooldown_until", None)
+        state.pop("last_error", None)
+    else:
+        state["failures"] += 1
+        state["consecutive_failures"] += 1
+        step = COOLDOWN_STEPS[min(state["consecutive_failures"], len(COOLDOWN_STEPS)) - 1]
+        state["cooldown_until"] = time.time() + step
+        state["last_error"] = error
+
 
+def order_instances(urls: list, health: dict) -> list:
+    """Healthy instances fastest first; instances in cooldown go last as a fallback."""
+    now = time.time()
+
+    def key(url):
+        state = health.get(url, {})
+        cooling = state.get("cooldown_until", 0) > now
+        # Unmeasured instances sort first so they get a latency sample
+        return (cooling, state.get("latency_ms", 0.0))
+
+    return sorted(urls, key=key)
+
+
+# ---------------------------------------------------------------------------
+# Querying
+# ---------------------------------------------------------------------------
+
+def _fetch_results(base_url: str, query: str, lang: str = None, timeout: float = 30, pageno: int = 1) -> list:
+    """Query one instance for one page and return its raw result list."""
     params = {"q": query, "format": "json"}
     if lang:
         params["language"] = lang
+    if pageno > 1:
+        params["pageno"] = pageno
 
     url = f"{base_url}/search?{urllib.parse.urlencode(params)}"
     req = urllib.request.Request(url, headers={
@@ -65,53 +166,326 @@ def search(query: str, count: int = 5, lang: str = None) -> dict:
     })
 
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
             data = json.loads(resp.read().decode())
     except urllib.error.HTTPError as e:
-        return {"error": f"HTTP {e.code}: {e.reason}", "query": query}
+        raise SearxngError(f"HTTP {e.code}: {e.reason}")
     except urllib.error.URLError as e:
-        return {"error": f"Connection failed: {e.reason}", "query": query, "url": base_url}
+        raise SearxngError(f"Connection failed: {e.reason}")
     except json.JSONDecodeError:
-        return {"error": "Invalid JSON from SearXNG", "query": query}
+        raise SearxngError("Invalid JSON from SearXNG")
     except Exception as e:
-        return {"error": str(e), "query": query}
-
-    results = [
-        {
-            "title": r.get("title", ""),
-            "url": r.get("url", ""),
-            "description": r.get("content", ""),
-            "engines": r.get("engines", []),
-            "score": r.get("score", 0),
+        raise SearxngError(str(e))
+    return data.get("results", [])
+
+
+def _dedup_key(url: str) -> str:
+    parts = urllib.parse.urlsplit(url)
+    return urllib.parse.urlunsplit((parts.scheme.lower(), parts.netloc.lower(),
+                                    parts.path.rstrip("/") or "/", parts.query, ""))
+
+
+def merge_results(responses: list) -> list:
+    """
+    Merge result lists from several instances by URL.
+
+    Each URL keeps its best score and the union of engines that returned it;
+    URLs are ranked by score, then by engine and instance agreement.
+    """
+    merged = {}
+    for results in responses:
+        for r in results:
+            url = r.get("url", "")
+            if not url:
+                continue
+            key = _dedup_key(url)
+            item = merged.get(key)
+            if item is None:
+                merged[key] = {
+                    "title": r.get("title", ""),
+                    "url": url,
+                    "description": r.get("content", ""),
+                    "engines": list(r.get("engines", [])),
+                    "score": r.get("score", 0),
+                    "_seen": 1,
+                }
+                continue
+            item["_seen"] += 1
+            item["engines"] += [e for e in r.get("engines", []) if e not in item["engines"]]
+            if r.get("score", 0) > item["score"]:
+                item["score"] = r.get("score", 0)
+            if not item["description"] and r.get("content"):
+                item["description"] = r["content"]
+
+    ranked = list(merged.values())
+    if len(responses) > 1:
+        # A single instance's own ordering is kept as-is
+        ranked.sort(key=lambda i: (i["score"], len(i["engines"]), i["_seen"]), reverse=True)
+    for item in ranked:
+        del item["_seen"]
+    return ranked
+
+
+def query_pool(urls: list, query: str, lang: str = None, strategy: str = "all",
+               timeout: float = 30, hedge_delay: float = 1.0, grace: float = 1.0,
+               pageno: int = 1, health: dict = None):
+    """
+    Query a pool of instances for one page of results.
+
+    Strategies:
+        all:    query every instance at once; after the first answer, wait at
+                most `grace` seconds for the rest, then merge what arrived
+        hedged: query the fastest healthy instance; start the next one when
+                it fails or has not answered within `hedge_delay` seconds;
+                the first answer wins
+
+    When `health` is passed it is updated in place and the caller saves it;
+    otherwise it is loaded and saved here.
+
+    Returns:
+        (list of raw result lists, per-instance report list)
+    """
+    owns_health = health is None
+    if owns_health:
+        health = load_health()
+    ordered = order_instances(urls, health)
+    answers = queue.Queue()
+    report = {}
+    launched = {}
+
+    def worker(base_url):
+        started = time.monotonic()
+        try:
+            results = _fetch_results(base_url, query, lang, timeout, pageno)
+            answers.put((base_url, results, None, (time.monotonic() - started) * 1000))
+        except SearxngError as e:
+            answers.put((base_url, None, str(e), (time.monotonic() - started) * 1000))
+
+    def launch(base_url):
+        report[base_url] = {"url": base_url, "ok": None}
+        launched[base_url] = time.monotonic()
+        # Daemon threads: a stalled instance never holds the process open
+        threading.Thread(target=worker, args=(base_url,), daemon=True).start()
+
+    pending = list(ordered)
+    in_flight = 0
+    for _ in range(len(pending) if strategy == "all" else 1):
+        launch(pending.pop(0))
+        in_flight += 1
+
+    responses = []
+    overall = time.monotonic() + timeout
+    settle_by = None
+    while in_flight:
+        now = time.monotonic()
+        wait_until = min(overall, settle_by) if settle_by else overall
+        if strategy == "hedged" and pending:
+            wait_until = min(wait_until, now + hedge_delay)
+        try:
+            base_url, results, error, latency_ms = answers.get(timeout=max(0.0, wait_until - now))
+        except queue.Empty:
+            if strategy == "hedged" and pending and time.monotonic() < overall:
+                launch(pending.pop(0))
+                in_flight += 1
+                continue
+            break
+
+        in_flight -= 1
+        record_outcome(health, base_url, error is None, latency_ms, error)
+        report[base_url].update(ok=error is None, latency_ms=round(latency_ms, 1))
+        if error is not None:
+            report[base_url]["error"] = error
+            if strategy == "hedged" and pending:
+                launch(pending.pop(0))
+                in_flight += 1
+            continue
+
+        report[base_url]["results"] = len(results)
+        responses.append(results)
+        if strategy == "hedged":
+            break
+        if settle_by is None:
+            settle_by = time.monotonic() + grace
+
+    for base_url, entry in report.items():
+        if entry["ok"] is None:
+            waited_ms = (time.monotonic() - launched[base_url]) * 1000
+            record_outcome(health, base_url, False, waited_ms, answered=False)
+            entry.update(ok=False, error="no answer before the pool moved on")
+    if owns_health:
+        save_health(health)
+    return responses, [report[u] for u in ordered if u in report]
+
+
+def _combine_reports(page_reports: list) -> list:
+    """Fold per-page instance reports into one entry per instance."""
+    combined = {}
+    for report in page_reports:
+        for entry in report:
+            total = combined.setdefault(entry["url"], {"url": entry["url"], "ok": False, "_latencies": [],
+                                                       "results": 0, "error": None})
+            if entry.get("ok"):
+                total["ok"] = True
+                total["_latencies"].append(entry["latency_ms"])
+                total["results"] += entry.get("results", 0)
+            else:
+                total["error"] = entry.get("error")
+    out = []
+    for total in combined.values():
+        latencies = total.pop("_latencies")
+        entry = {"url": total["url"], "ok": total["ok"]}
+        if latencies:
+            entry["latency_ms"] = round(sum(latencies) / len(latencies), 1)
+            entry["results"] = total["results"]
+        if not total["ok"]:
+            entry["error"] = total["error"]
+        out.append(entry)
+    return out
+
+
+def search(query: str, count: int = 5, lang: str = None, strategy: str = "all",
+           timeout: float = 30, hedge_delay: float = 1.0, grace: float = 1.0,
+           on_result=None) -> dict:
+    """
+    Query SearXNG and return structured results.
+
+    Counts beyond one page are served by requesting further `pageno` pages
+    concurrently; results are deduplicated by URL across pages.
+
+    Args:
+        query: Search terms
+        count: Max results (1-100)
+        lang: Language code (optional)
+        strategy: "all" or "hedged" when several instances are configured
+        timeout: Seconds to wait for an instance
+        hedge_delay: Hedged mode — seconds before trying the next instance
+        grace: All mode — seconds to wait for more instances after the first answer
+        on_result: Called with each new result (plus its "page") as pages arrive,
+                   in page order
+
+    Returns:
+        Dict with query, count, and results array in page order (plus
+        per-instance stats when more than one instance is configured)
+    """
+    urls = get_base_urls()
+    if not urls:
+        return {
+            "error": "SEARXNG_URL not set",
+            "hint": "export SEARXNG_URL=http://your-searxng:8888"
         }
-        for r in data.get("results", [])[:count]
-    ]
 
-    return {"query": query, "count": len(results), "results": results}
+    health = load_health()
+    planned = min(MAX_PAGES, max(1, math.ceil(count / PAGE_SIZE)))
+    collected = []
+    seen = set()
+    arrived = {}      # page → merged results, held until every earlier page is in
+    page_reports = {}
+    next_emit = 1
+    stop_paging = False
+
+    def run_page(pageno):
+        responses, instances = query_pool(urls, query, lang, strategy, timeout, hedge_delay, grace,
+                                          pageno=pageno, health=health)
+        return pageno, responses, instances
+
+    with ThreadPoolExecutor(max_workers=min(planned, MAX_PAGE_WORKERS)) as pool:
+        in_flight = {pool.submit(run_page, pageno) for pageno in range(1, planned + 1)}
+        next_page = planned + 1
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                pageno, responses, instances = future.result()
+                page_reports[pageno] = instances
+                arrived[pageno] = merge_results(responses)
+            # Stream pages in order so dedup and the count cap favour earlier pages
+            while next_emit in arrived:
+                page_results = arrived.pop(next_emit)
+                added = 0
+                for item in page_results:
+                    if len(collected) >= count:
+                        break
+                    key = _dedup_key(item["url"])
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    collected.append(item)
+                    added += 1
+                    if on_result:
+                        on_result(dict(item, page=next_emit))
+                if not added and len(collected) < count:
+                    # Failed, empty or all-duplicate page: paging further won't find more
+                    stop_paging = True
+                next_emit += 1
+            # Pages came back shorter than planned (or overlapped): request the next one
+            if not in_flight and len(collected) < count and not stop_paging and next_page <= MAX_PAGES:
+                in_flight.add(pool.submit(run_page, next_page))
+                next_page += 1
+    save_health(health)
+
+    instances = _combine_reports([page_reports[p] for p in sorted(page_reports)])
+    first_page = page_reports.get(1, [])
+    if not collected and not any(entry.get("ok") for entry in first_page):
+        first = first_page[0] if first_page else {"error": "No instance answered"}
+        error = {"error": first.get("error", "No instance answered"), "query": query}
+        if len(urls) == 1:
+            if first.get("error", "").startswith("Connection failed"):
+                error["url"] = urls[0]
+        else:
+            error["instances"] = instances
+        return error
+
+    output = {"query": query, "count": len(collected), "results": collected}
+    if len(page_reports) > 1:
+        output["pages"] = len(page_reports)
+    if len(urls) > 1:
+        output["instances"] = instances
+    return output
 
 
 def main():
     parser = argparse.ArgumentParser(
         description="Search via SearXNG metasearch",
         formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="Requires SEARXNG_URL environment variable."
+        epilog="Requires SEARXNG_URL environment variable (comma-separate several instances to pool them)."
     )
     parser.add_argument("query", help="Search query")
     parser.add_argument("-n", "--count", type=int, default=5, metavar="N",
-                        help="Number of results (default: 5, max: 20)")
+                        help=f"Number of results (default: 5, max: {MAX_COUNT}; more than a page fetches pages concurrently)")
     parser.add_argument("-l", "--lang", metavar="CODE",
                         help="Language code (en, de, fr, etc.)")
-    parser.add_argument("-v", "--version", action="version", 
+    parser.add_argument("-s", "--strategy", choices=["all", "hedged"], default="all",
+                        help="Instance pool strategy: query all and merge, or hedged (default: all)")
+    parser.add_argument("-t", "--timeout", type=float, default=30, metavar="SEC",
+                        help="Seconds to wait for an instance (default: 30)")
+    parser.add_argument("--hedge-delay", type=float, default=1.0, metavar="SEC",
+                        help="Hedged: seconds before trying the next instance (default: 1.0)")
+    parser.add_argument("--grace", type=float, default=1.0, metavar="SEC",
+                        help="All: seconds to wait for other instances after the first answer (default: 1.0)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Print one JSON line per result as pages arrive, then a summary line")
+    parser.add_argument("-v", "--version", action="version",
                         version=f"%(prog)s {__version__}")
 
     args = parser.parse_args()
-    count = max(1, min(20, args.count))
+    count = max(1, min(MAX_COUNT, args.count))
+
+    def emit(item):
+        print(json.dumps(item, ensure_ascii=False), flush=True)
 
-    result = search(args.query, count=count, lang=args.lang)
-    print(json.dumps(result, indent=2, ensure_ascii=False))
+    result = search(args.query, count=count, lang=args.lang, strategy=args.strategy,
+                    timeout=args.timeout, hedge_delay=args.hedge_delay, grace=args.grace,
+                    on_result=emit if args.stream else None)
+    if args.stream:
+        # Results were already printed; finish with a summary line
+        summary = {k: v for k, v in result.items() if k != "results"}
+        if "error" not in result:
+            summary["done"] = True
+        print(json.dumps(summary, ensure_ascii=False), flush=True)
+    else:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
 
     sys.exit(1 if "error" in result else 0)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
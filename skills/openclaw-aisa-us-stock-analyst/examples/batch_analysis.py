@@ -35,42 +35,41 @@ async def main():
     print(f"\nAnalyzing {len(portfolio)} stocks: {', '.join(portfolio)}")
     print("Using 'quick' mode for speed and cost efficiency\n")
     
-    # Initialize analyst
-    analyst = AIsaStockAnalyst(api_key=api_key)
+    # Initialize analyst (one shared client; at most 6 data requests in flight)
+    analyst = AIsaStockAnalyst(api_key=api_key, verbose=False)
     
     try:
         results = []
         
-        for ticker in portfolio:
-            print(f"Analyzing {ticker}...")
+        # Tickers run concurrently and stream back as each one finishes
+        async for result in analyst.analyze_many(
+            portfolio,
+            depth="quick",  # Quick mode for batch processing
+            models=["gpt-4"],
+            concurrency=3
+        ):
+            ticker = result["ticker"]
             
-            try:
-                report = await analyst.analyze_stock(
-                    ticker=ticker,
-                    depth="quick",  # Quick mode for batch processing
-                    models=["gpt-4"]
-                )
-                
-                # Extract key info
-                summary = {
-                    "ticker": ticker,
-                    "sentiment": report['sentiment_analysis'].get('sentiment', 'N/A'),
-                    "sentiment_confidence": report['sentiment_analysis'].get('confidence', 'N/A'),
-                    "market_cap": report['key_metrics'].get('market_cap'),
-                    "pe_ratio": report['key_metrics'].get('pe_ratio'),
-                    "profit_margin": report['key_metrics'].get('profit_margin'),
-                    "roe": report['key_metrics'].get('roe')
-                }
-                
-                results.append(summary)
-                print(f"  ✓ {ticker} complete")
-                
-            except Exception as e:
-                print(f"  ✗ {ticker} failed: {str(e)}")
-                results.append({
-                    "ticker": ticker,
-                    "error": str(e)
-                })
+            if "error" in result:
+                print(f"  ✗ {ticker} failed: {result['error']}")
+                results.append(result)
+                continue
+            
+            report = result["report"]
+            
+            # Extract key info
+            summary = {
+                "ticker": ticker,
+                "sentiment": report['sentiment_analysis'].get('sentiment', 'N/A'),
+                "sentiment_confidence": report['sentiment_analysis'].get('confidence', 'N/A'),
+                "market_cap": report['key_metrics'].get('market_cap'),
+                "pe_ratio": report['key_metrics'].get('pe_ratio'),
+                "profit_margin": report['key_metrics'].get('profit_margin'),
+                "roe": report['key_metrics'].get('roe')
+            }
+            
+            results.append(summary)
+            print(f"  ✓ {ticker} complete")
         
         # Print summary table
         print("\n" + "="*70)
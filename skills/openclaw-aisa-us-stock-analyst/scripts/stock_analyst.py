@@ -14,32 +14,268 @@ Base URL: https://api.aisa.one/apis/v1
 LLM Base URL: https://api.aisa.one/v1
 """
 
+import argparse
 import asyncio
+import contextlib
+import functools
+import hashlib
 import json
-from typing import Dict, List, Optional, Any
+import os
+import statistics
+import sys
+import time
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
+from pathlib import Path
 import httpx
 
+try:
+    import h2  # noqa: F401  optional: lets httpx multiplex all requests over one HTTP/2 connection
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+MAX_CONCURRENCY = 6      # data-source requests in flight at once, across all analyses
+TICKER_CONCURRENCY = 4   # tickers analyze_many works on at once
+SOURCE_TIMEOUT = 30.0    # seconds a single data source may take
+LLM_TIMEOUT = 60.0       # seconds an analysis waits for its models
+MODEL_STRATEGIES = ("first", "ensemble", "single")
+
+CACHE_DIR = Path(os.environ.get("AISA_CACHE_DIR", Path.home() / ".cache" / "aisa_stock_analyst"))
+CACHE_MAX_BYTES = 128 * 1024 * 1024
+# Seconds a cached response stays valid, per data source (0 = never cached)
+CACHE_TTLS = {
+    "financial_metrics": 15 * 60,
+    "stock_news": 10 * 60,
+    "analyst_estimates": 24 * 3600,
+    "insider_trades": 6 * 3600,
+    "institutional": 24 * 3600,
+    "financial_statements": 24 * 3600,
+    "sec_filings": 6 * 3600,
+    "web_search": 30 * 60,
+    "research": 7 * 24 * 3600,
+    "twitter": 2 * 60,
+    "youtube": 6 * 3600,
+    "llm": 30 * 60,  # model answers, keyed by model + prompt version + input fingerprint
+}
+# Bump when a prompt's wording changes so cached answers to the old prompt stop matching
+PROMPT_VERSIONS = {"summary": 2, "sentiment": 2, "valuation": 2}
+
+# Prompt compaction: metric fields the analyses use (in priority order) and a
+# token budget for each data section of a prompt
+METRIC_FIELDS = (
+    "ticker", "price", "market_cap", "enterprise_value",
+    "pe_ratio", "price_to_earnings_ratio", "peg_ratio", "price_to_book_ratio",
+    "price_to_sales_ratio", "enterprise_value_to_ebitda_ratio",
+    "revenue", "revenue_growth", "eps", "earnings_per_share", "earnings_growth",
+    "gross_margin", "operating_margin", "profit_margin", "net_margin",
+    "roe", "return_on_equity", "return_on_assets", "debt_to_equity",
+    "current_ratio", "free_cash_flow_yield", "dividend_yield",
+)
+PROMPT_SECTION_TOKENS = {
+    "metrics": 350,
+    "news": 300,
+    "web": 450,
+    "analyst": 300,
+    "headlines": 250,
+    "tweets": 600,
+}
+
+
+class ResponseCache:
+    """
+    On-disk cache of API responses, one JSON file per endpoint + params.
+    
+    Entries expire after the TTL of the data source that stored them; the
+    directory is kept under `max_bytes` by evicting least recently used
+    files (mtime is bumped on every hit).
+    """
+    
+    def __init__(
+        self,
+        directory: Path = CACHE_DIR,
+        ttls: Optional[Dict[str, float]] = None,
+        max_bytes: int = CACHE_MAX_BYTES
+    ):
+        self.directory = Path(directory)
+        self.ttls = {**CACHE_TTLS, **(ttls or {})}
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size: Optional[int] = None  # bytes on disk, scanned lazily
+    
+    @staticmethod
+    def key(method: str, url: str, params: Dict) -> str:
+        raw = json.dumps([method.upper(), url, sorted((k, str(v)) for k, v in params.items())])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+    
+    def get(self, source: str, key: str) -> Optional[Any]:
+        """The cached response body, or None when missing, expired or uncacheable."""
+        ttl = self.ttls.get(source, 0)
+        path = self.directory / f"{key}.json"
+        if ttl <= 0:
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if time.time() - entry.get("stored_at", 0) > ttl:
+            self.misses += 1
+            return None
+        os.utime(path)  # LRU bookkeeping
+        self.hits += 1
+        return entry["body"]
+    
+    def put(self, source: str, key: str, body: Any):
+        if self.ttls.get(source, 0) <= 0:
+            return
+        data = json.dumps({"source": source, "stored_at": time.time(), "body": body}).encode("utf-8")
+        path = self.directory / f"{key}.json"
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            try:
+                previous = path.stat().st_size
+            except OSError:
+                previous = 0
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError:
+            return  # caching is best-effort
+        if self._size is None:
+            self._size = sum(p.stat().st_size for p in self.directory.glob("*.json"))
+        else:
+            self._size += len(data) - previous
+        if self._size > self.max_bytes:
+            self._evict()
+    
+    def _evict(self):
+        """Drop least recently used entries until 90% of the size bound."""
+        entries = []
+        for p in self.directory.glob("*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+        size = sum(e[1] for e in entries)
+        for _, entry_size, p in entries:
+            if size <= self.max_bytes * 0.9:
+                break
+            try:
+                p.unlink()
+                size -= entry_size
+            except OSError:
+                pass
+        self._size = size
+    
+    def clear(self) -> int:
+        count = 0
+        for p in self.directory.glob("*.json") if self.directory.exists() else []:
+            try:
+                p.unlink()
+                count += 1
+            except OSError:
+                pass
+        self._size = 0
+        return count
+
+
 class AIsaStockAnalyst:
     """
     Professional stock analyst powered by AIsa's complete API suite.
     """
     
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        max_concurrency: int = MAX_CONCURRENCY,
+        source_timeout: float = SOURCE_TIMEOUT,
+        source_timeouts: Optional[Dict[str, float]] = None,
+        llm_timeout: float = LLM_TIMEOUT,
+        endpoint_limits: Optional[Dict[str, int]] = None,
+        verbose: bool = True,
+        use_cache: bool = True,
+        llm_cache: bool = True,
+        prompt_budgets: Optional[Dict[str, int]] = None,
+        cache_dir: Optional[str] = None,
+        cache_ttls: Optional[Dict[str, float]] = None,
+        cache_max_bytes: int = CACHE_MAX_BYTES
+    ):
+        """
+        Args:
+            api_key: AIsa API key
+            max_concurrency: Cap on data-source requests running at once,
+                shared by every analysis running on this instance
+            source_timeout: Default seconds allowed per data source
+            source_timeouts: Per-source overrides, e.g. {"sec_filings": 60}
+            llm_timeout: Seconds each analysis waits for model responses
+            endpoint_limits: Extra per-endpoint caps keyed by source name
+                (e.g. {"twitter": 2}); "llm" limits chat completions
+            verbose: Print progress while analyzing
+            use_cache: Serve data-source responses from the on-disk cache
+                while they are within their TTL (False bypasses it)
+            llm_cache: Also reuse model answers when a prompt's model, template
+                version and input data match a cached one (needs use_cache)
+            prompt_budgets: Per-section token budget overrides for prompts,
+                e.g. {"tweets": 300}
+            cache_dir: Cache directory (default: $AISA_CACHE_DIR or
+                ~/.cache/aisa_stock_analyst)
+            cache_ttls: Per-source TTL overrides in seconds; 0 disables caching
+                for that source
+            cache_max_bytes: Size bound of the cache directory
+        """
         self.api_key = api_key
+        self.llm_timeout = llm_timeout
+        self.endpoint_limits = endpoint_limits or {}
+        self.verbose = verbose
+        self._global_slots: Optional[asyncio.Semaphore] = None
+        self._endpoint_slots: Dict[str, asyncio.Semaphore] = {}
+        self.max_concurrency = max_concurrency
+        self.source_timeout = source_timeout
+        self.source_timeouts = source_timeouts or {}
+        self.cache = ResponseCache(cache_dir or CACHE_DIR, cache_ttls, cache_max_bytes) if use_cache else None
+        self.llm_cache = llm_cache and self.cache is not None
+        self.prompt_budgets = {**PROMPT_SECTION_TOKENS, **(prompt_budgets or {})}
         self.base_url = "https://api.aisa.one/apis/v1"
         self.llm_base_url = "https://api.aisa.one/v1"
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
-        self.client = httpx.AsyncClient(timeout=90.0)
+        self.client = httpx.AsyncClient(timeout=90.0, http2=HTTP2)
+        # request key -> {"task": shared request, "waiters": callers awaiting it}
+        self._inflight: Dict[str, Dict[str, Any]] = {}
+    
+    def _log(self, message: str = ""):
+        if self.verbose:
+            print(message)
+    
+    @contextlib.asynccontextmanager
+    async def _slot(self, endpoint: str, shared: bool = True):
+        """Hold the endpoint's own slot (if it is limited), then a global one when `shared`."""
+        # Semaphores are created on first use so they bind to the running loop
+        if self._global_slots is None:
+            self._global_slots = asyncio.Semaphore(self.max_concurrency)
+        limit = self.endpoint_limits.get(endpoint)
+        async with contextlib.AsyncExitStack() as stack:
+            if limit:
+                if endpoint not in self._endpoint_slots:
+                    self._endpoint_slots[endpoint] = asyncio.Semaphore(limit)
+                await stack.enter_async_context(self._endpoint_slots[endpoint])
+            if shared:
+                await stack.enter_async_context(self._global_slots)
+            yield
     
     async def analyze_stock(
         self,
         ticker: str,
         depth: str = "standard",
-        models: Optional[List[str]] = None
+        models: Optional[List[str]] = None,
+        model_strategy: str = "first"
     ) -> Dict[str, Any]:
         """
         Main entry point for comprehensive stock analysis.
@@ -48,35 +284,158 @@ class AIsaStockAnalyst:
             ticker: Stock ticker symbol (e.g., "AAPL", "NVDA")
             depth: Analysis depth - "quick", "standard", or "deep"
             models: Optional list of LLM models to use
+            model_strategy: How each prompt uses `models`:
+                "first"    - ask all in parallel, keep the first usable answer
+                "ensemble" - ask all in parallel, combine every answer in time
+                "single"   - ask only models[0]
             
         Returns:
             Complete analysis report
         """
+        return await self._analyze(ticker, depth, models, model_strategy)
+    
+    async def analyze_stock_stream(
+        self,
+        ticker: str,
+        depth: str = "standard",
+        models: Optional[List[str]] = None,
+        model_strategy: str = "first"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run analyze_stock, yielding events as soon as each piece is available.
+        
+        Model replies are streamed from the chat endpoint (SSE), so summary
+        text arrives token by token instead of after the whole completion.
+        
+        Args:
+            As for analyze_stock
+        
+        Yields:
+            Dicts with a "type" key, in arrival order:
+            {"type": "source", "name": ..., "data": {...}}   - a data source landed
+                (data is {"error": ...} when it failed or timed out)
+            {"type": "token", "analysis": ..., "model": ..., "text": ...}
+                - a content delta; with several models, deltas interleave
+            {"type": "analysis", "name": ..., "result": ..., "models": {...}}
+                - an analysis finished ("error" is set when it fell back)
+            {"type": "report", "report": {...}}              - last; the full report
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        run = asyncio.ensure_future(self._analyze(ticker, depth, models, model_strategy, emit=events.put_nowait))
+        run.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            run.result()  # re-raise a failure of the analysis itself
+        finally:
+            run.cancel()
+            await asyncio.gather(run, return_exceptions=True)
+    
+    async def _analyze(
+        self,
+        ticker: str,
+        depth: str,
+        models: Optional[List[str]],
+        model_strategy: str,
+        emit: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """The analyze_stock pipeline; `emit` receives progress events (see analyze_stock_stream)."""
         if models is None:
             models = ["gpt-4", "claude-3-opus"]
+        if model_strategy not in MODEL_STRATEGIES:
+            raise ValueError(f"model_strategy must be one of {MODEL_STRATEGIES}")
         
-        print(f"\n{'='*60}")
-        print(f"🔍 Analyzing {ticker.upper()}")
-        print(f"{'='*60}\n")
+        self._log(f"\n{'='*60}")
+        self._log(f"🔍 Analyzing {ticker.upper()}")
+        self._log(f"{'='*60}\n")
         
         # Step 1: Gather data from all sources
-        print("📊 Gathering data from multiple sources...")
-        data = await self._gather_data(ticker, depth)
+        self._log("📊 Gathering data from multiple sources...")
+        data = await self._gather_data(ticker, depth, emit)
         
         # Step 2: Run AI analysis
-        print("\n🤖 Running AI analysis...")
-        analysis = await self._run_analysis(ticker, data, models)
+        self._log("\n🤖 Running AI analysis...")
+        analysis = await self._run_analysis(ticker, data, models, model_strategy, emit)
         
         # Step 3: Synthesize report
-        print("\n📝 Synthesizing report...")
+        self._log("\n📝 Synthesizing report...")
         report = await self._synthesize_report(ticker, data, analysis)
         
-        print(f"\n✅ Analysis complete!\n")
+        self._log(f"\n✅ Analysis complete!\n")
+        if emit:
+            emit({"type": "report", "report": report})
         
         return report
     
-    async def _gather_data(self, ticker: str, depth: str) -> Dict[str, Any]:
-        """Gather data from all AIsa APIs."""
+    async def analyze_many(
+        self,
+        tickers: Iterable[str],
+        depth: str = "quick",
+        models: Optional[List[str]] = None,
+        model_strategy: str = "first",
+        concurrency: int = TICKER_CONCURRENCY,
+        checkpoint: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Analyze a list of tickers concurrently, yielding each result as it completes.
+        
+        Up to `concurrency` tickers run at once; their requests share this
+        instance's client and its max_concurrency / endpoint_limits caps.
+        
+        Args:
+            tickers: Ticker symbols (duplicates are analyzed once)
+            depth: Analysis depth for every ticker
+            models: LLM models, as for analyze_stock
+            model_strategy: As for analyze_stock
+            concurrency: Tickers in progress at once
+            checkpoint: Optional JSONL file. Every finished ticker is appended
+                to it, and tickers already reported there are skipped, so an
+                interrupted run resumes where it stopped. Failed tickers are
+                retried on the next run.
+        
+        Yields:
+            {"ticker": ..., "report": {...}} or {"ticker": ..., "error": "..."}
+        """
+        pending = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+        done = load_checkpoint(checkpoint) if checkpoint else {}
+        pending = [t for t in pending if "report" not in done.get(t, {})]
+        
+        limit = asyncio.Semaphore(concurrency)
+        
+        async def run(ticker: str) -> Dict[str, Any]:
+            async with limit:
+                try:
+                    report = await self.analyze_stock(ticker, depth, models, model_strategy)
+                    return {"ticker": ticker, "report": report}
+                except Exception as e:
+                    return {"ticker": ticker, "error": str(e)}
+        
+        if checkpoint:
+            _end_partial_line(checkpoint)
+        tasks = [asyncio.ensure_future(run(ticker)) for ticker in pending]
+        try:
+            with open(checkpoint, "a", encoding="utf-8") if checkpoint else contextlib.nullcontext() as log:
+                for next_done in asyncio.as_completed(tasks):
+                    result = await next_done
+                    if log:
+                        log.write(json.dumps(result, default=str) + "\n")
+                        log.flush()
+                    yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _gather_data(
+        self,
+        ticker: str,
+        depth: str,
+        emit: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """Gather data from all AIsa APIs; `emit` gets a "source" event as each one lands."""
         tasks = []
         
         # Core financial data (always fetch)
@@ -98,147 +457,279 @@ class AIsaStockAnalyst:
             tasks.append(("sec_filings", self._get_sec_filings(ticker)))
             tasks.append(("research", self._get_academic_research(ticker)))
         
-        # Execute all API calls concurrently
-        results = {}
-        for name, task in tasks:
+        # Execute all API calls concurrently. Each HTTP request holds its
+        # instance-wide and per-endpoint slot and runs under its source's
+        # timeout (see _request_json). A failed or timed-out source is
+        # recorded as an error; the rest still count.
+        async def fetch(name: str, task) -> Dict:
+            timeout = self.source_timeouts.get(name, self.source_timeout)
+            label = name.replace('_', ' ').title()
             try:
-                results[name] = await task
-                print(f"  ✓ {name.replace('_', ' ').title()}")
+                result = await task
+            except asyncio.TimeoutError:
+                self._log(f"  ✗ {label}: timed out after {timeout:g}s")
+                result = {"error": f"timed out after {timeout:g}s"}
             except Exception as e:
-                print(f"  ✗ {name.replace('_', ' ').title()}: {str(e)}")
-                results[name] = {"error": str(e)}
+                self._log(f"  ✗ {label}: {str(e)}")
+                result = {"error": str(e)}
+            else:
+                self._log(f"  ✓ {label}")
+            finally:
+                task.close()  # no-op once awaited; if this wrapper was cancelled first, it never started
+            if emit:
+                emit({"type": "source", "name": name, "data": result})
+            return result
+        
+        outcomes = await asyncio.gather(
+            *(fetch(name, task) for name, task in tasks),
+            return_exceptions=True
+        )
+        
+        results = {}
+        for (name, _), outcome in zip(tasks, outcomes):
+            if isinstance(outcome, BaseException):
+                outcome = {"error": str(outcome) or type(outcome).__name__}
+            results[name] = outcome
         
         return results
     
+    async def _fetch_json(self, source: str, method: str, path: str, params: Dict) -> Dict:
+        """
+        Call a data endpoint, answering from the response cache while fresh.
+        
+        Identical requests already in flight (same endpoint and params, e.g. the
+        same hot ticker analyzed by concurrent callers) share one HTTP request.
+        It is cancelled, releasing its slot, once every caller waiting on it
+        has given up.
+        """
+        url = f"{self.base_url}{path}"
+        key = ResponseCache.key(method, url, params)
+        if self.cache is not None:
+            cached = self.cache.get(source, key)
+            if cached is not None:
+                return cached
+        
+        entry = self._inflight.get(key)
+        if entry is None:
+            entry = {"task": asyncio.ensure_future(self._request_json(source, method, url, params, key)), "waiters": 0}
+            self._inflight[key] = entry
+            entry["task"].add_done_callback(lambda f: (self._forget_inflight(key, entry), f.cancelled() or f.exception()))
+        entry["waiters"] += 1
+        try:
+            # One caller giving up must not cancel the request for the others
+            return await asyncio.shield(entry["task"])
+        finally:
+            entry["waiters"] -= 1
+            if entry["waiters"] == 0 and not entry["task"].done():
+                entry["task"].cancel()
+                self._forget_inflight(key, entry)
+    
+    def _forget_inflight(self, key: str, entry: Dict[str, Any]):
+        if self._inflight.get(key) is entry:
+            del self._inflight[key]
+    
+    async def _request_json(self, source: str, method: str, url: str, params: Dict, key: str) -> Dict:
+        """The shared HTTP request: holds the source's slot and runs under its timeout."""
+        timeout = self.source_timeouts.get(source, self.source_timeout)
+        async with self._slot(source):
+            response = await asyncio.wait_for(
+                self.client.request(method, url, params=params, headers=self.headers),
+                timeout=timeout
+            )
+        response.raise_for_status()
+        body = response.json()
+        if self.cache is not None:
+            self.cache.put(source, key, body)
+        return body
+    
     # ==================== Financial Data APIs ====================
     
     async def _get_financial_metrics(self, ticker: str) -> Dict:
         """Get comprehensive financial metrics."""
-        response = await self.client.get(
-            f"{self.base_url}/financial/financial-metrics/snapshot",
-            params={"ticker": ticker},
-            headers=self.headers
+        return await self._fetch_json(
+            "financial_metrics", "GET", "/financial/financial-metrics/snapshot",
+            params={"ticker": ticker}
         )
-        response.raise_for_status()
-        return response.json()
     
     async def _get_stock_news(self, ticker: str) -> Dict:
         """Get company news."""
-        response = await self.client.get(
-            f"{self.base_url}/financial/news",
-            params={"ticker": ticker, "limit": 10},
-            headers=self.headers
+        return await self._fetch_json(
+            "stock_news", "GET", "/financial/news",
+            params={"ticker": ticker, "limit": 10}
         )
-        response.raise_for_status()
-        return response.json()
     
     async def _get_analyst_estimates(self, ticker: str) -> Dict:
         """Get analyst EPS estimates."""
-        response = await self.client.get(
-            f"{self.base_url}/financial/analyst/eps",
-            params={"ticker": ticker, "period": "annual"},
-            headers=self.headers
+        return await self._fetch_json(
+            "analyst_estimates", "GET", "/financial/analyst/eps",
+            params={"ticker": ticker, "period": "annual"}
         )
-        response.raise_for_status()
-        return response.json()
     
     async def _get_insider_trades(self, ticker: str) -> Dict:
         """Get insider trading data."""
-        response = await self.client.get(
-            f"{self.base_url}/financial/insider/trades",
-            params={"ticker": ticker},
-            headers=self.headers
+        return await self._fetch_json(
+            "insider_trades", "GET", "/financial/insider/trades",
+            params={"ticker": ticker}
         )
-        response.raise_for_status()
-        return response.json()
     
     async def _get_institutional_ownership(self, ticker: str) -> Dict:
         """Get institutional ownership data."""
-        response = await self.client.get(
-            f"{self.base_url}/financial/institutional/ownership",
-            params={"ticker": ticker},
-            headers=self.headers
+        return await self._fetch_json(
+            "institutional", "GET", "/financial/institutional/ownership",
+            params={"ticker": ticker}
         )
-        response.raise_for_status()
-        return response.json()
     
     async def _get_financial_statements(self, ticker: str) -> Dict:
         """Get all financial statements."""
-        response = await self.client.get(
-            f"{self.base_url}/financial/financial_statements/all",
-            params={"ticker": ticker},
-            headers=self.headers
+        return await self._fetch_json(
+            "financial_statements", "GET", "/financial/financial_statements/all",
+            params={"ticker": ticker}
         )
-        response.raise_for_status()
-        return response.json()
     
     async def _get_sec_filings(self, ticker: str) -> Dict:
         """Get SEC filings."""
-        response = await self.client.get(
-            f"{self.base_url}/financial/sec/filings",
-            params={"ticker": ticker},
-            headers=self.headers
+        return await self._fetch_json(
+            "sec_filings", "GET", "/financial/sec/filings",
+            params={"ticker": ticker}
         )
-        response.raise_for_status()
-        return response.json()
     
     # ==================== News & Search APIs ====================
     
     async def _get_web_search(self, ticker: str) -> Dict:
         """Search web for recent news."""
-        response = await self.client.post(
-            f"{self.base_url}/scholar/search/web",
+        return await self._fetch_json(
+            "web_search", "POST", "/scholar/search/web",
             params={
                 "query": f"{ticker} stock news analysis",
                 "max_num_results": 10
-            },
-            headers=self.headers
+            }
         )
-        response.raise_for_status()
-        return response.json()
     
     async def _get_academic_research(self, ticker: str) -> Dict:
         """Search academic research."""
-        response = await self.client.post(
-            f"{self.base_url}/scholar/search/scholar",
+        return await self._fetch_json(
+            "research", "POST", "/scholar/search/scholar",
             params={
                 "query": f"{ticker} company analysis",
                 "max_num_results": 5
-            },
-            headers=self.headers
+            }
         )
-        response.raise_for_status()
-        return response.json()
     
     # ==================== Social Media APIs ====================
     
     async def _get_twitter_data(self, ticker: str) -> Dict:
         """Get Twitter mentions and sentiment."""
-        response = await self.client.get(
-            f"{self.base_url}/twitter/tweet/advanced_search",
+        return await self._fetch_json(
+            "twitter", "GET", "/twitter/tweet/advanced_search",
             params={
                 "query": f"${ticker} OR {ticker} stock",
                 "queryType": "Latest"
-            },
-            headers=self.headers
+            }
         )
-        response.raise_for_status()
-        return response.json()
     
     async def _get_youtube_content(self, ticker: str) -> Dict:
         """Search YouTube for earnings calls and analysis."""
-        response = await self.client.get(
-            f"{self.base_url}/youtube/search",
+        return await self._fetch_json(
+            "youtube", "GET", "/youtube/search",
             params={
                 "engine": "youtube",
                 "q": f"{ticker} earnings call latest",
                 "gl": "us",
                 "hl": "en"
-            },
-            headers=self.headers
+            }
         )
-        response.raise_for_status()
-        return response.json()
+    
+    # ==================== Prompt Building ====================
+    
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Rough token count (~4 characters per token) without a tokenizer dependency."""
+        return (len(text) + 3) // 4
+    
+    @staticmethod
+    def _scalars(record: Any, fields: Optional[Tuple[str, ...]] = None, max_chars: int = 200) -> Dict:
+        """
+        Project a record onto `fields`, in that order (all of its fields when
+        none of them are present), keeping only non-empty scalars. Floats are
+        rounded to 4 significant digits and long strings are clipped.
+        """
+        if not isinstance(record, dict):
+            return {}
+        keys = [f for f in fields if f in record] if fields else []
+        out = {}
+        for key in keys or list(record):
+            value = record[key]
+            if value is None or value == "" or isinstance(value, (dict, list)):
+                continue
+            if isinstance(value, float):
+                value = float(f"{value:.4g}")
+            elif isinstance(value, str) and len(value) > max_chars:
+                value = value[:max_chars].rsplit(" ", 1)[0] + "…"
+            out[key] = value
+        return out
+    
+    def _section(self, name: str, lines: List[str]) -> str:
+        """Join lines until the section's token budget is spent; later lines are dropped."""
+        budget = self.prompt_budgets.get(name, 300)
+        kept, used = [], 0
+        for line in lines:
+            cost = self._estimate_tokens(line) + 1
+            if used + cost > budget:
+                if not kept:
+                    kept.append(line[:budget * 4].rstrip() + "…")
+                break
+            kept.append(line)
+            used += cost
+        return "\n".join(kept) if kept else "(none)"
+    
+    def _metrics_section(self, metrics: Any) -> str:
+        if isinstance(metrics, list):
+            metrics = metrics[0] if metrics else {}
+        if isinstance(metrics, dict) and not any(f in metrics for f in METRIC_FIELDS):
+            # Unwrap envelopes such as {"snapshot": {...}}
+            metrics = next((v for v in metrics.values() if isinstance(v, dict)), metrics)
+        return self._section("metrics", [f"{k}: {v}" for k, v in self._scalars(metrics, METRIC_FIELDS).items()])
+    
+    def _news_section(self, news: Any, name: str = "news", titles_only: bool = False) -> str:
+        """One line per article: date | title | source (or just the title)."""
+        lines = []
+        for item in news if isinstance(news, list) else []:
+            if not isinstance(item, dict) or not item.get("title"):
+                continue
+            title = " ".join(str(item["title"]).split())
+            if titles_only:
+                lines.append(f"- {title}")
+                continue
+            date = str(item.get("date") or item.get("published_at") or "")[:10]
+            lines.append(" | ".join(x for x in (date, title, str(item.get("source") or "")) if x))
+        return self._section(name, lines)
+    
+    def _web_section(self, results: Any) -> str:
+        lines = []
+        for item in results if isinstance(results, list) else []:
+            if not isinstance(item, dict):
+                continue
+            title = " ".join(str(item.get("title") or "").split())
+            snippet = " ".join(str(item.get("snippet") or item.get("content") or item.get("description") or "").split())
+            if len(snippet) > 200:
+                snippet = snippet[:200].rsplit(" ", 1)[0] + "…"
+            if title or snippet:
+                lines.append(f"- {title}: {snippet}" if snippet else f"- {title}")
+        return self._section("web", lines)
+    
+    def _analyst_section(self, analyst: Any) -> str:
+        """One compact JSON object per estimate period."""
+        periods = analyst if isinstance(analyst, list) else [analyst]
+        lines = [json.dumps(self._scalars(p), separators=(",", ":"), default=str) for p in periods]
+        return self._section("analyst", [line for line in lines if line != "{}"])
+    
+    def _tweets_section(self, tweets: List[str]) -> str:
+        lines = []
+        for text in tweets:
+            text = " ".join(str(text).split())[:280]
+            if text and f"- {text}" not in lines:
+                lines.append(f"- {text}")
+        return self._section("tweets", lines)
     
     # ==================== AI Analysis ====================
     
@@ -246,23 +737,40 @@ class AIsaStockAnalyst:
         self,
         ticker: str,
         data: Dict,
-        models: List[str]
+        models: List[str],
+        model_strategy: str = "first",
+        emit: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
-        """Run multi-model AI analysis."""
-        analyses = {}
+        """
+        Run the summary, sentiment and valuation analyses concurrently.
+        
+        With `emit`, model replies are streamed: each content delta is
+        emitted as a "token" event and each finished analysis as an
+        "analysis" event.
+        """
+        if model_strategy == "single":
+            models = models[:1]
+        
+        def tokens(name: str) -> Optional[Callable[[str, str], None]]:
+            if emit is None:
+                return None
+            return lambda model, text: emit({"type": "token", "analysis": name, "model": model, "text": text})
         
         tasks = [
-            ("summary", self._create_investment_summary(ticker, data, models[0])),
-            ("sentiment", self._analyze_sentiment(ticker, data, models[0])),
-            ("valuation", self._analyze_valuation(ticker, data, models[0]))
+            ("summary", self._create_investment_summary(ticker, data, models, model_strategy, tokens("summary"))),
+            ("sentiment", self._analyze_sentiment(ticker, data, models, model_strategy, tokens("sentiment"))),
+            ("valuation", self._analyze_valuation(ticker, data, models, model_strategy, tokens("valuation")))
         ]
+        analyses = {"models": {}}
         
-        for name, task in tasks:
+        async def run(name: str, task) -> None:
+            error = None
             try:
-                analyses[name] = await task
-                print(f"  ✓ {name.capitalize()} analysis")
+                analyses[name], analyses["models"][name] = await task
+                self._log(f"  ✓ {name.capitalize()} analysis")
             except Exception as e:
-                print(f"  ✗ {name.capitalize()}: {str(e)}")
+                error = str(e)
+                self._log(f"  ✗ {name.capitalize()}: {error}")
                 # Return proper structure for each analysis type
                 if name == "summary":
                     analyses[name] = "Analysis unavailable due to API error."
@@ -271,38 +779,285 @@ class AIsaStockAnalyst:
                         "sentiment": "neutral",
                         "confidence": "low",
                         "key_themes": [],
-                        "summary": f"Sentiment analysis failed: {str(e)}"
+                        "summary": f"Sentiment analysis failed: {error}"
                     }
                 elif name == "valuation":
                     analyses[name] = {
                         "valuation_assessment": "uncertain",
-                        "reasoning": f"Valuation analysis failed: {str(e)}"
+                        "reasoning": f"Valuation analysis failed: {error}"
                     }
+            if emit:
+                event = {"type": "analysis", "name": name, "result": analyses[name],
+                         "models": analyses["models"].get(name, {})}
+                if error:
+                    event["error"] = error
+                emit(event)
         
+        await asyncio.gather(*(run(name, task) for name, task in tasks))
         return analyses
     
+    async def _chat(
+        self,
+        model: str,
+        messages: List[Dict],
+        temperature: float,
+        max_tokens: int,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        One chat completion; returns content, token usage and latency (or the error).
+        
+        With `on_token` the reply is streamed over SSE: every content delta is
+        passed to it as it arrives, and first_token_ms is reported too.
+        """
+        start = time.perf_counter()
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        try:
+            async with self._slot("llm", shared=False):
+                if on_token is not None:
+                    return await self._chat_stream(payload, on_token, start)
+                response = await self.client.post(
+                    f"{self.llm_base_url}/chat/completions",
+                    json=payload,
+                    headers=self.headers
+                )
+            response.raise_for_status()
+            result = response.json()
+            return {
+                "content": result["choices"][0]["message"]["content"],
+                "usage": result.get("usage", {}),
+                "latency_ms": round((time.perf_counter() - start) * 1000)
+            }
+        except Exception as e:
+            return {"error": str(e), "latency_ms": round((time.perf_counter() - start) * 1000)}
+    
+    async def _chat_stream(self, payload: Dict, on_token: Callable[[str], None], start: float) -> Dict[str, Any]:
+        """Streaming variant of _chat: read "data:" lines until [DONE]."""
+        payload = {**payload, "stream": True, "stream_options": {"include_usage": True}}
+        parts: List[str] = []
+        usage: Dict = {}
+        first_token_ms = None
+        async with self.client.stream(
+            "POST", f"{self.llm_base_url}/chat/completions", json=payload, headers=self.headers
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                chunk = line[5:].strip()
+                if chunk == "[DONE]":
+                    break
+                event = json.loads(chunk)
+                usage = event.get("usage") or usage
+                for choice in event.get("choices") or []:
+                    text = (choice.get("delta") or {}).get("content")
+                    if text:
+                        if first_token_ms is None:
+                            first_token_ms = round((time.perf_counter() - start) * 1000)
+                        parts.append(text)
+                        on_token(text)
+        return {
+            "content": "".join(parts),
+            "usage": usage,
+            "latency_ms": round((time.perf_counter() - start) * 1000),
+            "first_token_ms": first_token_ms
+        }
+    
+    async def _ask_models(
+        self,
+        models: List[str],
+        messages: List[Dict],
+        temperature: float,
+        max_tokens: int,
+        parse: Callable[[str], Any],
+        combine: Callable[[Dict[str, Any]], Any],
+        strategy: str = "first",
+        fallback: Any = None,
+        fingerprint: Optional[str] = None,
+        on_token: Optional[Callable[[str, str], None]] = None
+    ) -> Tuple[Any, Dict[str, Dict]]:
+        """
+        Send one prompt to every model in parallel and wait up to llm_timeout.
+        
+        "first" keeps the first answer that parses and cancels the other
+        requests; "ensemble" waits for all of them and merges the parsed
+        answers with `combine` (model -> answer, in `models` order). If
+        models replied but nothing parsed, `fallback` is the answer.
+        
+        With a `fingerprint` (see _fingerprint) and the LLM cache enabled, a
+        model whose answer to the same prompt version and inputs is cached
+        is not called; its answer counts as an immediate reply.
+        
+        With `on_token`, replies are streamed and it is called with
+        (model, text) for every content delta.
+        
+        Returns:
+            (answer, per-model stats with status, latency_ms and usage)
+        
+        Raises:
+            RuntimeError: when no model replied in time
+        """
+        models = list(dict.fromkeys(models))
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + self.llm_timeout
+        stats: Dict[str, Dict] = {}
+        answers: Dict[str, Any] = {}
+        first = None
+        prompt_tokens = sum(self._estimate_tokens(m["content"]) for m in messages)
+        
+        cache_keys = {}
+        if fingerprint and self.llm_cache:
+            for model in models:
+                cache_keys[model] = ResponseCache.key("LLM", model, {"fingerprint": fingerprint})
+                content = self.cache.get("llm", cache_keys[model])
+                answer = parse(content) if content is not None else None
+                if answer is not None:
+                    stats[model] = {"status": "cached", "latency_ms": 0}
+                    answers[model] = answer
+                    first = first or model
+        
+        to_call = [m for m in models if m not in answers] if not (first and strategy != "ensemble") else []
+        pending = {
+            asyncio.ensure_future(self._chat(
+                model, messages, temperature, max_tokens,
+                functools.partial(on_token, model) if on_token else None
+            )): model
+            for model in to_call
+        }
+        
+        while pending and not (first and strategy != "ensemble"):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, _ = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                model = pending.pop(task)
+                reply = task.result()
+                stats[model] = {"status": "error", "latency_ms": reply["latency_ms"]}
+                if "error" in reply:
+                    stats[model]["error"] = reply["error"]
+                    continue
+                stats[model]["usage"] = reply["usage"]
+                if reply.get("first_token_ms") is not None:
+                    stats[model]["first_token_ms"] = reply["first_token_ms"]
+                answer = parse(reply["content"])
+                if answer is None:
+                    stats[model]["status"] = "unparseable"
+                    continue
+                stats[model]["status"] = "ok"
+                answers[model] = answer
+                if model in cache_keys:
+                    self.cache.put("llm", cache_keys[model], reply["content"])
+                first = first or model
+        
+        elapsed_ms = round((loop.time() - started) * 1000)
+        for task, model in pending.items():
+            task.cancel()
+            cancelled = first and strategy != "ensemble"
+            stats[model] = {"status": "cancelled" if cancelled else "timeout", "latency_ms": elapsed_ms}
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        
+        stats = {m: {**stats.get(m, {"status": "skipped"}), "prompt_tokens_est": prompt_tokens} for m in models}
+        if not answers:
+            if fallback is not None and any(st["status"] == "unparseable" for st in stats.values()):
+                return fallback, stats
+            errors = "; ".join(f"{m}: {s.get('error', s['status'])}" for m, s in stats.items())
+            raise RuntimeError(f"No model answered ({errors})")
+        if strategy == "ensemble" and len(answers) > 1:
+            answer = combine({m: answers[m] for m in models if m in answers})
+        else:
+            answer = answers[first]
+        return answer, stats
+    
+    @staticmethod
+    def _parse_json(content: str) -> Optional[Dict]:
+        """Parse a JSON object from a reply, tolerating ``` fences; None if it isn't one."""
+        try:
+            # Clean JSON
+            if "```json" in content:
+                content = content.split("```json")[1].split("```")[0]
+            elif "```" in content:
+                content = content.split("```")[1].split("```")[0]
+            parsed = json.loads(content.strip())
+        except (ValueError, IndexError):
+            return None
+        return parsed if isinstance(parsed, dict) else None
+    
+    @staticmethod
+    def _fingerprint(template: str, **inputs) -> str:
+        """Content address of a prompt: template name and version plus its normalized input data."""
+        raw = json.dumps(
+            {"template": template, "version": PROMPT_VERSIONS[template], "inputs": inputs},
+            sort_keys=True, separators=(",", ":"), default=str
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _majority(answers: Dict[str, Dict], field: str) -> Tuple[Optional[str], Dict[str, Any]]:
+        """Most common value of `field` (ties go to the earlier model) and each model's vote."""
+        votes = {model: answer.get(field) for model, answer in answers.items()}
+        counted = [v for v in votes.values() if v]
+        if not counted:
+            return None, votes
+        return max(counted, key=lambda v: (counted.count(v), -counted.index(v))), votes
+    
+    @staticmethod
+    def _combine_summaries(answers: Dict[str, str]) -> str:
+        return "\n\n".join(f"[{model}]\n{text.strip()}" for model, text in answers.items())
+    
+    @classmethod
+    def _combine_sentiment(cls, answers: Dict[str, Dict]) -> Dict:
+        label, votes = cls._majority(answers, "sentiment")
+        combined = dict(next(a for a in answers.values() if a.get("sentiment") == label))
+        if sum(1 for v in votes.values() if v == label) < len(votes):
+            combined["confidence"] = "low"  # models disagree
+        combined["model_votes"] = votes
+        return combined
+    
+    @classmethod
+    def _combine_valuation(cls, answers: Dict[str, Dict]) -> Dict:
+        label, votes = cls._majority(answers, "valuation_assessment")
+        combined = dict(next(a for a in answers.values() if a.get("valuation_assessment") == label))
+        targets = [a["price_target_12m"] for a in answers.values()
+                   if isinstance(a.get("price_target_12m"), (int, float))]
+        if targets:
+            combined["price_target_12m"] = statistics.median(targets)
+        combined["model_votes"] = votes
+        return combined
+    
     async def _create_investment_summary(
         self,
         ticker: str,
         data: Dict,
-        model: str
-    ) -> str:
+        models: List[str],
+        strategy: str = "first",
+        on_token: Optional[Callable[[str, str], None]] = None
+    ) -> Tuple[str, Dict[str, Dict]]:
         """Generate comprehensive investment summary."""
-        # Extract key data
-        metrics = data.get("financial_metrics", {}).get("data", {})
-        news = data.get("stock_news", {}).get("data", [])[:5]
-        web_results = data.get("web_search", {}).get("results", [])[:5]
+        # Extract key data, projected and trimmed to each section's budget
+        sections = {
+            "metrics": self._metrics_section(data.get("financial_metrics", {}).get("data", {})),
+            "news": self._news_section(data.get("stock_news", {}).get("data", [])[:5]),
+            "web": self._web_section(data.get("web_search", {}).get("results", [])[:5]),
+        }
         
         prompt = f"""Analyze {ticker} stock for investment purposes.
 
 Financial Metrics:
-{json.dumps(metrics, indent=2)}
+{sections["metrics"]}
 
 Recent News:
-{json.dumps(news, indent=2)}
+{sections["news"]}
 
 Market Analysis:
-{json.dumps(web_results, indent=2)}
+{sections["web"]}
 
 Provide a comprehensive investment summary covering:
 1. Business performance and recent developments
@@ -313,36 +1068,33 @@ Provide a comprehensive investment summary covering:
 
 Be objective and data-driven. Limit response to 300 words."""
 
-        response = await self.client.post(
-            f"{self.llm_base_url}/chat/completions",
-            json={
-                "model": model,
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "You are a professional equity analyst providing objective investment analysis."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                "temperature": 0.3,
-                "max_tokens": 1500
+        messages = [
+            {
+                "role": "system",
+                "content": "You are a professional equity analyst providing objective investment analysis."
             },
-            headers=self.headers
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+        return await self._ask_models(
+            models, messages, temperature=0.3, max_tokens=1500,
+            parse=lambda content: content or None,
+            combine=self._combine_summaries,
+            strategy=strategy,
+            fingerprint=self._fingerprint("summary", ticker=ticker, **sections),
+            on_token=on_token
         )
-        response.raise_for_status()
-        
-        result = response.json()
-        return result["choices"][0]["message"]["content"]
     
     async def _analyze_sentiment(
         self,
         ticker: str,
         data: Dict,
-        model: str
-    ) -> Dict:
+        models: List[str],
+        strategy: str = "first",
+        on_token: Optional[Callable[[str, str], None]] = None
+    ) -> Tuple[Dict, Dict[str, Dict]]:
         """Analyze sentiment from Twitter and news."""
         twitter_data = data.get("twitter", {})
         news_data = data.get("stock_news", {}).get("data", [])[:10]
@@ -352,13 +1104,18 @@ Be objective and data-driven. Limit response to 300 words."""
         if "data" in twitter_data and "tweets" in twitter_data["data"]:
             tweets = [t.get("text", "") for t in twitter_data["data"]["tweets"][:10]]
         
+        sections = {
+            "headlines": self._news_section(news_data, "headlines", titles_only=True),
+            "tweets": self._tweets_section(tweets),
+        }
+        
         prompt = f"""Analyze sentiment for {ticker} based on:
 
 Recent News Headlines:
-{json.dumps([n.get("title", "") for n in news_data], indent=2)}
+{sections["headlines"]}
 
 Recent Tweets:
-{json.dumps(tweets, indent=2)}
+{sections["tweets"]}
 
 Return JSON with:
 - sentiment: "bullish", "neutral", or "bearish"
@@ -368,53 +1125,42 @@ Return JSON with:
 
 Respond ONLY with valid JSON."""
 
-        response = await self.client.post(
-            f"{self.llm_base_url}/chat/completions",
-            json={
-                "model": model,
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.2,
-                "max_tokens": 500
-            },
-            headers=self.headers
-        )
-        response.raise_for_status()
-        
-        result = response.json()
-        content = result["choices"][0]["message"]["content"]
-        
-        try:
-            # Clean JSON
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0]
-            return json.loads(content.strip())
-        except:
-            return {
+        return await self._ask_models(
+            models, [{"role": "user", "content": prompt}], temperature=0.2, max_tokens=500,
+            parse=self._parse_json,
+            combine=self._combine_sentiment,
+            strategy=strategy,
+            fingerprint=self._fingerprint("sentiment", ticker=ticker, **sections),
+            on_token=on_token,
+            fallback={
                 "sentiment": "neutral",
                 "confidence": "low",
                 "key_themes": [],
                 "summary": "Unable to analyze sentiment"
             }
+        )
     
     async def _analyze_valuation(
         self,
         ticker: str,
         data: Dict,
-        model: str
-    ) -> Dict:
+        models: List[str],
+        strategy: str = "first",
+        on_token: Optional[Callable[[str, str], None]] = None
+    ) -> Tuple[Dict, Dict[str, Dict]]:
         """Analyze valuation and price target."""
-        metrics = data.get("financial_metrics", {}).get("data", {})
-        analyst = data.get("analyst_estimates", {}).get("data", {})
+        sections = {
+            "metrics": self._metrics_section(data.get("financial_metrics", {}).get("data", {})),
+            "analyst": self._analyst_section(data.get("analyst_estimates", {}).get("data", {})),
+        }
         
         prompt = f"""Provide valuation analysis for {ticker}:
 
 Financial Metrics:
-{json.dumps(metrics, indent=2)}
+{sections["metrics"]}
 
 Analyst Estimates:
-{json.dumps(analyst, indent=2)}
+{sections["analyst"]}
 
 Return JSON with:
 - current_price: number (if available)
@@ -425,32 +1171,18 @@ Return JSON with:
 
 Respond ONLY with valid JSON."""
 
-        response = await self.client.post(
-            f"{self.llm_base_url}/chat/completions",
-            json={
-                "model": model,
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.2,
-                "max_tokens": 800
-            },
-            headers=self.headers
-        )
-        response.raise_for_status()
-        
-        result = response.json()
-        content = result["choices"][0]["message"]["content"]
-        
-        try:
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0]
-            return json.loads(content.strip())
-        except:
-            return {
+        return await self._ask_models(
+            models, [{"role": "user", "content": prompt}], temperature=0.2, max_tokens=800,
+            parse=self._parse_json,
+            combine=self._combine_valuation,
+            strategy=strategy,
+            fingerprint=self._fingerprint("valuation", ticker=ticker, **sections),
+            on_token=on_token,
+            fallback={
                 "valuation_assessment": "uncertain",
                 "reasoning": "Unable to determine valuation"
             }
+        )
     
     # ==================== Report Synthesis ====================
     
@@ -504,6 +1236,9 @@ Respond ONLY with valid JSON."""
             
             "data_sources": data_sources,
             
+            # analysis -> model -> {status, latency_ms, usage}
+            "model_usage": analysis.get("models", {}),
+            
             "raw_data": {
                 "financial_metrics": data.get("financial_metrics", {}),
                 "news": data.get("stock_news", {}),
@@ -529,8 +1264,219 @@ Respond ONLY with valid JSON."""
         await self.client.aclose()
 
 
+def load_checkpoint(path: str) -> Dict[str, Dict[str, Any]]:
+    """Read an analyze_many checkpoint: ticker -> its latest result line."""
+    results = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by an interrupted write
+                if not isinstance(entry, dict) or not isinstance(entry.get("ticker"), str):
+                    continue
+                results[entry["ticker"]] = entry
+    except FileNotFoundError:
+        pass
+    return results
+
+
+def _end_partial_line(path: str):
+    """Terminate a last line left unfinished by a killed run, so appended records start on their own line."""
+    try:
+        with open(path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+    except FileNotFoundError:
+        pass
+
+
 # ==================== Example Usage ====================
 
+def print_report(report: Dict[str, Any]):
+    """Print the human-readable report."""
+    print("\n" + "="*70)
+    print("STOCK ANALYSIS REPORT")
+    print("="*70)
+    
+    print(f"\nTICKER: {report['metadata']['ticker']}")
+    print(f"DATE: {report['metadata']['analysis_date'][:10]}")
+    
+    print(f"\nINVESTMENT SUMMARY:")
+    print(report['investment_summary'])
+    
+    print(f"\nKEY METRICS:")
+    for key, value in report['key_metrics'].items():
+        if value:
+            print(f"  {key.replace('_', ' ').title()}: {value}")
+    
+    print(f"\nSENTIMENT:")
+    sentiment = report['sentiment_analysis']
+    print(f"  {sentiment.get('sentiment', 'N/A').upper()}")
+    print(f"  Confidence: {sentiment.get('confidence', 'N/A')}")
+    print(f"  {sentiment.get('summary', '')}")
+    
+    print(f"\nVALUATION:")
+    val = report['valuation']
+    print(f"  Assessment: {val.get('valuation_assessment', 'N/A').upper()}")
+    if 'price_target_12m' in val:
+        print(f"  12M Target: ${val['price_target_12m']:.2f}")
+    
+    print(f"\nDATA SOURCES:")
+    for source, count in report['data_sources'].items():
+        print(f"  {source}: {count}")
+    
+    print("\n" + "="*70)
+    print(report['disclaimer'])
+    print("="*70 + "\n")
+
+
+def _report_summary(result: Dict[str, Any]) -> Dict[str, Any]:
+    """One line per ticker for batch output; the full report stays in the checkpoint."""
+    if "error" in result:
+        return result
+    report = result["report"]
+    return {
+        "ticker": result["ticker"],
+        "sentiment": report["sentiment_analysis"].get("sentiment"),
+        "sentiment_confidence": report["sentiment_analysis"].get("confidence"),
+        "valuation": report["valuation"].get("valuation_assessment"),
+        "price_target_12m": report["valuation"].get("price_target_12m"),
+        **{k: report["key_metrics"].get(k) for k in ("market_cap", "pe_ratio", "profit_margin", "roe")}
+    }
+
+
+async def stream_report(analyst: AIsaStockAnalyst, ticker: str, depth: str, models: Optional[List[str]],
+                        model_strategy: str) -> Dict[str, Any]:
+    """Render analyze_stock_stream events as they arrive; returns the final report."""
+    print("\n" + "="*70)
+    print(f"STOCK ANALYSIS: {ticker}")
+    print("="*70 + "\n")
+    
+    streaming = None  # model whose summary tokens are being printed
+    streamed = ""
+    held: List[str] = []  # lines that arrive while the summary is mid-stream
+    report = None
+    
+    def show(line: str):
+        if streaming:
+            held.append(line)
+        else:
+            print(line, flush=True)
+    
+    async for event in analyst.analyze_stock_stream(ticker, depth, models, model_strategy):
+        kind = event["type"]
+        if kind == "source":
+            label = event["name"].replace("_", " ").title()
+            error = event["data"].get("error") if isinstance(event["data"], dict) else None
+            show(f"  ✗ {label}: {error}" if error else f"  ✓ {label}")
+        elif kind == "token":
+            # Only the free-text summary is worth watching token by token
+            if event["analysis"] != "summary":
+                continue
+            if streaming is None and not streamed:
+                streaming = event["model"]
+                print(f"\nINVESTMENT SUMMARY ({streaming}):")
+            if event["model"] == streaming:
+                streamed += event["text"]
+                print(event["text"], end="", flush=True)
+        elif kind == "analysis" and event["name"] == "summary":
+            if streaming:
+                print()
+            streaming = None
+            if event["result"].strip() != streamed.strip():
+                # Cached, combined by the ensemble, or won by another model
+                print(f"\nINVESTMENT SUMMARY:\n{event['result']}")
+            for line in held:
+                print(line)
+            held.clear()
+        elif kind == "analysis" and event["name"] == "sentiment":
+            sentiment = event["result"]
+            show(f"\nSENTIMENT: {str(sentiment.get('sentiment', 'N/A')).upper()} "
+                 f"(confidence: {sentiment.get('confidence', 'N/A')})\n  {sentiment.get('summary', '')}")
+        elif kind == "analysis" and event["name"] == "valuation":
+            val = event["result"]
+            line = f"\nVALUATION: {str(val.get('valuation_assessment', 'N/A')).upper()}"
+            if isinstance(val.get("price_target_12m"), (int, float)):
+                line += f"  12M Target: ${val['price_target_12m']:.2f}"
+            show(line)
+        elif kind == "report":
+            report = event["report"]
+    
+    print(f"\nKEY METRICS:")
+    for key, value in report["key_metrics"].items():
+        if value:
+            print(f"  {key.replace('_', ' ').title()}: {value}")
+    print("\n" + "="*70)
+    print(report["disclaimer"])
+    print("="*70 + "\n")
+    return report
+
+
+async def run_analyze(args) -> int:
+    analyst = AIsaStockAnalyst(
+        api_key=args.api_key,
+        verbose=not args.stream,
+        use_cache=not args.no_cache,
+        llm_cache=not args.no_llm_cache
+    )
+    ticker = args.ticker.upper()
+    try:
+        if args.stream:
+            report = await stream_report(analyst, ticker, args.depth, args.models, args.model_strategy)
+        else:
+            report = await analyst.analyze_stock(ticker, args.depth, args.models, args.model_strategy)
+            print_report(report)
+        filename = args.output or f"{ticker}_analysis_{datetime.now().strftime('%Y%m%d')}.json"
+        with open(filename, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Full report saved to {filename}")
+        return 0
+    finally:
+        await analyst.close()
+
+
+async def run_batch(args) -> int:
+    tickers = list(args.tickers)
+    if args.file:
+        with open(args.file) as f:
+            tickers += [line.split("#")[0].strip() for line in f]
+    limits = {}
+    for item in args.limit:
+        endpoint, _, value = item.partition("=")
+        limits[endpoint.strip()] = int(value)
+    
+    analyst = AIsaStockAnalyst(
+        api_key=args.api_key,
+        max_concurrency=args.max_concurrency,
+        endpoint_limits=limits,
+        verbose=False,
+        use_cache=not args.no_cache,
+        llm_cache=not args.no_llm_cache
+    )
+    failed = 0
+    count = 0
+    try:
+        async for result in analyst.analyze_many(
+            tickers, args.depth, args.models, args.model_strategy,
+            concurrency=args.concurrency, checkpoint=args.checkpoint
+        ):
+            count += 1
+            failed += "error" in result
+            status = "✗ " + result["error"] if "error" in result else "✓"
+            print(f"[{count}] {result['ticker']} {status}", file=sys.stderr)
+            print(json.dumps(_report_summary(result), default=str), flush=True)
+    finally:
+        await analyst.close()
+    print(f"Done: {count - failed} analyzed, {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
 async def main():
     """Example: Analyze NVIDIA stock."""
     api_key = input("Enter your AIsa API key: ")
@@ -545,41 +1491,7 @@ async def main():
             models=["gpt-4", "claude-3-opus"]
         )
         
-        # Print report
-        print("\n" + "="*70)
-        print("STOCK ANALYSIS REPORT")
-        print("="*70)
-        
-        print(f"\nTICKER: {report['metadata']['ticker']}")
-        print(f"DATE: {report['metadata']['analysis_date'][:10]}")
-        
-        print(f"\nINVESTMENT SUMMARY:")
-        print(report['investment_summary'])
-        
-        print(f"\nKEY METRICS:")
-        for key, value in report['key_metrics'].items():
-            if value:
-                print(f"  {key.replace('_', ' ').title()}: {value}")
-        
-        print(f"\nSENTIMENT:")
-        sentiment = report['sentiment_analysis']
-        print(f"  {sentiment.get('sentiment', 'N/A').upper()}")
-        print(f"  Confidence: {sentiment.get('confidence', 'N/A')}")
-        print(f"  {sentiment.get('summary', '')}")
-        
-        print(f"\nVALUATION:")
-        val = report['valuation']
-        print(f"  Assessment: {val.get('valuation_assessment', 'N/A').upper()}")
-        if 'price_target_12m' in val:
-            print(f"  12M Target: ${val['price_target_12m']:.2f}")
-        
-        print(f"\nDATA SOURCES:")
-        for source, count in report['data_sources'].items():
-            print(f"  {source}: {count}")
-        
-        print("\n" + "="*70)
-        print(report['disclaimer'])
-        print("="*70 + "\n")
+        print_report(report)
         
         # Save report
         filename = f"{ticker}_analysis_{datetime.now().strftime('%Y%m%d')}.json"
@@ -597,5 +1509,56 @@ async def main():
         await analyst.close()
 
 
+def cli():
+    parser = argparse.ArgumentParser(description="US stock analysis on the AIsa API")
+    parser.add_argument("--clear-cache", action="store_true",
+                        help="Delete all cached responses and model answers, then exit")
+    sub = parser.add_subparsers(dest="command")
+    
+    def common(p):
+        p.add_argument("--depth", choices=["quick", "standard", "deep"], default="standard")
+        p.add_argument("--models", nargs="+", default=None, help="LLM models (default: gpt-4 claude-3-opus)")
+        p.add_argument("--model-strategy", choices=MODEL_STRATEGIES, default="first")
+        p.add_argument("--no-cache", action="store_true", help="Bypass the on-disk response cache")
+        p.add_argument("--no-llm-cache", action="store_true", help="Always call the models, even for unchanged inputs")
+    
+    analyze = sub.add_parser("analyze", help="Analyze one ticker")
+    analyze.add_argument("--ticker", required=True)
+    analyze.add_argument("--output", help="Report JSON path (default: <TICKER>_analysis_<date>.json)")
+    analyze.add_argument("--stream", action="store_true",
+                         help="Show sources, analyses and summary tokens as they arrive")
+    common(analyze)
+    
+    batch = sub.add_parser("batch", help="Analyze many tickers concurrently; one JSON line per ticker")
+    batch.add_argument("tickers", nargs="*", help="Ticker symbols")
+    batch.add_argument("--file", help="Watchlist file, one ticker per line")
+    batch.add_argument("--concurrency", type=int, default=TICKER_CONCURRENCY,
+                       help=f"Tickers in progress at once (default: {TICKER_CONCURRENCY})")
+    batch.add_argument("--max-concurrency", type=int, default=MAX_CONCURRENCY,
+                       help=f"Data-source requests in flight across all tickers (default: {MAX_CONCURRENCY})")
+    batch.add_argument("--limit", action="append", default=[], metavar="ENDPOINT=N",
+                       help="Per-endpoint cap, e.g. twitter=2 or llm=4 (repeatable)")
+    batch.add_argument("--checkpoint", help="JSONL file of full results; finished tickers are skipped on rerun")
+    common(batch)
+    batch.set_defaults(depth="quick")
+    
+    args = parser.parse_args()
+    if args.clear_cache:
+        print(json.dumps({"cleared": ResponseCache().clear(), "cache_dir": str(CACHE_DIR)}))
+        return
+    if args.command is None:
+        asyncio.run(main())
+        return
+    
+    args.api_key = os.environ.get("AISA_API_KEY")
+    if not args.api_key:
+        parser.error("AISA_API_KEY environment variable not set")
+    if args.command == "batch" and not (args.tickers or args.file):
+        parser.error("batch needs tickers or --file")
+    
+    runner = run_analyze if args.command == "analyze" else run_batch
+    sys.exit(asyncio.run(runner(args)))
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    cli()
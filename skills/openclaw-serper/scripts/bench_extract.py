@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Serper — extraction benchmark, thread pool vs process pool.
+
+Feeds the same downloaded pages to search.py's extractor through both
+--extract-mode options and reports throughput. No network is used: pages
+are synthetic articles (or .html files from --html-dir).
+
+Usage:
+    python3 scripts/bench_extract.py                       # 40 synthetic pages, CPU-count workers
+    python3 scripts/bench_extract.py -n 100 -w 8 --kb 300  # 100 pages of ~300 KB, 8 workers
+    python3 scripts/bench_extract.py --html-dir ~/saved-pages
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import search  # noqa: E402
+from fetcher import FetchResult  # noqa: E402
+
+
+WORDS = ("search engine page content extraction article paragraph latency network parser "
+         "thread process worker result query server browser protocol request response").split()
+
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+
+
+def synthetic_page(i: int, kb: int) -> bytes:
+    """An article wrapped in the navigation, sidebar and footer boilerplate extraction must strip."""
+    rng = random.Random(i)
+    nav = "".join(f'<li><a href="/section/{n}">Section {n}</a></li>' for n in range(40))
+    sidebar = "".join(f'<div class="ad"><a href="/promo/{n}">{_sentence(rng)}</a></div>' for n in range(30))
+    parts = [f"<html><head><title>Article {i}</title></head><body><nav><ul>{nav}</ul></nav>",
+             f"<aside>{sidebar}</aside><article><h1>Article {i}</h1>"]
+    size = sum(len(p) for p in parts)
+    while size < kb * 1024:
+        para = f"<p>{' '.join(_sentence(rng) for _ in range(6))}</p>"
+        if rng.random() < 0.1:
+            para += "<table>" + "".join(f"<tr><td>{rng.choice(WORDS)}</td><td>{rng.randint(0, 999)}</td></tr>"
+                                        for _ in range(8)) + "</table>"
+        parts.append(para)
+        size += len(para)
+    parts.append(f"</article><footer>{nav}</footer></body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def load_pages(args: argparse.Namespace) -> List[FetchResult]:
+    if args.html_dir:
+        bodies = [p.read_bytes() for p in sorted(Path(args.html_dir).expanduser().glob("*.htm*"))]
+        bodies = (bodies * (args.pages // max(1, len(bodies)) + 1))[:args.pages] if bodies else []
+    else:
+        bodies = [synthetic_page(i, args.kb) for i in range(args.pages)]
+    return [FetchResult(f"bench://{i}", 200, {}, "text/html", body, False, 0.0) for i, body in enumerate(bodies)]
+
+
+def run_mode(mode: str, pages: List[FetchResult], workers: int) -> Dict[str, float]:
+    deadline = time.monotonic() + 3600
+    pool = None
+    startup = 0.0
+    if mode == "process":
+        t0 = time.perf_counter()
+        pool = search.get_extract_pool(workers)
+        # Pay worker startup (fork/spawn + imports) outside the timed run
+        list(pool.map(search._extract_content, pages[:workers]))
+        startup = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as threads:
+        texts = list(threads.map(lambda page: search._run_extraction(page, deadline, pool), pages))
+    wall = time.perf_counter() - t0
+    return {
+        "wall_seconds": round(wall, 3),
+        "pages_per_second": round(len(pages) / wall, 2) if wall else None,
+        "ms_per_page": round(wall * 1000 / len(pages), 2) if pages else None,
+        "pool_startup_seconds": round(startup, 3),
+        "extracted": sum(1 for t in texts if t),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark page extraction in thread vs process mode",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--pages", "-n", type=int, default=40, help="Pages to extract per mode (default: 40)")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count() or 1,
+                        help="Threads / processes per mode (default: CPU count)")
+    parser.add_argument("--kb", type=int, default=150, help="Approximate size of synthetic pages in KB (default: 150)")
+    parser.add_argument("--html-dir", help="Use saved .html pages from this directory instead of synthetic ones")
+    parser.add_argument("--modes", default="thread,process", help="Comma-separated modes to run (default: thread,process)")
+    args = parser.parse_args()
+
+    pages = load_pages(args)
+    if not pages:
+        print(json.dumps({"error": "No pages to benchmark", "html_dir": args.html_dir}), flush=True)
+        sys.exit(1)
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    report: Dict[str, object] = {
+        "pages": len(pages),
+        "avg_page_kb": round(sum(len(p.body) for p in pages) / len(pages) / 1024, 1),
+        "workers": args.workers,
+        "cpu_count": os.cpu_count(),
+    }
+    for mode in modes:
+        report[mode] = run_mode(mode, pages, args.workers)
+    if "thread" in report and "process" in report:
+        report["process_speedup"] = round(report["thread"]["wall_seconds"] / report["process"]["wall_seconds"], 2)
+
+    print(json.dumps(report, indent=2), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Persistent cache of extracted page content, keyed by canonical URL.
+
+Each entry is one JSON file holding the extracted text plus the validators
+(ETag / Last-Modified) and timestamps needed to revalidate it:
+  - validated less than `fresh_ttl` seconds ago  → served with no request
+  - older                                         → conditional GET; a 304
+                                                    refreshes it in place
+The directory is kept under `max_bytes` by evicting least recently used
+entries (file mtime is bumped on every hit).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+CACHE_DIR = Path(os.environ.get(
+    "SERPER_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "content"),
+))
+DEFAULT_FRESH_TTL = 3600                 # serve without revalidating for 1 hour
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024     # 64 MB on disk
+
+# Query parameters that never change page content
+_TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "ref_src"}
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL so trivially different links share one cache entry."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in _TRACKING_PARAMS and not k.lower().startswith("utm_")
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+class ContentCache:
+    """Size-bounded, file-per-entry store of extracted page text."""
+
+    def __init__(self, directory: Path = CACHE_DIR, fresh_ttl: int = DEFAULT_FRESH_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.fresh_ttl = fresh_ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None   # bytes on disk, scanned lazily
+
+    def _path(self, url: str) -> Path:
+        key = hashlib.sha256(canonical_url(url).encode("utf-8")).hexdigest()[:32]
+        return self.directory / f"{key}.json"
+
+    # -------------------------------------------------------------------------
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for `url` (fresh or not), or None."""
+        path = self._path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # LRU bookkeeping
+            return entry
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry.get("validated_at", 0) < self.fresh_ttl
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        """Request headers that let the origin answer 304 Not Modified."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url: str, text: str, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> None:
+        """Store freshly extracted text for `url`."""
+        now = time.time()
+        self._write(url, {
+            "url": canonical_url(url),
+            "text": text,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": now,
+            "validated_at": now,
+        })
+
+    def revalidated(self, url: str, entry: Dict[str, Any]) -> None:
+        """Record a 304 — the stored text is current as of now."""
+        self._write(url, {**entry, "validated_at": time.time()})
+
+    # -------------------------------------------------------------------------
+
+    def _write(self, url: str, entry: Dict[str, Any]) -> None:
+        path = self._path(url)
+        data = json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            try:
+                previous = path.stat().st_size
+            except OSError:
+                previous = 0
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            return  # caching is best-effort
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data) - previous
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _scan_size(self) -> int:
+        return sum(p.stat().st_size for p in self.directory.glob("*.json"))
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until 90% of the size bound."""
+        entries = []
+        for p in self.directory.glob("*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+        size = sum(e[1] for e in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, entry_size, p in entries:
+            if size <= target:
+                break
+            try:
+                p.unlink()
+                size -= entry_size
+            except OSError:
+                pass
+        self._size = size
+
+    def stats(self) -> Dict[str, Any]:
+        files = list(self.directory.glob("*.json")) if self.directory.exists() else []
+        return {
+            "cache_dir": str(self.directory),
+            "entries": len(files),
+            "size_bytes": sum(p.stat().st_size for p in files),
+            "max_bytes": self.max_bytes,
+            "fresh_ttl_seconds": self.fresh_ttl,
+        }
+
+    def clear(self) -> int:
+        count = 0
+        for p in self.directory.glob("*.json") if self.directory.exists() else []:
+            try:
+                p.unlink()
+                count += 1
+            except OSError:
+                pass
+        with self._lock:
+            self._size = 0
+        return count
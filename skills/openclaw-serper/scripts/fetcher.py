@@ -0,0 +1,315 @@
+"""
+Bounded page fetcher for content enrichment.
+
+One FetchEngine is shared by every enrichment in the process:
+  - a fixed-size worker pool caps total concurrent fetches
+  - per-host slots stop a single site from taking every worker
+  - a urllib3 PoolManager keeps connections alive across fetches
+  - fetches that miss their deadline are cancelled, not abandoned:
+    queued fetches never start, in-flight reads stop at the next chunk
+  - bodies are streamed up to a per-content-type byte cap; responses of a
+    type the caller did not ask for are closed before the body is read, and
+    types that are useless when cut short (PDF) are dropped as soon as they
+    are known to exceed their cap
+  - workers are daemon threads, so a fetch still extracting when the caller
+    gives up never holds the interpreter open at exit
+
+urllib3 ships with trafilatura, so this adds no new dependency.
+"""
+
+import atexit
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+import urllib3
+
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_PER_HOST = 4
+DEFAULT_TIMEOUT = 3.0
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+class FetchCancelled(Exception):
+    """Raised inside a fetch that was cancelled or ran past its deadline."""
+
+
+class FetchRejected(Exception):
+    """Raised when a response has a content type the engine does not accept."""
+
+
+class FetchResult:
+    """Outcome of a completed fetch. `truncated` is set when the byte cap cut the body short."""
+
+    __slots__ = ("url", "status", "headers", "content_type", "body", "truncated", "elapsed")
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], content_type: str,
+                 body: bytes, truncated: bool, elapsed: float):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.content_type = content_type
+        self.body = body
+        self.truncated = truncated
+        self.elapsed = elapsed
+
+
+class _DaemonPool:
+    """
+    Fixed-size pool of daemon worker threads with the submit/shutdown API of
+    ThreadPoolExecutor. concurrent.futures joins ThreadPoolExecutor workers at
+    interpreter exit, whatever shutdown(wait=False) says, so one abandoned
+    fetch stuck in extraction would keep the process alive; these are left
+    behind instead.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str):
+        self._max_workers = max_workers
+        self._prefix = thread_name_prefix
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._idle = threading.Semaphore(0)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def submit(self, fn: Callable, *args) -> Future:
+        future: Future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            self._queue.put((future, fn, args))
+            if not self._idle.acquire(blocking=False) and len(self._threads) < self._max_workers:
+                thread = threading.Thread(target=self._work, name=f"{self._prefix}_{len(self._threads)}",
+                                          daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return future
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        with self._lock:
+            self._shutdown = True
+            if cancel_futures:
+                while True:
+                    try:
+                        work = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if work is not None:
+                        work[0].cancel()
+            for _ in self._threads:
+                self._queue.put(None)
+            threads = list(self._threads)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def _work(self) -> None:
+        while True:
+            work = self._queue.get()
+            if work is None:
+                return
+            future, fn, args = work
+            del work
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            del future
+            self._idle.release()
+
+
+class FetchEngine:
+    """Reusable, bounded fetcher with keep-alive and real cancellation."""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, per_host: int = DEFAULT_PER_HOST,
+                 timeout: float = DEFAULT_TIMEOUT, user_agent: Optional[str] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES, accept: Optional[Dict[str, int]] = None,
+                 whole_only: Iterable[str] = ()):
+        """
+        Args:
+            max_workers: Fetches in flight across the engine
+            per_host: Fetches in flight against any single host
+            timeout: Default deadline, in seconds, for submit() without one
+            user_agent: User-Agent header for every request
+            max_bytes: Body cap for any content type when `accept` is not given
+            accept: Map of content type → body cap; other types are rejected
+                    (a missing Content-Type is treated as text/html)
+            whole_only: Content types that are useless truncated: rejected when
+                        Content-Length exceeds their cap, and abandoned as soon
+                        as the streamed body does
+        """
+        self.timeout = timeout
+        self.per_host = per_host
+        self.max_bytes = max_bytes
+        self.accept = accept
+        self.whole_only = frozenset(whole_only)
+        self._http = urllib3.PoolManager(
+            num_pools=64,
+            maxsize=per_host,
+            headers={"User-Agent": user_agent} if user_agent else None,
+            retries=urllib3.Retry(total=None, connect=0, read=0, status=0, other=0, redirect=5),
+        )
+        self._executor = _DaemonPool(max_workers=max_workers, thread_name_prefix="fetch")
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._cancel_events: "weakref.WeakKeyDictionary[Future, threading.Event]" = weakref.WeakKeyDictionary()
+        self._closed = False
+
+    # -------------------------------------------------------------------------
+
+    def submit(self, url: str, deadline: Optional[float] = None,
+               headers: Optional[Dict[str, str]] = None,
+               process: Optional[Callable[[FetchResult], Any]] = None) -> Future:
+        """
+        Schedule a GET for `url`.
+
+        Args:
+            url: Page URL
+            deadline: time.monotonic() value after which the fetch is cancelled
+                      (default: now + engine timeout)
+            headers: Extra request headers
+            process: Optional callable run on the worker with the FetchResult;
+                     its return value becomes the future's result
+
+        Returns:
+            Future resolving to a FetchResult, or to process(result) when given
+            (raises FetchCancelled / urllib3 errors on failure)
+        """
+        if self._closed:
+            raise RuntimeError("FetchEngine is shut down")
+        if deadline is None:
+            deadline = time.monotonic() + self.timeout
+        cancel = threading.Event()
+        future = self._executor.submit(self._run, url, deadline, headers or {}, cancel, process)
+        with self._lock:
+            self._cancel_events[future] = cancel
+        return future
+
+    def cancel(self, futures: Iterable[Future]) -> None:
+        """Cancel fetches: queued ones never start, running ones abort their read."""
+        for future in futures:
+            if future.cancel():
+                continue
+            with self._lock:
+                event = self._cancel_events.get(future)
+            if event is not None:
+                event.set()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Cancel everything outstanding and release pooled connections.
+
+        With wait=False, workers still busy (e.g. extracting a page nobody
+        will read) are not joined; being daemon threads, they end with the
+        process.
+        """
+        self._closed = True
+        with self._lock:
+            events = list(self._cancel_events.values())
+        for event in events:
+            event.set()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        if wait:
+            self._http.clear()
+
+    # -------------------------------------------------------------------------
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = (urlparse(url).hostname or "").lower()
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return slot
+
+    def _run(self, url: str, deadline: float, headers: Dict[str, str], cancel: threading.Event,
+             process: Optional[Callable[[FetchResult], Any]]) -> Any:
+        result = self._fetch(url, deadline, headers, cancel)
+        return process(result) if process is not None else result
+
+    def _byte_cap(self, content_type: str) -> Optional[int]:
+        if self.accept is None:
+            return self.max_bytes
+        return self.accept.get(content_type)
+
+    def _fetch(self, url: str, deadline: float, headers: Dict[str, str], cancel: threading.Event) -> FetchResult:
+        started = time.monotonic()
+        slot = self._host_slot(url)
+        if not slot.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise FetchCancelled(f"deadline passed waiting for a connection slot: {url}")
+        try:
+            remaining = deadline - time.monotonic()
+            if cancel.is_set() or remaining <= 0:
+                raise FetchCancelled(url)
+            # Socket timeouts never outlive the deadline, so a stalled read
+            # cannot keep the worker busy after the caller has given up
+            resp = self._http.request(
+                "GET", url, headers=headers, preload_content=False,
+                timeout=urllib3.Timeout(connect=remaining, read=remaining),
+            )
+            completed = False
+            try:
+                content_type = resp.headers.get("Content-Type", "").split(";")[0].strip().lower() or "text/html"
+                cap = self._byte_cap(content_type)
+                if cap is None:
+                    raise FetchRejected(f"{content_type}: {url}")
+                whole = content_type in self.whole_only
+                length = resp.headers.get("Content-Length", "")
+                if whole and length.isdigit() and int(length) > cap:
+                    raise FetchRejected(f"{content_type} of {length} bytes over the {cap} byte cap: {url}")
+                chunks = []
+                size = 0
+                truncated = False
+                for chunk in resp.stream(CHUNK_SIZE):
+                    if cancel.is_set() or time.monotonic() > deadline:
+                        raise FetchCancelled(url)
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size > cap:
+                        if whole:
+                            raise FetchRejected(f"{content_type} over the {cap} byte cap: {url}")
+                        truncated = True
+                        break
+                body = b"".join(chunks)[:cap]
+                completed = not truncated
+                return FetchResult(
+                    url=resp.geturl() or url,
+                    status=resp.status,
+                    headers={k.lower(): v for k, v in resp.headers.items()},
+                    content_type=content_type,
+                    body=body,
+                    truncated=truncated,
+                    elapsed=time.monotonic() - started,
+                )
+            finally:
+                if not completed:
+                    # Drop the half-read connection rather than draining it
+                    # (cancelled, rejected or truncated)
+                    resp.close()
+                resp.release_conn()
+        finally:
+            slot.release()
+
+
+_default_engine: Optional[FetchEngine] = None
+_default_lock = threading.Lock()
+
+
+def default_engine(**kwargs) -> FetchEngine:
+    """Process-wide engine, created on first use with the given settings."""
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            _default_engine = FetchEngine(**kwargs)
+            # Don't join workers at exit: the caller has its output by then
+            atexit.register(_default_engine.shutdown, wait=False)
+        return _default_engine
@@ -10,12 +10,22 @@ Locale is controlled via --gl and --hl flags.
 """
 
 import argparse
+import atexit
+import io
 import json
+import logging
+import multiprocessing
 import os
 import sys
-from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import weakref
+from functools import partial
+from concurrent.futures import (Future, ProcessPoolExecutor, ThreadPoolExecutor,
+                                TimeoutError as FuturesTimeout, as_completed)
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Iterator
 
 from urllib.request import Request, urlopen
 from urllib.error import HTTPError, URLError
@@ -29,6 +39,17 @@ except ImportError:
     }, indent=2), flush=True)
     sys.exit(1)
 
+try:
+    import pypdf  # optional: text extraction for PDF results
+    logging.getLogger("pypdf").setLevel(logging.ERROR)
+except ImportError:
+    pypdf = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from content_cache import ContentCache, DEFAULT_FRESH_TTL  # noqa: E402
+from fetcher import FetchEngine, FetchResult, default_engine  # noqa: E402
+
 
 # =============================================================================
 # Auto-load .env from skill directory
@@ -56,15 +77,17 @@ _load_env_file()
 # =============================================================================
 
 FETCH_TIMEOUT = 3
+FETCH_CONCURRENCY = 16   # page fetches in flight across the whole process
+FETCH_PER_HOST = 4       # page fetches in flight against any single host
+MAX_PAGE_BYTES = 256 * 1024       # HTML past this is cut; trafilatura extracts the prefix well inside FETCH_TIMEOUT
+MAX_PDF_BYTES = 10 * 1024 * 1024   # larger PDFs are not downloaded (only whole ones can be parsed)
+PDF_MAX_PAGES = 20
+HTML_TYPES = ("text/html", "application/xhtml+xml", "application/xml", "text/xml")
 USER_AGENT = "Mozilla/5.0 (compatible; Serper/3.0)"
 
 SERP_SEARCH_URL = "https://google.serper.dev/search"
 SERP_NEWS_URL = "https://google.serper.dev/news"
 
-# Trafilatura config — shared across all threads
-_traf_config = trafilatura.settings.use_config()
-_traf_config.set("DEFAULT", "DOWNLOAD_TIMEOUT", str(FETCH_TIMEOUT))
-
 
 def get_api_key() -> str:
     key = os.environ.get("SERPER_API_KEY") or os.environ.get("SERP_API_KEY")
@@ -87,23 +110,164 @@ def get_api_key() -> str:
 # Content extraction via trafilatura
 # =============================================================================
 
-def _extract_content(url: str) -> Optional[str]:
-    """Fetch a URL and extract clean readable text using trafilatura."""
+def _extract_content(fetched: FetchResult) -> Optional[str]:
+    """Extract clean readable text from a fetched page using trafilatura."""
+    if fetched.status != 200 or not fetched.body:
+        return None
+    if fetched.content_type == "application/pdf":
+        return _extract_pdf(fetched)
+    body = fetched.body
+    if fetched.truncated:
+        # Cut the prefix at a tag boundary so no multi-byte character is split
+        body = body[:body.rfind(b">") + 1] or body
     try:
-        downloaded = trafilatura.fetch_url(url, config=_traf_config)
-        if not downloaded:
-            return None
-        return trafilatura.extract(downloaded, include_links=False, include_images=False,
+        return trafilatura.extract(body, include_links=False, include_images=False,
                                    include_tables=True, deduplicate=True) or None
     except Exception:
         return None
 
 
+def _extract_pdf(fetched: FetchResult) -> Optional[str]:
+    """Extract text from the first pages of a PDF (needs pypdf; a truncated PDF is unreadable)."""
+    if pypdf is None or fetched.truncated:
+        return None
+    try:
+        reader = pypdf.PdfReader(io.BytesIO(fetched.body))
+        text = "\n".join(page.extract_text() or "" for page in reader.pages[:PDF_MAX_PAGES])
+        return text.strip() or None
+    except Exception:
+        return None
+
+
+def _accepted_types() -> Dict[str, int]:
+    """Content types worth downloading, with their byte caps; anything else is aborted unread."""
+    accept = {content_type: MAX_PAGE_BYTES for content_type in HTML_TYPES}
+    if pypdf is not None:
+        accept["application/pdf"] = MAX_PDF_BYTES
+    return accept
+
+
+_extract_pool: Optional[ProcessPoolExecutor] = None
+_extract_pool_workers: Optional[int] = None
+_extract_pool_lock = threading.Lock()
+_retired_pools: "weakref.WeakSet[ProcessPoolExecutor]" = weakref.WeakSet()
+
+
+def get_extract_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Shared process pool for extraction, created on first use and kept for the
+    life of the process so long-running callers pay worker startup once.
+
+    Workers start lazily on the first submit, which comes from a fetch thread
+    while other threads hold urllib3/logging locks, so they are never forked
+    from this process: forkserver (or spawn) starts them from a clean one.
+    """
+    global _extract_pool, _extract_pool_workers
+    with _extract_pool_lock:
+        if _extract_pool is None:
+            _extract_pool_workers = workers or _extract_pool_workers or os.cpu_count() or 1
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _extract_pool = ProcessPoolExecutor(max_workers=_extract_pool_workers,
+                                                mp_context=multiprocessing.get_context(method))
+            atexit.register(_extract_pool.shutdown, wait=False, cancel_futures=True)
+        return _extract_pool
+
+
+def _retire_extract_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Kill a pool whose worker is still busy with an abandoned extraction; the
+    next get_extract_pool() starts a fresh one of the same size.
+
+    A running future cannot be cancelled, so without this a pathological page
+    keeps its worker (and a CPU) long after the deadline, and enough of them
+    starve every later query. Other extractions still running in the pool
+    are lost and fall back to their snippets.
+    """
+    global _extract_pool
+    with _extract_pool_lock:
+        if pool in _retired_pools:
+            return
+        _retired_pools.add(pool)
+        if _extract_pool is pool:
+            _extract_pool = None
+    # ProcessPoolExecutor has no public way to stop a running task
+    workers = list((pool._processes or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for worker in workers:
+        worker.terminate()
+
+
+def _run_extraction(fetched: FetchResult, deadline: float,
+                    extract_pool: Optional[ProcessPoolExecutor]) -> Optional[str]:
+    """
+    Extract on this thread, or hand the downloaded bytes to the process pool.
+
+    The deadline only bounds the wait. On the fetch threads an extraction
+    that misses it still runs to the end and its text is dropped; in the
+    process pool a worker still extracting at the deadline is killed.
+    """
+    if extract_pool is None or fetched.status != 200 or not fetched.body:
+        return _extract_content(fetched)
+    if extract_pool in _retired_pools:
+        extract_pool = get_extract_pool()
+    try:
+        future = extract_pool.submit(_extract_content, fetched)
+    except RuntimeError:  # retired by another thread since the check above
+        return None
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except FuturesTimeout:
+        if not future.cancel():
+            _retire_extract_pool(extract_pool)
+        return None
+    except BrokenProcessPool:  # a worker died, so nothing more can run in this pool
+        _retire_extract_pool(extract_pool)
+        return None
+    except Exception:
+        return None
+
+
+def _extract_cached(fetched: FetchResult, url: str, entry: Optional[Dict[str, Any]],
+                    cache: Optional[ContentCache], deadline: float,
+                    extract_pool: Optional[ProcessPoolExecutor] = None) -> Optional[str]:
+    """Extract a fetched page, answering 304s from the cache and storing new text."""
+    if cache is None:
+        return _run_extraction(fetched, deadline, extract_pool)
+    if fetched.status == 304 and entry:
+        cache.revalidated(url, entry)
+        return entry.get("text")
+    text = _run_extraction(fetched, deadline, extract_pool)
+    if text:
+        cache.put(url, text, etag=fetched.headers.get("etag"),
+                  last_modified=fetched.headers.get("last-modified"))
+    return text
+
+
+def _start_enrichment(url: str, engine: FetchEngine, deadline: float, cache: Optional[ContentCache],
+                      extract_pool: Optional[ProcessPoolExecutor] = None) -> Future:
+    """Future for a page's text: served from cache when fresh, else a (conditional) fetch."""
+    entry = cache.get(url) if cache else None
+    if entry and cache.is_fresh(entry):
+        done: Future = Future()
+        done.set_result(entry.get("text"))
+        return done
+    headers = ContentCache.conditional_headers(entry) if entry else None
+    return engine.submit(url, deadline=deadline, headers=headers,
+                         process=partial(_extract_cached, url=url, entry=entry, cache=cache,
+                                         deadline=deadline, extract_pool=extract_pool))
+
+
+def get_fetch_engine(concurrency: int = FETCH_CONCURRENCY, per_host: int = FETCH_PER_HOST) -> FetchEngine:
+    """Shared fetch engine; the first caller's limits apply for the life of the process."""
+    return default_engine(max_workers=concurrency, per_host=per_host, timeout=FETCH_TIMEOUT,
+                          user_agent=USER_AGENT, accept=_accepted_types(), whole_only=("application/pdf",))
+
+
 # =============================================================================
 # Serper API
 # =============================================================================
 
-def _serper_post(endpoint: str, api_key: str, payload: dict) -> dict:
+def _serper_post(endpoint: str, api_key: str, payload: dict, timeout: float = 10) -> dict:
     """POST to Serper API and return parsed JSON."""
     headers = {
         "X-API-KEY": api_key,
@@ -113,7 +277,7 @@ def _serper_post(endpoint: str, api_key: str, payload: dict) -> dict:
     data = json.dumps(payload).encode("utf-8")
     req = Request(endpoint, data=data, headers=headers, method="POST")
     try:
-        with urlopen(req, timeout=10) as resp:
+        with urlopen(req, timeout=timeout) as resp:
             return json.loads(resp.read().decode("utf-8"))
     except HTTPError as e:
         body = e.read().decode("utf-8", errors="replace") if e.fp else ""
@@ -130,7 +294,7 @@ def _serper_post(endpoint: str, api_key: str, payload: dict) -> dict:
 
 def serper_web_search(query: str, api_key: str, num: int = 5,
                       gl: Optional[str] = None, hl: str = "en",
-                      tbs: Optional[str] = None) -> List[Dict[str, Any]]:
+                      tbs: Optional[str] = None, timeout: float = 10) -> List[Dict[str, Any]]:
     """Web search via Serper. Returns list of result dicts."""
     payload: Dict[str, Any] = {"q": query, "num": num, "hl": hl, "autocorrect": True}
     if gl and gl != "world":
@@ -138,7 +302,7 @@ def serper_web_search(query: str, api_key: str, num: int = 5,
     if tbs:
         payload["tbs"] = tbs
 
-    data = _serper_post(SERP_SEARCH_URL, api_key, payload)
+    data = _serper_post(SERP_SEARCH_URL, api_key, payload, timeout=timeout)
     results = []
 
     kg = data.get("knowledgeGraph")
@@ -167,13 +331,13 @@ def serper_web_search(query: str, api_key: str, num: int = 5,
 
 
 def serper_news_search(query: str, api_key: str, num: int = 3,
-                       gl: Optional[str] = None, hl: str = "en") -> List[Dict[str, Any]]:
+                       gl: Optional[str] = None, hl: str = "en", timeout: float = 10) -> List[Dict[str, Any]]:
     """News search via Serper. Returns list of result dicts."""
     payload: Dict[str, Any] = {"q": query, "num": num, "hl": hl}
     if gl and gl != "world":
         payload["gl"] = gl
 
-    data = _serper_post(SERP_NEWS_URL, api_key, payload)
+    data = _serper_post(SERP_NEWS_URL, api_key, payload, timeout=timeout)
     results = []
     for item in data.get("news", [])[:num]:
         r = {
@@ -192,59 +356,181 @@ def serper_news_search(query: str, api_key: str, num: int = 3,
 # Content enrichment — concurrent fetch, streamed as JSON array
 # =============================================================================
 
-def enrich_and_stream(results: List[Dict[str, Any]]):
-    """Fetch full page content concurrently, print each as JSON array element in order."""
-    futures = {}
-    pool = ThreadPoolExecutor(max_workers=max(1, len(results)))
-    for i, r in enumerate(results):
-        if r.get("url"):
-            futures[i] = pool.submit(_extract_content, r["url"])
+def _enriched_item(r: Dict[str, Any], content: Optional[str]) -> Dict[str, Any]:
+    """Build the output element for a result, falling back to its snippet."""
+    out: Dict[str, Any] = {"title": r["title"]}
+    if r.get("url"):
+        out["url"] = r["url"]
+    out["source"] = r["source"]
+    if r.get("date"):
+        out["date"] = r["date"]
+    out["content"] = content if content else r["snippet"]
+    return out
 
+
+def _content_or_none(future: Future, deadline: float) -> Optional[str]:
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except Exception:
+        return None
+
+
+def iter_enriched(results: List[Dict[str, Any]], engine: Optional[FetchEngine] = None,
+                  order: str = "rank", deadline: Optional[float] = None,
+                  cache: Optional[ContentCache] = None, started: Optional[Dict[str, Future]] = None,
+                  extract_pool: Optional[ProcessPoolExecutor] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Fetch full page content concurrently and yield each enriched result.
+
+    Args:
+        results: Search results (knowledge graph entries are yielded as-is)
+        engine: Fetch engine to use (default: the shared process engine)
+        order: "rank" yields in result order; "completion" yields each result as
+               soon as its page is extracted, tagged with its 1-based "rank"
+        deadline: time.monotonic() value bounding the whole enrichment
+                  (default: now + FETCH_TIMEOUT)
+        cache: Content cache to serve and revalidate pages from (default: none)
+        started: Enrichment futures already running, keyed by URL
+        extract_pool: Process pool to run extraction in (default: on the fetch threads)
+    """
+    engine = engine or get_fetch_engine()
+    if deadline is None:
+        deadline = time.monotonic() + FETCH_TIMEOUT
+
+    started = started or {}
+    futures: Dict[int, Future] = {}
     for i, r in enumerate(results):
-        out: Dict[str, Any] = {"title": r["title"]}
-        if r.get("url"):
-            out["url"] = r["url"]
-        out["source"] = r["source"]
-        if r.get("date"):
-            out["date"] = r["date"]
+        if r.get("url") and r["source"] != "knowledge_graph":
+            futures[i] = started.get(r["url"]) or _start_enrichment(r["url"], engine, deadline, cache, extract_pool)
 
-        if r["source"] == "knowledge_graph":
-            out["content"] = r["snippet"]
+    def item(i: int, content: Optional[str]) -> Dict[str, Any]:
+        out = _enriched_item(results[i], content)
+        if order == "completion":
+            out["rank"] = i + 1
+        return out
+
+    try:
+        if order == "completion":
+            for i in range(len(results)):
+                if i not in futures:
+                    yield item(i, None)
+            by_future = {f: i for i, f in futures.items()}
+            try:
+                for future in as_completed(by_future, timeout=max(0.0, deadline - time.monotonic())):
+                    yield item(by_future.pop(future), _content_or_none(future, deadline))
+            except FuturesTimeout:
+                pass
+            # Whatever missed the deadline goes out with its snippet, in rank order
+            for i in sorted(by_future.values()):
+                yield item(i, None)
         else:
-            content = None
-            if i in futures:
-                try:
-                    content = futures[i].result(timeout=FETCH_TIMEOUT)
-                except Exception:
-                    content = None
-            out["content"] = content if content else r["snippet"]
+            for i in range(len(results)):
+                yield item(i, _content_or_none(futures[i], deadline) if i in futures else None)
+    finally:
+        # Stop stragglers now instead of letting them fetch after output ends
+        engine.cancel(list(futures.values()) + list(started.values()))
+
 
+def enrich_and_stream(results: List[Dict[str, Any]], engine: Optional[FetchEngine] = None, **kwargs):
+    """Print each enriched result (see iter_enriched) as a JSON array element."""
+    for out in iter_enriched(results, engine, **kwargs):
         print("," + json.dumps(out, ensure_ascii=False), flush=True)
 
-    pool.shutdown(wait=False)
 
+def search_current(query: str, api_key: str, locale: Dict[str, Optional[str]],
+                   on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                   timeout: float = 10) -> List[Dict[str, Any]]:
+    """
+    Current/news mode: past week web + news search, 3 results each.
 
-def search_current(query: str, api_key: str, locale: Dict[str, Optional[str]]) -> List[Dict[str, Any]]:
-    """Current/news mode: past week web + news search, 3 results each."""
-    all_results = []
+    The web and news requests run concurrently. As each response arrives,
+    on_result(result) is called once per new URL so page fetches can start
+    while the other request is still in flight. The returned list keeps web
+    results ahead of news, deduplicated by URL.
+    """
+    batches: Dict[str, List[Dict[str, Any]]] = {"web": [], "news": []}
     seen_urls = set()
 
-    for r in serper_web_search(query, api_key, num=3, gl=locale["gl"], hl=locale["hl"], tbs="qdr:w"):
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        pending = {
+            pool.submit(serper_web_search, query, api_key, num=3, gl=locale["gl"], hl=locale["hl"], tbs="qdr:w",
+                        timeout=timeout): "web",
+            pool.submit(serper_news_search, query, api_key, num=3, gl=locale["gl"], hl=locale["hl"],
+                        timeout=timeout): "news",
+        }
+        for future in as_completed(pending):
+            batch = batches[pending[future]] = future.result()
+            for r in batch:
+                url = r.get("url")
+                if url and url not in seen_urls:
+                    seen_urls.add(url)
+                    if on_result:
+                        on_result(r)
+
+    all_results = []
+    seen_urls = set()
+    for r in batches["web"] + batches["news"]:
         if r["source"] == "knowledge_graph":
             all_results.append(r)
-        elif r["url"] not in seen_urls:
-            seen_urls.add(r["url"])
-            all_results.append(r)
-
-    for r in serper_news_search(query, api_key, num=3, gl=locale["gl"], hl=locale["hl"]):
-        url = r.get("url", "")
-        if url not in seen_urls:
-            seen_urls.add(url)
+        elif r.get("url", "") not in seen_urls:
+            seen_urls.add(r.get("url", ""))
             all_results.append(r)
 
     return all_results
 
 
+def run_search(query: str, api_key: str, mode: str = "default",
+               locale: Optional[Dict[str, Optional[str]]] = None,
+               engine: Optional[FetchEngine] = None, cache: Optional[ContentCache] = None,
+               budget: float = FETCH_TIMEOUT, order: str = "rank",
+               extract_pool: Optional[ProcessPoolExecutor] = None, deadline: Optional[float] = None):
+    """
+    Search and start enrichment — the in-process equivalent of the CLI.
+
+    `deadline` (a time.monotonic() value) bounds the whole call for callers
+    with their own time limit: the Serper requests time out by then and
+    enrichment gets min(budget, time left), so nothing runs past it.
+
+    Returns:
+        (metadata dict, iterator of enriched results), or (None, empty iterator)
+        when the search found nothing
+    """
+    locale = locale or {"gl": "world", "hl": "en"}
+    engine = engine or get_fetch_engine()
+    started: Dict[str, Future] = {}
+
+    def time_left(cap: float) -> float:
+        return cap if deadline is None else max(0.0, min(cap, deadline - time.monotonic()))
+
+    def start_early(r: Dict[str, Any]):
+        started[r["url"]] = _start_enrichment(r["url"], engine, time.monotonic() + time_left(budget),
+                                              cache, extract_pool)
+
+    timeout = time_left(10)
+    if timeout <= 0:
+        raise TimeoutError("deadline passed before the search started")
+    if mode == "current":
+        results = search_current(query, api_key, locale, on_result=start_early, timeout=timeout)
+    else:
+        results = serper_web_search(query, api_key, num=5, gl=locale["gl"], hl=locale["hl"], timeout=timeout)
+
+    if not results:
+        return None, iter(())
+
+    meta = {
+        "query": query,
+        "mode": mode,
+        "locale": locale,
+        "results": [
+            {k: r[k] for k in ("title", "url", "source") if k in r}
+            for r in results
+        ],
+    }
+    enriched = iter_enriched(results, engine, order=order, deadline=time.monotonic() + time_left(budget),
+                             cache=cache, started=started, extract_pool=extract_pool)
+    return meta, enriched
+
+
 # =============================================================================
 # CLI
 # =============================================================================
@@ -253,7 +539,7 @@ def main():
     parser = argparse.ArgumentParser(
         description="Serper — Google search with full content extraction",
     )
-    parser.add_argument("--query", "-q", required=True, help="Search query")
+    parser.add_argument("--query", "-q", help="Search query")
     parser.add_argument(
         "--mode", "-m",
         default="default",
@@ -262,32 +548,53 @@ def main():
     )
     parser.add_argument("--gl", default="world", help="Country code for Google (e.g. de, us, at, ch). Default: world")
     parser.add_argument("--hl", default="en", help="Language code for results (e.g. en, de)")
+    parser.add_argument("--fetch-concurrency", type=int, default=FETCH_CONCURRENCY,
+                        help=f"Max page fetches in flight (default: {FETCH_CONCURRENCY})")
+    parser.add_argument("--per-host", type=int, default=FETCH_PER_HOST,
+                        help=f"Max page fetches in flight per host (default: {FETCH_PER_HOST})")
+    parser.add_argument("--stream-order", default="rank", choices=["rank", "completion"],
+                        help="Print results in rank order, or as each page finishes (tagged with \"rank\")")
+    parser.add_argument("--deadline", type=float, default=FETCH_TIMEOUT,
+                        help=f"Overall seconds allowed for page enrichment (default: {FETCH_TIMEOUT})")
+    parser.add_argument("--extract-mode", default="thread", choices=["thread", "process"],
+                        help="Run page extraction on the fetch threads or in a process pool (default: thread)")
+    parser.add_argument("--extract-workers", type=int,
+                        help="Process pool size for --extract-mode process (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the extracted-content cache")
+    parser.add_argument("--cache-ttl", type=int, default=DEFAULT_FRESH_TTL,
+                        help=f"Seconds a cached page is served without revalidation (default: {DEFAULT_FRESH_TTL})")
+    parser.add_argument("--cache-stats", action="store_true", help="Show content cache statistics and exit")
+    parser.add_argument("--clear-cache", action="store_true", help="Delete all cached page content and exit")
 
     args = parser.parse_args()
-    api_key = get_api_key()
-    locale = {"gl": args.gl, "hl": args.hl}
 
-    if args.mode == "current":
-        results = search_current(args.query, api_key, locale)
-    else:
-        results = serper_web_search(args.query, api_key, num=5, gl=locale["gl"], hl=locale["hl"])
+    # Cache maintenance needs neither a query nor an API key
+    if args.clear_cache:
+        print(json.dumps({"cleared": ContentCache().clear()}), flush=True)
+        return
+    if args.cache_stats:
+        print(json.dumps(ContentCache(fresh_ttl=max(0, args.cache_ttl)).stats()), flush=True)
+        return
+    if not args.query:
+        parser.error("the following arguments are required: --query/-q")
 
-    if not results:
+    api_key = get_api_key()
+    meta, enriched = run_search(
+        args.query, api_key, mode=args.mode, locale={"gl": args.gl, "hl": args.hl},
+        engine=get_fetch_engine(max(1, args.fetch_concurrency), max(1, args.per_host)),
+        cache=None if args.no_cache else ContentCache(fresh_ttl=max(0, args.cache_ttl)),
+        budget=max(0.0, args.deadline), order=args.stream_order,
+        extract_pool=get_extract_pool(args.extract_workers) if args.extract_mode == "process" else None,
+    )
+
+    if meta is None:
         print(json.dumps({"error": "No results found", "query": args.query}), flush=True)
         sys.exit(1)
 
     # JSON array — first element is search metadata
-    meta = {
-        "query": args.query,
-        "mode": args.mode,
-        "locale": locale,
-        "results": [
-            {k: r[k] for k in ("title", "url", "source") if k in r}
-            for r in results
-        ],
-    }
     print("[" + json.dumps(meta, ensure_ascii=False), flush=True)
-    enrich_and_stream(results)
+    for out in enriched:
+        print("," + json.dumps(out, ensure_ascii=False), flush=True)
     print("]", flush=True)
 
 
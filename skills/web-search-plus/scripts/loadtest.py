@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Web Search Plus — Offline Load Generator
+
+Drives concurrent searches through search.py's full pipeline (routing, cache,
+retries, fallback, cooldown) against the local stub server in mock_server.py
+and reports throughput and tail latency. No real API credits are used.
+
+Usage:
+    python3 scripts/loadtest.py                                   # in-process mock, defaults
+    python3 scripts/loadtest.py -n 500 -c 32 --unique 50          # 500 searches over 50 distinct queries
+    python3 scripts/loadtest.py --latency-ms 300 --jitter-ms 200 --error-rate 0.2 --no-cache
+    python3 scripts/loadtest.py --mock-url http://127.0.0.1:8765  # use an already running mock_server.py
+    python3 scripts/loadtest.py --search-args "-p serper --fields title,url"
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shlex
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mock_server  # noqa: E402
+
+
+DEFAULT_QUERIES = [
+    "iPhone 16 Pro price",
+    "how does quantum entanglement work",
+    "startups similar to Notion",
+    "what is the current status of Ethereum",
+    "latest AI regulation news",
+    "search privately without tracking",
+    "best laptop to buy 2026",
+    "explain transformer attention",
+    "companies like Stripe",
+    "weather in Vienna",
+]
+
+DUMMY_KEYS = {
+    "SERPER_API_KEY": "mock-serper-key",
+    "TAVILY_API_KEY": "mock-tavily-key",
+    "EXA_API_KEY": "mock-exa-key-000",
+    "YOU_API_KEY": "mock-you-key-000",
+    "KILOCODE_API_KEY": "mock-kilo-key-00",
+}
+
+
+def _load_queries(args: argparse.Namespace) -> List[str]:
+    if args.queries:
+        with open(args.queries, "r", encoding="utf-8") as f:
+            base = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    else:
+        base = DEFAULT_QUERIES
+    # Widen the query set to --unique distinct queries to control the cache hit ratio
+    queries = []
+    for i in range(args.unique or len(base)):
+        q = base[i % len(base)]
+        queries.append(q if i < len(base) else f"{q} #{i // len(base)}")
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Offline load generator for web-search-plus",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--requests", "-n", type=int, default=200, help="Total searches to run (default: 200)")
+    parser.add_argument("--concurrency", "-c", type=int, default=16, help="Searches in flight at once (default: 16)")
+    parser.add_argument("--queries", help="File with one query per line (default: built-in mixed-intent set)")
+    parser.add_argument("--unique", type=int, help="Number of distinct queries to cycle through")
+    parser.add_argument("--search-args", default="", help="Extra search.py options applied to every search")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the result cache")
+    parser.add_argument("--cache-dir", help="Cache/health directory (default: fresh temp dir)")
+    parser.add_argument("--timeout", type=int, default=5, help="Provider client timeout in seconds (default: 5)")
+    parser.add_argument("--mock-url", help="Use a running mock_server.py instead of starting one in-process")
+    parser.add_argument("--port", type=int, default=0, help="Port for the in-process mock (default: ephemeral)")
+    parser.add_argument("--verbose", action="store_true", help="Show search.py fallback messages on stderr")
+    mock_server.add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    # Isolate cache, provider health and the query log from real usage
+    os.environ["WSP_CACHE_DIR"] = args.cache_dir or tempfile.mkdtemp(prefix="wsp-loadtest-")
+    os.environ["WSP_QUERY_LOG"] = "0"
+    os.environ["SEARXNG_ALLOW_PRIVATE"] = "1"
+
+    server = state = None
+    if args.mock_url:
+        base_url = args.mock_url.rstrip("/")
+    else:
+        server, state, base_url = mock_server.start_server(port=args.port, faults=mock_server.faults_from_args(args))
+
+    for env_var, value in DUMMY_KEYS.items():
+        os.environ.setdefault(env_var, value)
+    os.environ["SEARXNG_INSTANCE_URL"] = f"{base_url}/searxng"
+
+    import search as wsp  # imported late so WSP_CACHE_DIR takes effect
+
+    config = wsp.load_config()
+    for provider, override in mock_server.mock_config_overrides(base_url).items():
+        section = {k: v for k, v in config.get(provider, {}).items() if k not in ("api_key", "apiKey")}
+        config[provider] = {**section, **override, "timeout": args.timeout}
+
+    search_parser = wsp.build_parser(config)
+    extra = shlex.split(args.search_args) + (["--no-cache"] if args.no_cache else [])
+    queries = _load_queries(args)
+
+    def one(i: int) -> Dict[str, Any]:
+        search_args = search_parser.parse_args(["-q", queries[i % len(queries)], *extra])
+        t0 = time.perf_counter()
+        try:
+            result, error_result = wsp.run_search(search_args, config)
+        except SystemExit:
+            result, error_result = None, {"error": "missing credentials"}
+        except Exception as e:
+            result, error_result = None, {"error": str(e)}
+        sample = {"ms": (time.perf_counter() - t0) * 1000, "ok": result is not None}
+        if result is not None:
+            routing = result.get("routing", {})
+            sample.update(cached=bool(result.get("cached")), provider=routing.get("provider"),
+                          fallback=bool(routing.get("fallback_used")))
+        else:
+            sample["error"] = error_result.get("error")
+        return sample
+
+    stderr_sink = contextlib.nullcontext() if args.verbose else contextlib.redirect_stderr(io.StringIO())
+    started = time.perf_counter()
+    with stderr_sink, ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        samples = list(pool.map(one, range(args.requests)))
+    wall = time.perf_counter() - started
+
+    ok = [s for s in samples if s["ok"]]
+    misses = [round(s["ms"]) for s in ok if not s["cached"]]
+    served_by: Dict[str, int] = {}
+    for s in ok:
+        served_by[s["provider"]] = served_by.get(s["provider"], 0) + 1
+    errors: Dict[str, int] = {}
+    for s in samples:
+        if not s["ok"]:
+            errors[s["error"]] = errors.get(s["error"], 0) + 1
+
+    report = {
+        "requests": len(samples),
+        "concurrency": args.concurrency,
+        "distinct_queries": len(queries),
+        "ok": len(ok),
+        "failed": len(samples) - len(ok),
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(samples) / wall, 2) if wall else None,
+        "latency": {**wsp._latency_summary([round(s["ms"]) for s in samples]),
+                    "max_ms": round(max(s["ms"] for s in samples)) if samples else None},
+        "provider_call_latency": wsp._latency_summary(misses),
+        "cache_hit_rate": round(sum(1 for s in ok if s["cached"]) / len(samples), 3) if samples else 0,
+        "fallbacks": sum(1 for s in ok if s["fallback"]),
+        "served_by": served_by,
+        "errors": errors,
+        "provider_health": wsp._load_provider_health(),
+        "mock_url": base_url,
+        "cache_dir": os.environ["WSP_CACHE_DIR"],
+    }
+    if state is not None:
+        report["mock_stats"] = state.snapshot()["stats"]
+        server.shutdown()
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Web Search Plus — Local Stub Provider Server
+
+Imitates every provider endpoint used by search.py so fallback, cooldown and
+caching behavior can be exercised (and load-tested) without spending real
+API credits. Each provider is served under its own path prefix:
+
+    http://127.0.0.1:8765/serper       → POST /search, /news, /images, ...
+    http://127.0.0.1:8765/tavily       → POST /search
+    http://127.0.0.1:8765/exa          → POST /search, /findSimilar
+    http://127.0.0.1:8765/perplexity   → POST /chat/completions
+    http://127.0.0.1:8765/you          → GET  /v1/search
+    http://127.0.0.1:8765/searxng      → GET  /search?format=json
+
+Point search.py at it via config.json:
+
+    "serper":  {"base_url": "http://127.0.0.1:8765/serper"},
+    "searxng": {"instance_url": "http://127.0.0.1:8765/searxng"}   (+ SEARXNG_ALLOW_PRIVATE=1)
+
+Faults can be injected at startup, at runtime, or per request:
+
+    python3 mock_server.py --latency-ms 200 --jitter-ms 100 --error-rate 0.1 --error-codes 429,503
+    curl -X POST localhost:8765/_control -d '{"provider": "serper", "error_rate": 1.0, "error_codes": [503]}'
+    curl -H 'X-Mock-Fault: timeout' ...                         # force one fault (429, 503, timeout)
+    curl localhost:8765/_stats                                  # per-provider request counters
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+PROVIDERS = ("serper", "tavily", "exa", "perplexity", "you", "searxng")
+SEARXNG_PAGES = 5          # pages of results the fake SearXNG has before it runs dry
+SEARXNG_PAGE_SIZE = 20
+
+DEFAULT_FAULTS = {
+    "latency_ms": 0,
+    "jitter_ms": 0,
+    "error_rate": 0.0,
+    "error_codes": [429, 503],
+    "timeout_rate": 0.0,
+    "hang_seconds": 35,  # longer than search.py's default 30s client timeout
+}
+
+
+class MockState:
+    """Fault configuration and request counters, shared by all handler threads."""
+
+    def __init__(self, faults: Optional[Dict[str, Any]] = None):
+        self.lock = threading.Lock()
+        base = {**DEFAULT_FAULTS, **(faults or {})}
+        self.faults = {p: dict(base) for p in PROVIDERS}
+        self.stats = {p: {"requests": 0, "ok": 0, "errors": 0, "timeouts": 0} for p in PROVIDERS}
+
+    def update(self, changes: Dict[str, Any], provider: Optional[str] = None) -> None:
+        changes = {k: v for k, v in changes.items() if k in DEFAULT_FAULTS}
+        with self.lock:
+            for p in ([provider] if provider else PROVIDERS):
+                self.faults[p].update(changes)
+
+    def count(self, provider: str, outcome: str) -> None:
+        with self.lock:
+            self.stats[provider]["requests"] += 1
+            self.stats[provider][outcome] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {"faults": json.loads(json.dumps(self.faults)), "stats": json.loads(json.dumps(self.stats))}
+
+
+# =============================================================================
+# Fake Payloads
+# =============================================================================
+
+def _fake_items(query: str, count: int, provider: str, offset: int = 0):
+    """Deterministic fake results so repeated queries return identical data; `offset` skips earlier pages."""
+    seed = hashlib.sha256(f"{provider}:{query}".encode("utf-8")).hexdigest()[:8]
+    for i in range(offset, offset + max(0, min(int(5 if count is None else count), 100))):
+        yield {
+            "title": f"{query} — result {i + 1}",
+            "url": f"https://example-{seed}-{i % 7}.com/{provider}/{i + 1}",
+            "snippet": f"Mock {provider} snippet {i + 1} for '{query}'. " * 3,
+            "score": round(1.0 - i * 0.05, 3),
+        }
+
+
+def payload_serper(path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    query = body.get("q", "")
+    if path.endswith("/images"):
+        return {"images": [{"imageUrl": f"https://img.example.com/{i}.jpg"} for i in range(5)]}
+    return {
+        "searchParameters": {"q": query},
+        "organic": [
+            {"title": it["title"], "link": it["url"], "snippet": it["snippet"], "position": i + 1}
+            for i, it in enumerate(_fake_items(query, body.get("num", 10), "serper"))
+        ],
+        "relatedSearches": [{"query": f"{query} alternatives"}],
+    }
+
+
+def payload_tavily(path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    query = body.get("query", "")
+    results = []
+    for it in _fake_items(query, body.get("max_results", 5), "tavily"):
+        item = {"title": it["title"], "url": it["url"], "content": it["snippet"], "score": it["score"]}
+        if body.get("include_raw_content"):
+            item["raw_content"] = it["snippet"] * 10
+        results.append(item)
+    return {
+        "query": query,
+        "results": results,
+        "images": [],
+        "answer": f"Mock answer for '{query}'." if body.get("include_answer") else None,
+    }
+
+
+def payload_exa(path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    query = body.get("query") or body.get("url", "")
+    contents = body.get("contents")
+    results = []
+    for it in _fake_items(query, body.get("numResults", 10), "exa"):
+        item = {"title": it["title"], "url": it["url"], "score": it["score"],
+                "publishedDate": "2026-01-01T00:00:00.000Z", "author": "Mock Author"}
+        if contents:
+            max_chars = (contents.get("text") or {}).get("maxCharacters", 1000)
+            item["text"] = (it["snippet"] * 20)[:max_chars]
+            if contents.get("highlights"):
+                item["highlights"] = [it["snippet"]]
+        results.append(item)
+    return {"results": results}
+
+
+def payload_perplexity(path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    messages = body.get("messages") or [{}]
+    query = messages[-1].get("content", "")
+    sources = [it["url"] for it in _fake_items(query, 3, "perplexity")]
+    content = f"Mock synthesized answer for '{query}' [1][2]. Sources: " + " ".join(sources)
+    return {
+        "choices": [{"message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 20, "completion_tokens": 40, "total_tokens": 60},
+    }
+
+
+def payload_you(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    query = params.get("query", "")
+    web = [
+        {"title": it["title"], "url": it["url"], "description": it["snippet"],
+         "snippets": [it["snippet"], f"Second snippet {i}"], "page_age": "2026-01-01T00:00:00"}
+        for i, it in enumerate(_fake_items(query, params.get("count", 5), "you"))
+    ]
+    news = [
+        {"title": f"News: {it['title']}", "url": it["url"] + "/news", "description": it["snippet"],
+         "page_age": "2026-01-01T00:00:00"}
+        for it in _fake_items(query, 2, "you-news")
+    ]
+    return {"results": {"web": web, "news": news}, "metadata": {"search_uuid": "mock", "latency": 0.01}}
+
+
+def payload_searxng(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    query = params.get("q", "")
+    try:
+        pageno = max(1, int(params.get("pageno", 1)))
+    except ValueError:
+        pageno = 1
+    count = SEARXNG_PAGE_SIZE if pageno <= SEARXNG_PAGES else 0
+    results = [
+        {"title": it["title"], "url": it["url"], "content": it["snippet"], "score": it["score"] * 3,
+         "engine": ("google", "bing", "duckduckgo")[i % 3], "engines": ["google", "bing"], "category": "general"}
+        for i, it in enumerate(_fake_items(query, count, "searxng", offset=(pageno - 1) * SEARXNG_PAGE_SIZE))
+    ]
+    return {"query": query, "number_of_results": len(results), "results": results,
+            "answers": [], "infoboxes": [], "suggestions": [], "corrections": []}
+
+
+PAYLOADS = {
+    "serper": payload_serper,
+    "tavily": payload_tavily,
+    "exa": payload_exa,
+    "perplexity": payload_perplexity,
+    "you": payload_you,
+    "searxng": payload_searxng,
+}
+
+
+# =============================================================================
+# HTTP Handler
+# =============================================================================
+
+def make_handler(state: MockState):
+    class MockProviderHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+            pass  # keep load tests quiet
+
+        def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_body(self) -> Dict[str, Any]:
+            length = int(self.headers.get("Content-Length") or 0)
+            if not length:
+                return {}
+            try:
+                return json.loads(self.rfile.read(length).decode("utf-8"))
+            except json.JSONDecodeError:
+                return {}
+
+        def _route(self) -> Tuple[Optional[str], str, Dict[str, Any]]:
+            parsed = urlparse(self.path)
+            parts = parsed.path.strip("/").split("/", 1)
+            provider = parts[0] if parts and parts[0] in PROVIDERS else None
+            params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            return provider, parsed.path, params
+
+        def _inject_fault(self, provider: str) -> bool:
+            """Apply latency and faults. Returns True if a fault response was sent."""
+            with state.lock:
+                faults = dict(state.faults[provider])
+            forced = (self.headers.get("X-Mock-Fault") or "").strip().lower()
+
+            delay = faults["latency_ms"] + random.uniform(0, faults["jitter_ms"])
+            if delay:
+                time.sleep(delay / 1000.0)
+
+            if forced == "timeout" or (not forced and random.random() < faults["timeout_rate"]):
+                state.count(provider, "timeouts")
+                time.sleep(faults["hang_seconds"])
+                self.close_connection = True
+                return True
+
+            status = None
+            if forced.isdigit():
+                status = int(forced)
+            elif random.random() < faults["error_rate"]:
+                status = random.choice(faults["error_codes"] or [503])
+            if status:
+                state.count(provider, "errors")
+                self._send_json(status, {"error": f"Mock {provider} error", "status": status})
+                return True
+            return False
+
+        def _handle(self, method: str) -> None:
+            provider, path, params = self._route()
+            body = self._read_body() if method == "POST" else {}
+
+            if path == "/_stats":
+                self._send_json(200, state.snapshot())
+                return
+            if path == "/_control" and method == "POST":
+                state.update(body, body.get("provider"))
+                self._send_json(200, state.snapshot())
+                return
+            if provider is None:
+                self._send_json(404, {"error": f"Unknown mock endpoint: {path}"})
+                return
+
+            if self._inject_fault(provider):
+                return
+            payload = PAYLOADS[provider](path, body if method == "POST" else params)
+            state.count(provider, "ok")
+            self._send_json(200, payload)
+
+        def do_GET(self) -> None:
+            self._handle("GET")
+
+        def do_POST(self) -> None:
+            self._handle("POST")
+
+    return MockProviderHandler
+
+
+def start_server(host: str = "127.0.0.1", port: int = 8765, faults: Optional[Dict[str, Any]] = None):
+    """
+    Start the mock server on a background thread.
+
+    Returns:
+        (server, state, base_url). Call server.shutdown() to stop it.
+    """
+    state = MockState(faults)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, state, f"http://{host}:{server.server_address[1]}"
+
+
+def mock_config_overrides(base_url: str) -> Dict[str, Dict[str, Any]]:
+    """Config sections that point every provider at a running mock server."""
+    return {
+        "serper": {"base_url": f"{base_url}/serper"},
+        "tavily": {"base_url": f"{base_url}/tavily"},
+        "exa": {"base_url": f"{base_url}/exa"},
+        "perplexity": {"base_url": f"{base_url}/perplexity"},
+        "you": {"base_url": f"{base_url}/you"},
+        "searxng": {"instance_url": f"{base_url}/searxng"},
+    }
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser) -> None:
+    """Fault injection options shared with scripts/loadtest.py."""
+    parser.add_argument("--latency-ms", type=float, default=0, help="Base latency added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra latency (0..N ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument("--error-codes", default="429,503", help="Comma-separated HTTP codes to inject (default: 429,503)")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Fraction of requests that hang until the client times out")
+    parser.add_argument("--hang-seconds", type=float, default=DEFAULT_FAULTS["hang_seconds"], help="How long a 'timeout' request hangs")
+
+
+def faults_from_args(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "error_rate": args.error_rate,
+        "error_codes": [int(c) for c in args.error_codes.split(",") if c.strip()],
+        "timeout_rate": args.timeout_rate,
+        "hang_seconds": args.hang_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub server imitating all web-search-plus providers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    server, _state, base_url = start_server(args.host, args.port, faults_from_args(args))
+    print(json.dumps({
+        "mock_server": base_url,
+        "config_overrides": mock_config_overrides(base_url),
+        "note": "Set SEARXNG_ALLOW_PRIVATE=1 to use the local SearXNG stub",
+    }, indent=2), file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
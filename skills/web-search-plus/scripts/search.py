@@ -23,10 +23,14 @@ Examples:
 import argparse
 import hashlib
 import json
+import math
 import os
 import re
+import shlex
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional, List, Dict, Any, Tuple
 from urllib.request import Request, urlopen
@@ -40,6 +44,10 @@ from urllib.parse import quote, urlparse
 
 CACHE_DIR = Path(os.environ.get("WSP_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")))
 PROVIDER_HEALTH_FILE = CACHE_DIR / "provider_health.json"
+QUERY_HISTORY_FILE = CACHE_DIR / "query_history.json"
+QUERY_LOG_FILE = CACHE_DIR / "query_log.jsonl"
+# Bookkeeping files that live in CACHE_DIR but are not cached search results
+CACHE_META_FILES = {PROVIDER_HEALTH_FILE.name, QUERY_HISTORY_FILE.name}
 DEFAULT_CACHE_TTL = 3600  # 1 hour in seconds
 
 
@@ -132,9 +140,13 @@ def cache_put(query: str, provider: str, max_results: int, result: Dict[str, Any
     cached_result["_cache_max_results"] = max_results
     cached_result["_cache_params"] = params or {}
     
+    # Write to a temp file and rename so concurrent writers (--prefetch,
+    # scripts/loadtest.py) never leave a half-written entry behind
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
     try:
-        with open(cache_path, "w", encoding="utf-8") as f:
-            json.dump(cached_result, f, ensure_ascii=False, indent=2)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cached_result, f, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+        os.replace(tmp_path, cache_path)
     except IOError as e:
         # Non-fatal: log to stderr but don't fail
         print(json.dumps({"cache_write_error": str(e)}), file=sys.stderr)
@@ -154,7 +166,7 @@ def cache_clear() -> Dict[str, Any]:
     size_freed = 0
     
     for cache_file in CACHE_DIR.glob("*.json"):
-        if cache_file.name == PROVIDER_HEALTH_FILE.name:
+        if cache_file.name in CACHE_META_FILES:
             continue
         try:
             size_freed += cache_file.stat().st_size
@@ -189,7 +201,7 @@ def cache_stats() -> Dict[str, Any]:
             "exists": False
         }
     
-    entries = [p for p in CACHE_DIR.glob("*.json") if p.name != PROVIDER_HEALTH_FILE.name]
+    entries = [p for p in CACHE_DIR.glob("*.json") if p.name not in CACHE_META_FILES]
     total_size = 0
     oldest_time = None
     newest_time = None
@@ -1272,6 +1284,8 @@ class ProviderRequestError(Exception):
 TRANSIENT_HTTP_CODES = {429, 503}
 COOLDOWN_STEPS_SECONDS = [60, 300, 1500, 3600]  # 1m -> 5m -> 25m -> 1h cap
 RETRY_BACKOFF_SECONDS = [1, 3, 9]
+# Guards read-modify-write of the health file when searches run in threads (--prefetch)
+_PROVIDER_HEALTH_LOCK = threading.Lock()
 
 
 def _ensure_parent(path: Path) -> None:
@@ -1304,27 +1318,29 @@ def provider_in_cooldown(provider: str) -> Tuple[bool, int]:
 
 
 def mark_provider_failure(provider: str, error_message: str) -> Dict[str, Any]:
-    state = _load_provider_health()
-    now = int(time.time())
-    pstate = state.get(provider, {})
-    fail_count = int(pstate.get("failure_count", 0)) + 1
-    cooldown_seconds = COOLDOWN_STEPS_SECONDS[min(fail_count - 1, len(COOLDOWN_STEPS_SECONDS) - 1)]
-    state[provider] = {
-        "failure_count": fail_count,
-        "cooldown_until": now + cooldown_seconds,
-        "cooldown_seconds": cooldown_seconds,
-        "last_error": error_message,
-        "last_failure_at": now,
-    }
-    _save_provider_health(state)
-    return state[provider]
+    with _PROVIDER_HEALTH_LOCK:
+        state = _load_provider_health()
+        now = int(time.time())
+        pstate = state.get(provider, {})
+        fail_count = int(pstate.get("failure_count", 0)) + 1
+        cooldown_seconds = COOLDOWN_STEPS_SECONDS[min(fail_count - 1, len(COOLDOWN_STEPS_SECONDS) - 1)]
+        state[provider] = {
+            "failure_count": fail_count,
+            "cooldown_until": now + cooldown_seconds,
+            "cooldown_seconds": cooldown_seconds,
+            "last_error": error_message,
+            "last_failure_at": now,
+        }
+        _save_provider_health(state)
+        return state[provider]
 
 
 def reset_provider_health(provider: str) -> None:
-    state = _load_provider_health()
-    if provider in state:
-        state.pop(provider, None)
-        _save_provider_health(state)
+    with _PROVIDER_HEALTH_LOCK:
+        state = _load_provider_health()
+        if provider in state:
+            state.pop(provider, None)
+            _save_provider_health(state)
 
 
 def normalize_result_url(url: str) -> str:
@@ -1338,25 +1354,213 @@ def normalize_result_url(url: str) -> str:
     return f"{netloc}{path}"
 
 
-def deduplicate_results_across_providers(results_by_provider: List[Tuple[str, Dict[str, Any]]], max_results: int) -> Tuple[List[Dict[str, Any]], int]:
+def deduplicate_results_across_providers(results_by_provider: List[Tuple[str, Dict[str, Any]]], max_results: int) -> Tuple[List["SearchResult"], int]:
     deduped = []
     seen = set()
     dedup_count = 0
     for provider_name, data in results_by_provider:
         for item in data.get("results", []):
-            norm = normalize_result_url(item.get("url", ""))
+            norm = normalize_result_url(item.url)
             if norm and norm in seen:
                 dedup_count += 1
                 continue
             if norm:
                 seen.add(norm)
-            item = item.copy()
-            item.setdefault("provider", provider_name)
+            # Each provider's result list is discarded after merging, so the
+            # result objects can be tagged in place instead of copied
+            if item.provider is None:
+                item.provider = provider_name
             deduped.append(item)
             if len(deduped) >= max_results:
                 return deduped, dedup_count
     return deduped, dedup_count
 
+
+# =============================================================================
+# Result Model
+# =============================================================================
+
+class SearchResult:
+    """
+    Compact, provider-agnostic search result.
+
+    Every provider normalizes its raw items through one of the from_*
+    constructors. Slots keep per-result memory small in large batch runs,
+    and to_dict() only emits the optional fields a provider actually set.
+    """
+
+    __slots__ = (
+        "title", "url", "snippet", "score", "date", "published_date", "author",
+        "source", "engine", "category", "additional_snippets", "thumbnail",
+        "favicon", "raw_content", "provider",
+    )
+
+    # Emitted by to_dict() only when not None, in this order
+    OPTIONAL_FIELDS = __slots__[3:]
+
+    def __init__(
+        self,
+        title: str = "",
+        url: str = "",
+        snippet: str = "",
+        score: Optional[float] = None,
+        date: Optional[str] = None,
+        published_date: Optional[str] = None,
+        author: Optional[str] = None,
+        source: Optional[str] = None,
+        engine: Optional[str] = None,
+        category: Optional[str] = None,
+        additional_snippets: Optional[List[str]] = None,
+        thumbnail: Optional[str] = None,
+        favicon: Optional[str] = None,
+        raw_content: Optional[str] = None,
+        provider: Optional[str] = None,
+    ):
+        self.title = title
+        self.url = url
+        self.snippet = snippet
+        self.score = score
+        self.date = date
+        self.published_date = published_date
+        self.author = author
+        self.source = source
+        self.engine = engine
+        self.category = category
+        self.additional_snippets = additional_snippets
+        self.thumbnail = thumbnail
+        self.favicon = favicon
+        self.raw_content = raw_content
+        self.provider = provider
+
+    def __repr__(self) -> str:
+        return f"SearchResult(title={self.title!r}, url={self.url!r})"
+
+    def to_dict(self, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Serialize to a plain dict, omitting unset optional fields.
+
+        If `fields` is given, only those fields are emitted (see --fields).
+        """
+        if fields is not None:
+            return {name: getattr(self, name) for name in fields
+                    if name in self.__slots__ and getattr(self, name) is not None}
+        data = {"title": self.title, "url": self.url, "snippet": self.snippet}
+        for name in self.OPTIONAL_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value
+        return data
+
+    @classmethod
+    def from_serper(cls, item: Dict[str, Any], rank: int) -> "SearchResult":
+        return cls(
+            title=item.get("title", ""),
+            url=item.get("link", ""),
+            snippet=item.get("snippet", ""),
+            score=round(1.0 - rank * 0.1, 2),
+            date=item.get("date"),
+        )
+
+    @classmethod
+    def from_tavily(cls, item: Dict[str, Any], include_raw_content: bool = False) -> "SearchResult":
+        return cls(
+            title=item.get("title", ""),
+            url=item.get("url", ""),
+            snippet=item.get("content", ""),
+            score=round(item.get("score", 0.0), 3),
+            raw_content=(item.get("raw_content") or None) if include_raw_content else None,
+        )
+
+    @classmethod
+    def from_exa(cls, item: Dict[str, Any]) -> "SearchResult":
+        highlights = item.get("highlights", [])
+        snippet = highlights[0] if highlights else (item.get("text", "") or "")[:500]
+        return cls(
+            title=item.get("title", ""),
+            url=item.get("url", ""),
+            snippet=snippet,
+            score=round(item.get("score", 0.0), 3),
+            published_date=item.get("publishedDate"),
+            author=item.get("author"),
+        )
+
+    @classmethod
+    def from_you_web(cls, item: Dict[str, Any], rank: int) -> "SearchResult":
+        snippets = item.get("snippets", [])
+        contents = item.get("contents")
+        return cls(
+            title=item.get("title", ""),
+            url=item.get("url", ""),
+            snippet=snippets[0] if snippets else item.get("description", ""),
+            score=round(1.0 - rank * 0.05, 3),  # Assign descending score
+            date=item.get("page_age"),
+            source="web",
+            # Additional snippets are great for RAG
+            additional_snippets=snippets[1:3] if len(snippets) > 1 else None,
+            thumbnail=item.get("thumbnail_url") or None,
+            favicon=item.get("favicon_url") or None,
+            # Live-crawled content, if requested
+            raw_content=(contents.get("markdown") or contents.get("html", "")) if contents else None,
+        )
+
+    @classmethod
+    def from_you_news(cls, item: Dict[str, Any]) -> "SearchResult":
+        return cls(
+            title=item.get("title", ""),
+            url=item.get("url", ""),
+            snippet=item.get("description", ""),
+            date=item.get("page_age"),
+            thumbnail=item.get("thumbnail_url"),
+            source="news",
+        )
+
+    @classmethod
+    def from_searxng(cls, item: Dict[str, Any], rank: int) -> "SearchResult":
+        return cls(
+            title=item.get("title", ""),
+            url=item.get("url", ""),
+            snippet=item.get("content", ""),
+            score=round(item.get("score", 1.0 - rank * 0.05), 3),
+            engine=item.get("engine", "unknown"),
+            category=item.get("category", "general"),
+            date=item.get("publishedDate"),
+        )
+
+
+# Fields accepted by --fields: any result field plus the top-level answer
+PROJECTABLE_FIELDS = SearchResult.__slots__ + ("answer",)
+
+
+def parse_fields(value: str) -> List[str]:
+    """argparse type for --fields: comma-separated list of projectable fields."""
+    fields = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in PROJECTABLE_FIELDS]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown field(s) {', '.join(unknown)}; choose from {', '.join(PROJECTABLE_FIELDS)}"
+        )
+    return fields
+
+
+def project_results(
+    results: List[SearchResult],
+    fields: Optional[List[str]] = None,
+    snippet_chars: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Apply --snippet-chars truncation and --fields projection to results."""
+    projected = []
+    for r in results:
+        if snippet_chars is not None and r.snippet and len(r.snippet) > snippet_chars:
+            r.snippet = r.snippet[:snippet_chars].rstrip() + "…"
+        projected.append(r.to_dict(fields))
+    return projected
+
+
+def _json_default(obj: Any) -> Any:
+    """json.dumps hook that serializes SearchResult objects without copying."""
+    if isinstance(obj, SearchResult):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
 # =============================================================================
 # HTTP Client
 # =============================================================================
@@ -1411,9 +1615,12 @@ def search_serper(
     search_type: str = "search",
     time_range: Optional[str] = None,
     include_images: bool = False,
+    base_url: str = "https://google.serper.dev",
+    timeout: int = 30,
 ) -> dict:
     """Search using Serper (Google Search API)."""
-    endpoint = f"https://google.serper.dev/{search_type}"
+    base_url = base_url.rstrip("/")
+    endpoint = f"{base_url}/{search_type}"
     
     body = {
         "q": query,
@@ -1439,17 +1646,12 @@ def search_serper(
         "Content-Type": "application/json",
     }
     
-    data = make_request(endpoint, headers, body)
+    data = make_request(endpoint, headers, body, timeout=timeout)
     
-    results = []
-    for i, item in enumerate(data.get("organic", [])[:max_results]):
-        results.append({
-            "title": item.get("title", ""),
-            "url": item.get("link", ""),
-            "snippet": item.get("snippet", ""),
-            "score": round(1.0 - i * 0.1, 2),
-            "date": item.get("date"),
-        })
+    results = [
+        SearchResult.from_serper(item, i)
+        for i, item in enumerate(data.get("organic", [])[:max_results])
+    ]
     
     answer = ""
     if data.get("answerBox", {}).get("answer"):
@@ -1459,15 +1661,16 @@ def search_serper(
     elif data.get("knowledgeGraph", {}).get("description"):
         answer = data["knowledgeGraph"]["description"]
     elif results:
-        answer = results[0]["snippet"]
+        answer = results[0].snippet
     
     images = []
     if include_images:
         try:
             img_data = make_request(
-                "https://google.serper.dev/images",
+                f"{base_url}/images",
                 headers,
                 {"q": query, "gl": country, "hl": language, "num": 5},
+                timeout=timeout,
             )
             images = [img.get("imageUrl", "") for img in img_data.get("images", [])[:5] if img.get("imageUrl")]
         except Exception:
@@ -1498,9 +1701,12 @@ def search_tavily(
     exclude_domains: Optional[List[str]] = None,
     include_images: bool = False,
     include_raw_content: bool = False,
+    include_answer: bool = True,
+    base_url: str = "https://api.tavily.com",
+    timeout: int = 30,
 ) -> dict:
     """Search using Tavily (AI Research Search)."""
-    endpoint = "https://api.tavily.com/search"
+    endpoint = f"{base_url.rstrip('/')}/search"
     
     body = {
         "api_key": api_key,
@@ -1509,7 +1715,7 @@ def search_tavily(
         "search_depth": depth,
         "topic": topic,
         "include_images": include_images,
-        "include_answer": True,
+        "include_answer": include_answer,
         "include_raw_content": include_raw_content,
     }
     
@@ -1520,19 +1726,12 @@ def search_tavily(
     
     headers = {"Content-Type": "application/json"}
     
-    data = make_request(endpoint, headers, body)
+    data = make_request(endpoint, headers, body, timeout=timeout)
     
-    results = []
-    for item in data.get("results", [])[:max_results]:
-        result = {
-            "title": item.get("title", ""),
-            "url": item.get("url", ""),
-            "snippet": item.get("content", ""),
-            "score": round(item.get("score", 0.0), 3),
-        }
-        if include_raw_content and item.get("raw_content"):
-            result["raw_content"] = item["raw_content"]
-        results.append(result)
+    results = [
+        SearchResult.from_tavily(item, include_raw_content)
+        for item in data.get("results", [])[:max_results]
+    ]
     
     return {
         "provider": "tavily",
@@ -1558,28 +1757,33 @@ def search_exa(
     similar_url: Optional[str] = None,
     include_domains: Optional[List[str]] = None,
     exclude_domains: Optional[List[str]] = None,
+    include_contents: bool = True,
+    max_characters: int = 1000,
+    base_url: str = "https://api.exa.ai",
+    timeout: int = 30,
 ) -> dict:
-    """Search using Exa (Neural/Semantic Search)."""
+    """Search using Exa (Neural/Semantic Search).
+
+    include_contents=False skips page text and highlights entirely (results
+    then carry no snippet), which makes title/URL-only lookups much faster.
+    """
     if similar_url:
-        endpoint = "https://api.exa.ai/findSimilar"
+        endpoint = f"{base_url.rstrip('/')}/findSimilar"
         body = {
             "url": similar_url,
             "numResults": max_results,
-            "contents": {
-                "text": {"maxCharacters": 1000},
-                "highlights": True,
-            },
         }
     else:
-        endpoint = "https://api.exa.ai/search"
+        endpoint = f"{base_url.rstrip('/')}/search"
         body = {
             "query": query,
             "numResults": max_results,
             "type": search_type,
-            "contents": {
-                "text": {"maxCharacters": 1000},
-                "highlights": True,
-            },
+        }
+    if include_contents:
+        body["contents"] = {
+            "text": {"maxCharacters": max_characters},
+            "highlights": True,
         }
     
     if category:
@@ -1598,23 +1802,11 @@ def search_exa(
         "Content-Type": "application/json",
     }
     
-    data = make_request(endpoint, headers, body)
+    data = make_request(endpoint, headers, body, timeout=timeout)
     
-    results = []
-    for item in data.get("results", [])[:max_results]:
-        highlights = item.get("highlights", [])
-        snippet = highlights[0] if highlights else (item.get("text", "") or "")[:500]
+    results = [SearchResult.from_exa(item) for item in data.get("results", [])[:max_results]]
         
-        results.append({
-            "title": item.get("title", ""),
-            "url": item.get("url", ""),
-            "snippet": snippet,
-            "score": round(item.get("score", 0.0), 3),
-            "published_date": item.get("publishedDate"),
-            "author": item.get("author"),
-        })
-    
-    answer = results[0]["snippet"] if results else ""
+    answer = results[0].snippet if results else ""
     
     return {
         "provider": "exa",
@@ -1636,6 +1828,7 @@ def search_perplexity(
     model: str = "perplexity/sonar-pro",
     api_url: str = "https://api.kilo.ai/api/gateway/chat/completions",
     freshness: Optional[str] = None,
+    timeout: int = 30,
 ) -> dict:
     """Search/answer using Perplexity Sonar Pro via Kilo Gateway.
 
@@ -1668,7 +1861,7 @@ def search_perplexity(
         "Content-Type": "application/json",
     }
 
-    data = make_request(api_url, headers, body)
+    data = make_request(api_url, headers, body, timeout=timeout)
     choices = data.get("choices", [])
     message = choices[0].get("message", {}) if choices else {}
     answer = (message.get("content") or "").strip()
@@ -1687,21 +1880,21 @@ def search_perplexity(
     if answer:
         # Clean citation markers [1][2] for the snippet
         clean_answer = re.sub(r'\[\d+\]', '', answer).strip()
-        results.append({
-            "title": f"Perplexity Answer: {query[:80]}",
-            "url": "https://www.perplexity.ai",
-            "snippet": clean_answer[:500],
-            "score": 1.0,
-        })
+        results.append(SearchResult(
+            title=f"Perplexity Answer: {query[:80]}",
+            url="https://www.perplexity.ai",
+            snippet=clean_answer[:500],
+            score=1.0,
+        ))
 
     # Additional results: extracted source URLs
     for i, u in enumerate(unique_urls[:max_results - 1]):
-        results.append({
-            "title": f"Source {i+1}",
-            "url": u,
-            "snippet": "Referenced source from Perplexity answer",
-            "score": round(0.9 - i * 0.1, 3),
-        })
+        results.append(SearchResult(
+            title=f"Source {i+1}",
+            url=u,
+            snippet="Referenced source from Perplexity answer",
+            score=round(0.9 - i * 0.1, 3),
+        ))
 
     return {
         "provider": "perplexity",
@@ -1731,6 +1924,8 @@ def search_you(
     safesearch: str = "moderate",
     include_news: bool = True,
     livecrawl: Optional[str] = None,
+    base_url: str = "https://ydc-index.io",
+    timeout: int = 30,
 ) -> dict:
     """Search using You.com (LLM-Ready Web & News Search).
     
@@ -1751,7 +1946,7 @@ def search_you(
         include_news: Include news results when relevant (default True)
         livecrawl: Fetch full page content: "web", "news", or "all"
     """
-    endpoint = "https://ydc-index.io/v1/search"
+    endpoint = f"{base_url.rstrip('/')}/v1/search"
     
     # Build query parameters
     params = {
@@ -1785,7 +1980,7 @@ def search_you(
     req = Request(url, headers=headers, method="GET")
     
     try:
-        with urlopen(req, timeout=30) as response:
+        with urlopen(req, timeout=timeout) as response:
             data = json.loads(response.read().decode("utf-8"))
     except HTTPError as e:
         error_body = e.read().decode("utf-8") if e.fp else str(e)
@@ -1809,7 +2004,7 @@ def search_you(
         is_timeout = "timed out" in reason.lower()
         raise ProviderRequestError(f"Network error: {reason}. Check your internet connection.", transient=is_timeout)
     except TimeoutError:
-        raise ProviderRequestError("You.com request timed out after 30s.", transient=True)
+        raise ProviderRequestError(f"You.com request timed out after {timeout}s.", transient=True)
     
     # Parse results
     results_data = data.get("results", {})
@@ -1818,47 +2013,10 @@ def search_you(
     metadata = data.get("metadata", {})
     
     # Normalize web results
-    results = []
-    for i, item in enumerate(web_results[:max_results]):
-        snippets = item.get("snippets", [])
-        snippet = snippets[0] if snippets else item.get("description", "")
-        
-        result = {
-            "title": item.get("title", ""),
-            "url": item.get("url", ""),
-            "snippet": snippet,
-            "score": round(1.0 - i * 0.05, 3),  # Assign descending score
-            "date": item.get("page_age"),
-            "source": "web",
-        }
-        
-        # Include additional snippets if available (great for RAG)
-        if len(snippets) > 1:
-            result["additional_snippets"] = snippets[1:3]
-        
-        # Include thumbnail and favicon for UI display
-        if item.get("thumbnail_url"):
-            result["thumbnail"] = item["thumbnail_url"]
-        if item.get("favicon_url"):
-            result["favicon"] = item["favicon_url"]
-        
-        # Include live-crawled content if available
-        if item.get("contents"):
-            result["raw_content"] = item["contents"].get("markdown") or item["contents"].get("html", "")
-        
-        results.append(result)
+    results = [SearchResult.from_you_web(item, i) for i, item in enumerate(web_results[:max_results])]
     
     # Add news results (if any)
-    news = []
-    for item in news_results[:5]:
-        news.append({
-            "title": item.get("title", ""),
-            "url": item.get("url", ""),
-            "snippet": item.get("description", ""),
-            "date": item.get("page_age"),
-            "thumbnail": item.get("thumbnail_url"),
-            "source": "news",
-        })
+    news = [SearchResult.from_you_news(item) for item in news_results[:5]]
     
     # Build answer from best snippets
     answer = ""
@@ -1866,8 +2024,8 @@ def search_you(
         # Combine top snippets for LLM context
         top_snippets = []
         for r in results[:3]:
-            if r.get("snippet"):
-                top_snippets.append(r["snippet"])
+            if r.snippet:
+                top_snippets.append(r.snippet)
         answer = " ".join(top_snippets)[:1000]
     
     return {
@@ -1888,6 +2046,65 @@ def search_you(
 # SearXNG (Privacy-First Meta-Search)
 # =============================================================================
 
+SEARXNG_PAGE_SIZE = 10   # typical results per SearXNG page, used to plan pagination
+SEARXNG_MAX_PAGES = 10
+
+
+def _searxng_page(base_url: str, params: Dict[str, str], pageno: int, timeout: int) -> Dict[str, Any]:
+    """Fetch one page of SearXNG JSON results."""
+    page_params = dict(params, pageno=str(pageno)) if pageno > 1 else params
+    query_string = "&".join(f"{k}={quote(str(v))}" for k, v in page_params.items())
+    url = f"{base_url}/search?{query_string}"
+    
+    headers = {
+        "User-Agent": "ClawdBot-WebSearchPlus/2.5",
+        "Accept": "application/json",
+    }
+    
+    # Make GET request
+    req = Request(url, headers=headers, method="GET")
+    
+    try:
+        with urlopen(req, timeout=timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+    except HTTPError as e:
+        error_body = e.read().decode("utf-8") if e.fp else str(e)
+        try:
+            error_json = json.loads(error_body)
+            error_detail = error_json.get("error") or error_json.get("message") or error_body
+        except json.JSONDecodeError:
+            error_detail = error_body[:500]
+        
+        error_messages = {
+            403: "JSON API disabled on this SearXNG instance. Enable 'json' in search.formats in settings.yml",
+            404: "SearXNG instance not found. Check your instance URL.",
+            500: "SearXNG server error. Check instance health.",
+            503: "SearXNG service unavailable."
+        }
+        friendly_msg = error_messages.get(e.code, f"SearXNG error: {error_detail}")
+        raise ProviderRequestError(f"{friendly_msg} (HTTP {e.code})", status_code=e.code, transient=e.code in TRANSIENT_HTTP_CODES)
+    except URLError as e:
+        reason = str(getattr(e, "reason", e))
+        is_timeout = "timed out" in reason.lower()
+        raise ProviderRequestError(f"Cannot reach SearXNG instance at {base_url}. Error: {reason}", transient=is_timeout)
+    except TimeoutError:
+        raise ProviderRequestError(f"SearXNG request timed out after {timeout}s. Check instance health.", transient=True)
+
+
+def _merge_searxng_pages(pages: Dict[int, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Concatenate raw results in page order, dropping URLs already seen on an earlier page."""
+    seen = set()
+    merged = []
+    for pageno in sorted(pages):
+        for item in pages[pageno].get("results", []):
+            key = (item.get("url") or "").rstrip("/")
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(item)
+    return merged
+
+
 def search_searxng(
     query: str,
     instance_url: str,
@@ -1897,6 +2114,7 @@ def search_searxng(
     language: str = "en",
     time_range: Optional[str] = None,
     safesearch: int = 0,
+    timeout: int = 30,
 ) -> dict:
     """Search using SearXNG (self-hosted privacy-first meta-search).
     
@@ -1938,62 +2156,38 @@ def search_searxng(
     # Build URL — instance_url comes from operator-controlled config/env only
     # (validated by _validate_searxng_url), not from agent/LLM input
     base_url = instance_url.rstrip("/")
-    query_string = "&".join(f"{k}={quote(str(v))}" for k, v in params.items())
-    url = f"{base_url}/search?{query_string}"
-    
-    headers = {
-        "User-Agent": "ClawdBot-WebSearchPlus/2.5",
-        "Accept": "application/json",
-    }
     
-    # Make GET request
-    req = Request(url, headers=headers, method="GET")
-    
-    try:
-        with urlopen(req, timeout=30) as response:
-            data = json.loads(response.read().decode("utf-8"))
-    except HTTPError as e:
-        error_body = e.read().decode("utf-8") if e.fp else str(e)
+    # Results beyond one page come from further pageno requests, fetched concurrently
+    planned_pages = min(SEARXNG_MAX_PAGES, max(1, math.ceil(max_results / SEARXNG_PAGE_SIZE)))
+    pages: Dict[int, Dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=planned_pages) as pool:
+        futures = {pool.submit(_searxng_page, base_url, params, pageno, timeout): pageno
+                   for pageno in range(1, planned_pages + 1)}
+        for future in as_completed(futures):
+            pageno = futures[future]
+            try:
+                pages[pageno] = future.result()
+            except ProviderRequestError:
+                if pageno == 1:
+                    raise
+                # A later page failing only shortens the result list
+    
+    data = pages[1]
+    raw_results = _merge_searxng_pages(pages)
+    next_page = planned_pages + 1
+    # Pages came back shorter than planned (or overlapped): keep paging while the last one had results
+    while (len(raw_results) < max_results and next_page <= SEARXNG_MAX_PAGES
+           and pages.get(next_page - 1, {}).get("results")):
         try:
-            error_json = json.loads(error_body)
-            error_detail = error_json.get("error") or error_json.get("message") or error_body
-        except json.JSONDecodeError:
-            error_detail = error_body[:500]
-        
-        error_messages = {
-            403: "JSON API disabled on this SearXNG instance. Enable 'json' in search.formats in settings.yml",
-            404: "SearXNG instance not found. Check your instance URL.",
-            500: "SearXNG server error. Check instance health.",
-            503: "SearXNG service unavailable."
-        }
-        friendly_msg = error_messages.get(e.code, f"SearXNG error: {error_detail}")
-        raise ProviderRequestError(f"{friendly_msg} (HTTP {e.code})", status_code=e.code, transient=e.code in TRANSIENT_HTTP_CODES)
-    except URLError as e:
-        reason = str(getattr(e, "reason", e))
-        is_timeout = "timed out" in reason.lower()
-        raise ProviderRequestError(f"Cannot reach SearXNG instance at {instance_url}. Error: {reason}", transient=is_timeout)
-    except TimeoutError:
-        raise ProviderRequestError(f"SearXNG request timed out after 30s. Check instance health.", transient=True)
-    
-    # Parse results
-    raw_results = data.get("results", [])
+            pages[next_page] = _searxng_page(base_url, params, next_page, timeout)
+        except ProviderRequestError:
+            break
+        raw_results = _merge_searxng_pages(pages)
+        next_page += 1
     
     # Normalize results to unified format
-    results = []
-    engines_used = set()
-    for i, item in enumerate(raw_results[:max_results]):
-        engine = item.get("engine", "unknown")
-        engines_used.add(engine)
-        
-        results.append({
-            "title": item.get("title", ""),
-            "url": item.get("url", ""),
-            "snippet": item.get("content", ""),
-            "score": round(item.get("score", 1.0 - i * 0.05), 3),
-            "engine": engine,
-            "category": item.get("category", "general"),
-            "date": item.get("publishedDate"),
-        })
+    results = [SearchResult.from_searxng(item, i) for i, item in enumerate(raw_results[:max_results])]
+    engines_used = {r.engine for r in results}
     
     # Build answer from answers, infoboxes, or first result
     answer = ""
@@ -2003,7 +2197,7 @@ def search_searxng(
         infobox = data["infoboxes"][0]
         answer = infobox.get("content", "") or infobox.get("infobox", "")
     elif results:
-        answer = results[0]["snippet"]
+        answer = results[0].snippet
     
     return {
         "provider": "searxng",
@@ -2017,236 +2211,167 @@ def search_searxng(
             "number_of_results": data.get("number_of_results"),
             "engines_used": list(engines_used),
             "instance_url": instance_url,
+            "pages_fetched": len(pages),
         }
     }
 
 
 # =============================================================================
-# CLI
+# Search Execution
 # =============================================================================
 
-def main():
-    config = load_config()
-    
-    parser = argparse.ArgumentParser(
-        description="Web Search Plus — Intelligent multi-provider search with smart auto-routing",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Intelligent Auto-Routing:
-  The query is analyzed using multi-signal detection to find the optimal provider:
-  
-  Shopping Intent → Serper (Google)
-    "how much", "price of", "buy", product+brand combos, deals, specs
-  
-  Research Intent → Tavily  
-    "how does", "explain", "what is", analysis, pros/cons, tutorials
-  
-  Discovery Intent → Exa (Neural)
-    "similar to", "companies like", "alternatives", URLs, startups, papers
+def _wants_field(args: argparse.Namespace, name: str) -> bool:
+    """True unless --fields was given and doesn't include `name`."""
+    return not args.fields or name in args.fields
 
-  Direct Answer Intent → Perplexity (via Kilo Gateway)
-    "what is", "current status", local events, synthesized up-to-date answers
 
-Examples:
-  python3 search.py -q "iPhone 16 Pro Max price"          # → Serper (shopping)
-  python3 search.py -q "how does HTTPS encryption work"   # → Tavily (research)
-  python3 search.py -q "startups similar to Notion"       # → Exa (discovery)
-  python3 search.py --explain-routing -q "your query"     # Debug routing
+def execute_search(prov: str, args: argparse.Namespace, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Execute a search against a single provider using parsed CLI arguments.
 
-Full docs: See README.md and SKILL.md
-        """,
-    )
-    
-    # Common arguments
-    parser.add_argument(
-        "--provider", "-p", 
-        choices=["serper", "tavily", "exa", "perplexity", "you", "searxng", "auto"],
-        help="Search provider (auto=intelligent routing)"
-    )
-    parser.add_argument(
-        "--query", "-q", 
-        help="Search query"
-    )
-    parser.add_argument(
-        "--max-results", "-n", 
-        type=int, 
-        default=config.get("defaults", {}).get("max_results", 5),
-        help="Maximum results (default: 5)"
-    )
-    parser.add_argument(
-        "--images", 
-        action="store_true",
-        help="Include images (Serper/Tavily)"
-    )
-    
-    # Auto-routing options
-    parser.add_argument(
-        "--auto", "-a",
-        action="store_true",
-        help="Use intelligent auto-routing (default when no provider specified)"
-    )
-    parser.add_argument(
-        "--explain-routing",
-        action="store_true",
-        help="Show detailed routing analysis (debug mode)"
-    )
-    
-    # Serper-specific
-    serper_config = config.get("serper", {})
-    parser.add_argument("--country", default=serper_config.get("country", "us"))
-    parser.add_argument("--language", default=serper_config.get("language", "en"))
-    parser.add_argument(
-        "--type", 
-        dest="search_type", 
-        default=serper_config.get("type", "search"),
-        choices=["search", "news", "images", "videos", "places", "shopping"]
-    )
-    parser.add_argument(
-        "--time-range", 
-        choices=["hour", "day", "week", "month", "year"]
-    )
-    
-    # Tavily-specific
-    tavily_config = config.get("tavily", {})
-    parser.add_argument(
-        "--depth", 
-        default=tavily_config.get("depth", "basic"), 
-        choices=["basic", "advanced"]
-    )
-    parser.add_argument(
-        "--topic", 
-        default=tavily_config.get("topic", "general"), 
-        choices=["general", "news"]
-    )
-    parser.add_argument("--raw-content", action="store_true")
-    
-    # Exa-specific
-    exa_config = config.get("exa", {})
-    parser.add_argument(
-        "--exa-type", 
-        default=exa_config.get("type", "neural"), 
-        choices=["neural", "keyword"]
-    )
-    parser.add_argument(
-        "--category",
-        choices=[
-            "company", "research paper", "news", "pdf", "github", 
-            "tweet", "personal site", "linkedin profile"
-        ]
-    )
-    parser.add_argument("--start-date")
-    parser.add_argument("--end-date")
-    parser.add_argument("--similar-url")
-    
-    # You.com-specific
-    you_config = config.get("you", {})
-    parser.add_argument(
-        "--you-safesearch",
-        default=you_config.get("safesearch", "moderate"),
-        choices=["off", "moderate", "strict"],
-        help="You.com SafeSearch filter"
-    )
-    parser.add_argument(
-        "--freshness",
-        choices=["day", "week", "month", "year"],
-        help="Filter results by recency (You.com/Serper)"
-    )
-    parser.add_argument(
-        "--livecrawl",
-        choices=["web", "news", "all"],
-        help="You.com: fetch full page content"
-    )
-    parser.add_argument(
-        "--include-news",
-        action="store_true",
-        default=True,
-        help="You.com: include news results (default: true)"
-    )
-    
-    # SearXNG-specific
-    searxng_config = config.get("searxng", {})
-    parser.add_argument(
-        "--searxng-url",
-        default=searxng_config.get("instance_url"),
-        help="SearXNG instance URL (e.g., https://searx.example.com)"
-    )
-    parser.add_argument(
-        "--searxng-safesearch",
-        type=int,
-        default=searxng_config.get("safesearch", 0),
-        choices=[0, 1, 2],
-        help="SearXNG SafeSearch: 0=off, 1=moderate, 2=strict"
-    )
-    parser.add_argument(
-        "--engines",
-        nargs="+",
-        default=searxng_config.get("engines"),
-        help="SearXNG: specific engines to use (e.g., google bing duckduckgo)"
-    )
-    parser.add_argument(
-        "--categories",
-        nargs="+",
-        help="SearXNG: search categories (general, images, news, videos, etc.)"
-    )
-    
-    # Domain filters
-    parser.add_argument("--include-domains", nargs="+")
-    parser.add_argument("--exclude-domains", nargs="+")
-    
-    # Output
-    parser.add_argument("--compact", action="store_true")
-    
-    # Caching options
-    parser.add_argument(
-        "--cache-ttl",
-        type=int,
-        default=DEFAULT_CACHE_TTL,
-        help=f"Cache TTL in seconds (default: {DEFAULT_CACHE_TTL} = 1 hour)"
-    )
-    parser.add_argument(
-        "--no-cache",
-        action="store_true",
-        help="Bypass cache (always fetch fresh results)"
-    )
-    parser.add_argument(
-        "--clear-cache",
-        action="store_true",
-        help="Clear all cached results and exit"
-    )
-    parser.add_argument(
-        "--cache-stats",
-        action="store_true",
-        help="Show cache statistics and exit"
-    )
-    
-    args = parser.parse_args()
-    
-    # Handle cache management commands first (before query validation)
-    if args.clear_cache:
-        result = cache_clear()
-        indent = None if args.compact else 2
-        print(json.dumps(result, indent=indent, ensure_ascii=False))
-        return
-    
-    if args.cache_stats:
-        result = cache_stats()
-        indent = None if args.compact else 2
-        print(json.dumps(result, indent=indent, ensure_ascii=False))
-        return
-    
-    if not args.query and not args.similar_url:
-        parser.error("--query is required (unless using --similar-url with Exa)")
-    
-    # Handle --explain-routing
-    if args.explain_routing:
-        if not args.query:
-            parser.error("--query is required for --explain-routing")
-        explanation = explain_routing(args.query, config)
-        indent = None if args.compact else 2
-        print(json.dumps(explanation, indent=indent, ensure_ascii=False))
-        return
-    
-    # Determine provider
+    Optional payload (Tavily answer/raw content, Exa contents, You.com
+    livecrawl) is only requested when --fields projects it.
+    """
+    key = validate_api_key(prov, config)
+    # base_url (and timeout) can be overridden per provider, e.g. to point at scripts/mock_server.py
+    provider_config = config.get(prov, {})
+    endpoint_kwargs = {"timeout": provider_config.get("timeout", 30)}
+    if provider_config.get("base_url"):
+        endpoint_kwargs["base_url"] = provider_config["base_url"]
+    if prov == "serper":
+        return search_serper(
+            query=args.query,
+            api_key=key,
+            max_results=args.max_results,
+            country=args.country,
+            language=args.language,
+            search_type=args.search_type,
+            time_range=args.time_range,
+            include_images=args.images,
+            **endpoint_kwargs,
+        )
+    elif prov == "tavily":
+        return search_tavily(
+            query=args.query,
+            api_key=key,
+            max_results=args.max_results,
+            depth=args.depth,
+            topic=args.topic,
+            include_domains=args.include_domains,
+            exclude_domains=args.exclude_domains,
+            include_images=args.images,
+            include_raw_content=args.raw_content and _wants_field(args, "raw_content"),
+            include_answer=_wants_field(args, "answer"),
+            **endpoint_kwargs,
+        )
+    elif prov == "exa":
+        return search_exa(
+            query=args.query or "",
+            api_key=key,
+            max_results=args.max_results,
+            search_type=args.exa_type,
+            category=args.category,
+            start_date=args.start_date,
+            end_date=args.end_date,
+            similar_url=args.similar_url,
+            include_domains=args.include_domains,
+            exclude_domains=args.exclude_domains,
+            include_contents=_wants_field(args, "snippet"),
+            max_characters=args.snippet_chars or 1000,
+            **endpoint_kwargs,
+        )
+    elif prov == "perplexity":
+        # Perplexity already takes a full endpoint URL (api_url)
+        api_url = provider_config.get("api_url", "https://api.kilo.ai/api/gateway/chat/completions")
+        if provider_config.get("base_url"):
+            api_url = f"{provider_config['base_url'].rstrip('/')}/chat/completions"
+        return search_perplexity(
+            query=args.query,
+            api_key=key,
+            max_results=args.max_results,
+            model=provider_config.get("model", "perplexity/sonar-pro"),
+            api_url=api_url,
+            freshness=getattr(args, "freshness", None),
+            timeout=endpoint_kwargs["timeout"],
+        )
+    elif prov == "you":
+        return search_you(
+            query=args.query,
+            api_key=key,
+            max_results=args.max_results,
+            country=args.country,
+            language=args.language,
+            freshness=args.freshness,
+            safesearch=args.you_safesearch,
+            include_news=args.include_news,
+            livecrawl=args.livecrawl if _wants_field(args, "raw_content") else None,
+            **endpoint_kwargs,
+        )
+    elif prov == "searxng":
+        # For SearXNG, 'key' is actually the instance URL
+        instance_url = args.searxng_url or key
+        if instance_url:
+            instance_url = _validate_searxng_url(instance_url)
+        return search_searxng(
+            query=args.query,
+            instance_url=instance_url,
+            max_results=args.max_results,
+            categories=args.categories,
+            engines=args.engines,
+            language=args.language,
+            time_range=args.time_range,
+            safesearch=args.searxng_safesearch,
+            timeout=endpoint_kwargs["timeout"],
+        )
+    else:
+        raise ValueError(f"Unknown provider: {prov}")
+
+
+def execute_with_retry(prov: str, args: argparse.Namespace, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Execute a provider search, retrying transient failures with backoff."""
+    last_error = None
+    for attempt in range(0, 3):
+        try:
+            return execute_search(prov, args, config)
+        except ProviderRequestError as e:
+            last_error = e
+            if e.status_code in {401, 403}:
+                break
+            if not e.transient:
+                break
+            if attempt < 2:
+                time.sleep(RETRY_BACKOFF_SECONDS[attempt])
+                continue
+            break
+        except Exception as e:
+            last_error = e
+            break
+    raise last_error if last_error else Exception("Unknown provider execution error")
+
+
+def build_cache_context(args: argparse.Namespace) -> Dict[str, Any]:
+    """Collect the non-query parameters that make a cached result distinct."""
+    context = {
+        "locale": f"{args.country}:{args.language}",
+        "freshness": args.freshness,
+        "time_range": args.time_range,
+        "topic": args.topic,
+        "search_engines": sorted(args.engines) if args.engines else None,
+        "include_news": bool(args.include_news),
+        "search_type": args.search_type,
+        "exa_type": args.exa_type,
+        "category": args.category,
+        "similar_url": args.similar_url,
+    }
+    # Only present when used, so existing cache keys stay valid
+    if args.fields:
+        context["fields"] = args.fields
+    if args.snippet_chars is not None:
+        context["snippet_chars"] = args.snippet_chars
+    return context
+
+
+def resolve_provider(args: argparse.Namespace, config: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Pick the provider for a search and describe how it was chosen."""
     if args.provider == "auto" or (args.provider is None and not args.similar_url):
         if args.query:
             routing = auto_route_provider(args.query, config)
@@ -2272,7 +2397,28 @@ Full docs: See README.md and SKILL.md
     else:
         provider = args.provider or "serper"
         routing_info = {"auto_routed": False, "provider": provider}
-    
+    return provider, routing_info
+
+
+def run_search(
+    args: argparse.Namespace,
+    config: Dict[str, Any],
+    read_cache: bool = True,
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Run a full search: routing, cache lookup, provider fallback and cache write.
+
+    Args:
+        args: Parsed CLI arguments describing the search
+        config: Loaded configuration
+        read_cache: If False, skip the cache lookup but still store the fresh
+                    result (used by --prefetch to refresh entries)
+
+    Returns:
+        (result, None) on success or (None, error_result) if all providers failed
+    """
+    provider, routing_info = resolve_provider(args, config)
+
     # Build provider fallback list
     auto_config = config.get("auto_routing", {})
     provider_priority = auto_config.get("provider_priority", ["tavily", "exa", "perplexity", "serper"])
@@ -2297,122 +2443,13 @@ Full docs: See README.md and SKILL.md
     if not eligible_providers:
         eligible_providers = providers_to_try[:1]
 
-    # Helper function to execute search for a provider
-    def execute_search(prov: str) -> Dict[str, Any]:
-        key = validate_api_key(prov, config)
-        if prov == "serper":
-            return search_serper(
-                query=args.query,
-                api_key=key,
-                max_results=args.max_results,
-                country=args.country,
-                language=args.language,
-                search_type=args.search_type,
-                time_range=args.time_range,
-                include_images=args.images,
-            )
-        elif prov == "tavily":
-            return search_tavily(
-                query=args.query,
-                api_key=key,
-                max_results=args.max_results,
-                depth=args.depth,
-                topic=args.topic,
-                include_domains=args.include_domains,
-                exclude_domains=args.exclude_domains,
-                include_images=args.images,
-                include_raw_content=args.raw_content,
-            )
-        elif prov == "exa":
-            return search_exa(
-                query=args.query or "",
-                api_key=key,
-                max_results=args.max_results,
-                search_type=args.exa_type,
-                category=args.category,
-                start_date=args.start_date,
-                end_date=args.end_date,
-                similar_url=args.similar_url,
-                include_domains=args.include_domains,
-                exclude_domains=args.exclude_domains,
-            )
-        elif prov == "perplexity":
-            perplexity_config = config.get("perplexity", {})
-            return search_perplexity(
-                query=args.query,
-                api_key=key,
-                max_results=args.max_results,
-                model=perplexity_config.get("model", "perplexity/sonar-pro"),
-                api_url=perplexity_config.get("api_url", "https://api.kilo.ai/api/gateway/chat/completions"),
-                freshness=getattr(args, "freshness", None),
-            )
-        elif prov == "you":
-            return search_you(
-                query=args.query,
-                api_key=key,
-                max_results=args.max_results,
-                country=args.country,
-                language=args.language,
-                freshness=args.freshness,
-                safesearch=args.you_safesearch,
-                include_news=args.include_news,
-                livecrawl=args.livecrawl,
-            )
-        elif prov == "searxng":
-            # For SearXNG, 'key' is actually the instance URL
-            instance_url = args.searxng_url or key
-            if instance_url:
-                instance_url = _validate_searxng_url(instance_url)
-            return search_searxng(
-                query=args.query,
-                instance_url=instance_url,
-                max_results=args.max_results,
-                categories=args.categories,
-                engines=args.engines,
-                language=args.language,
-                time_range=args.time_range,
-                safesearch=args.searxng_safesearch,
-            )
-        else:
-            raise ValueError(f"Unknown provider: {prov}")
-
-    def execute_with_retry(prov: str) -> Dict[str, Any]:
-        last_error = None
-        for attempt in range(0, 3):
-            try:
-                return execute_search(prov)
-            except ProviderRequestError as e:
-                last_error = e
-                if e.status_code in {401, 403}:
-                    break
-                if not e.transient:
-                    break
-                if attempt < 2:
-                    time.sleep(RETRY_BACKOFF_SECONDS[attempt])
-                    continue
-                break
-            except Exception as e:
-                last_error = e
-                break
-        raise last_error if last_error else Exception("Unknown provider execution error")
-
-    cache_context = {
-        "locale": f"{args.country}:{args.language}",
-        "freshness": args.freshness,
-        "time_range": args.time_range,
-        "topic": args.topic,
-        "search_engines": sorted(args.engines) if args.engines else None,
-        "include_news": bool(args.include_news),
-        "search_type": args.search_type,
-        "exa_type": args.exa_type,
-        "category": args.category,
-        "similar_url": args.similar_url,
-    }
+    cache_context = build_cache_context(args)
 
     # Check cache first (unless --no-cache is set)
     cached_result = None
     cache_hit = False
-    if not args.no_cache and args.query:
+    result = None
+    if read_cache and not args.no_cache and args.query:
         cached_result = cache_get(
             query=args.query,
             provider=provider,
@@ -2429,14 +2466,13 @@ Full docs: See README.md and SKILL.md
     errors = []
     successful_provider = None
     successful_results: List[Tuple[str, Dict[str, Any]]] = []
-    result = None if not cache_hit else result
 
     for idx, current_provider in enumerate(eligible_providers):
         if cache_hit:
             successful_provider = provider
             break
         try:
-            provider_result = execute_with_retry(current_provider)
+            provider_result = execute_with_retry(current_provider, args, config)
             reset_provider_health(current_provider)
             successful_results.append((current_provider, provider_result))
             successful_provider = current_provider
@@ -2480,37 +2516,8 @@ Full docs: See README.md and SKILL.md
             primary["metadata"]["providers_merged"] = [p for p, _ in successful_results]
             result = primary
 
-    if result is not None:
-        if successful_provider != provider:
-            routing_info["fallback_used"] = True
-            routing_info["original_provider"] = provider
-            routing_info["provider"] = successful_provider
-            routing_info["fallback_errors"] = errors
-
-        if cooldown_skips:
-            routing_info["cooldown_skips"] = cooldown_skips
-
-        result["routing"] = routing_info
-
-        if not cache_hit and not args.no_cache and args.query:
-            cache_put(
-                query=args.query,
-                provider=successful_provider or provider,
-                max_results=args.max_results,
-                result=result,
-                params=cache_context,
-            )
-
-        result["cached"] = bool(cache_hit)
-        if "deduplicated" not in result:
-            result["deduplicated"] = False
-            result.setdefault("metadata", {})
-            result["metadata"].setdefault("dedup_count", 0)
-
-        indent = None if args.compact else 2
-        print(json.dumps(result, indent=indent, ensure_ascii=False))
-    else:
-        error_result = {
+    if result is None:
+        return None, {
             "error": "All providers failed",
             "provider": provider,
             "query": args.query,
@@ -2518,6 +2525,767 @@ Full docs: See README.md and SKILL.md
             "provider_errors": errors,
             "cooldown_skips": cooldown_skips,
         }
+
+    if successful_provider != provider:
+        routing_info["fallback_used"] = True
+        routing_info["original_provider"] = provider
+        routing_info["provider"] = successful_provider
+        routing_info["fallback_errors"] = errors
+
+    if cooldown_skips:
+        routing_info["cooldown_skips"] = cooldown_skips
+
+    result["routing"] = routing_info
+
+    if not cache_hit and (args.fields or args.snippet_chars is not None):
+        # Project before caching so cache entries are as small as the output
+        if args.fields and not any(f in SearchResult.__slots__ for f in args.fields):
+            # No per-result field selected (e.g. --fields answer): every result would be {}
+            result.pop("results", None)
+            result.pop("news", None)
+        else:
+            result["results"] = project_results(result["results"], args.fields, args.snippet_chars)
+            if result.get("news"):
+                result["news"] = project_results(result["news"], args.fields, args.snippet_chars)
+        if args.fields and "answer" not in args.fields:
+            result.pop("answer", None)
+
+    if not cache_hit and not args.no_cache and args.query:
+        cache_put(
+            query=args.query,
+            provider=successful_provider or provider,
+            max_results=args.max_results,
+            result=result,
+            params=cache_context,
+        )
+
+    result["cached"] = bool(cache_hit)
+    if "deduplicated" not in result:
+        result["deduplicated"] = False
+        result.setdefault("metadata", {})
+        result["metadata"].setdefault("dedup_count", 0)
+
+    return result, None
+
+
+# =============================================================================
+# Cache Warming (Prefetch)
+# =============================================================================
+
+QUERY_HISTORY_MAX_ENTRIES = 500
+DEFAULT_PREFETCH_LEAD = 300  # refresh entries 5 minutes before they expire
+PREFETCH_RETRY_DELAY = 60    # a failed refresh is retried after min(lead, this) seconds
+PREFETCH_MIN_SLEEP = 30
+
+# Flags that control the CLI itself rather than the search; never replayed
+_NON_REPLAYABLE_FLAGS = {
+    "--compact", "--no-cache", "--clear-cache", "--cache-stats", "--explain-routing",
+}
+
+
+def _replayable_argv(argv: List[str]) -> List[str]:
+    return [a for a in argv if a not in _NON_REPLAYABLE_FLAGS]
+
+
+def _load_query_history() -> Dict[str, Any]:
+    if not QUERY_HISTORY_FILE.exists():
+        return {}
+    try:
+        with open(QUERY_HISTORY_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+            return data if isinstance(data, dict) else {}
+    except (json.JSONDecodeError, IOError):
+        return {}
+
+
+def record_query_history(argv: List[str], query: str, cache_hit: bool) -> None:
+    """
+    Remember a search invocation so --prefetch can learn recurring queries.
+
+    Entries are keyed by the replayable argv, so the exact same search
+    (provider, locale, filters) can be re-run later to warm the cache.
+    """
+    replay = _replayable_argv(argv)
+    key = hashlib.sha256(json.dumps(replay, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+    history = _load_query_history()
+    entry = history.get(key, {"argv": replay, "query": query, "requests": 0, "cache_hits": 0})
+    entry["requests"] = int(entry.get("requests", 0)) + 1
+    entry["cache_hits"] = int(entry.get("cache_hits", 0)) + (1 if cache_hit else 0)
+    entry["last_request"] = int(time.time())
+    history[key] = entry
+
+    if len(history) > QUERY_HISTORY_MAX_ENTRIES:
+        # Evict the least recently requested entries
+        ordered = sorted(history.items(), key=lambda kv: kv[1].get("last_request", 0), reverse=True)
+        history = dict(ordered[:QUERY_HISTORY_MAX_ENTRIES])
+
+    try:
+        _ensure_cache_dir()
+        with open(QUERY_HISTORY_FILE, "w", encoding="utf-8") as f:
+            json.dump(history, f, ensure_ascii=False, separators=(",", ":"))
+    except IOError as e:
+        print(json.dumps({"history_write_error": str(e)}), file=sys.stderr)
+
+
+def hot_queries(limit: int = 20, min_requests: int = 2) -> List[List[str]]:
+    """Return replayable argv lists for the most frequently requested searches."""
+    history = _load_query_history()
+    hot = [e for e in history.values() if int(e.get("requests", 0)) >= min_requests and e.get("argv")]
+    hot.sort(key=lambda e: (e.get("requests", 0), e.get("last_request", 0)), reverse=True)
+    return [e["argv"] for e in hot[:limit]]
+
+
+def read_prefetch_file(path: str) -> List[List[str]]:
+    """
+    Read a prefetch query list.
+
+    Each non-empty, non-comment line is either a plain query
+    ("AI startups news") or a full set of search options
+    (-q "AI startups news" -p serper --time-range day).
+    """
+    argvs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            argvs.append(shlex.split(line) if line.startswith("-") else ["-q", line])
+    return argvs
+
+
+def cache_entry_age(query: str, provider: str, max_results: int, params: Optional[Dict[str, Any]] = None) -> Optional[float]:
+    """Return the age in seconds of a cache entry, or None if it doesn't exist."""
+    cache_path = _get_cache_path(_get_cache_key(query, provider, max_results, params))
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        return time.time() - cached.get("_cache_timestamp", 0)
+    except (FileNotFoundError, json.JSONDecodeError, IOError):
+        return None
+
+
+def prefetch(
+    jobs: List[argparse.Namespace],
+    config: Dict[str, Any],
+    lead: int = DEFAULT_PREFETCH_LEAD,
+    concurrency: int = 4,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    Refresh cache entries that are missing or within `lead` seconds of expiry.
+
+    Args:
+        jobs: Parsed search arguments, one per query to keep warm
+        config: Loaded configuration
+        lead: Refresh entries this many seconds before their TTL runs out
+        concurrency: Maximum number of searches in flight at once
+        force: Refresh every job regardless of cache age
+
+    Returns:
+        Summary with per-query status and seconds until the next refresh is due
+    """
+    started = time.time()
+    entries = []
+    due = []
+    next_due = None
+
+    for job in jobs:
+        provider, _ = resolve_provider(job, config)
+        age = cache_entry_age(job.query, provider, job.max_results, build_cache_context(job))
+        refresh_in = None if age is None else job.cache_ttl - lead - age
+        if force or refresh_in is None or refresh_in <= 0:
+            due.append((job, provider))
+        else:
+            entries.append({"query": job.query, "provider": provider, "status": "fresh",
+                            "refresh_in_seconds": int(refresh_in)})
+            next_due = refresh_in if next_due is None else min(next_due, refresh_in)
+
+    def refresh(job: argparse.Namespace, provider: str) -> Dict[str, Any]:
+        t0 = time.time()
+        try:
+            result, error_result = run_search(job, config, read_cache=False)
+        except SystemExit:
+            # validate_api_key exits on missing keys; report instead of dying
+            result, error_result = None, {"error": f"Missing or invalid credentials for {provider}"}
+        entry = {"query": job.query, "provider": provider, "elapsed_ms": int((time.time() - t0) * 1000)}
+        if result is not None:
+            entry["status"] = "refreshed"
+            entry["results"] = len(result.get("results", []))
+        else:
+            entry["status"] = "failed"
+            entry["error"] = error_result.get("error")
+        return entry
+
+    if due:
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(due)))) as pool:
+            futures = {pool.submit(refresh, job, provider): job for job, provider in due}
+            for future in as_completed(futures):
+                entry = future.result()
+                entries.append(entry)
+                if entry["status"] == "refreshed":
+                    # A freshly written entry comes due again one TTL (minus lead) from now
+                    refresh_in = max(0, futures[future].cache_ttl - lead)
+                else:
+                    # Retry soon: a transient outage must not leave the query cold for a TTL
+                    refresh_in = min(lead, PREFETCH_RETRY_DELAY)
+                    entry["retry_in_seconds"] = refresh_in
+                next_due = refresh_in if next_due is None else min(next_due, refresh_in)
+
+    counts = {"refreshed": 0, "fresh": 0, "failed": 0}
+    for entry in entries:
+        counts[entry["status"]] += 1
+
+    return {
+        "prefetch": True,
+        "queries": len(jobs),
+        **counts,
+        "elapsed_ms": int((time.time() - started) * 1000),
+        "next_due_seconds": int(next_due) if next_due is not None else None,
+        "entries": entries,
+    }
+
+
+def _build_prefetch_jobs(parser: argparse.ArgumentParser, args: argparse.Namespace) -> List[argparse.Namespace]:
+    """Collect prefetch jobs from --prefetch-file and/or learned query history."""
+    argvs: List[List[str]] = []
+    if args.prefetch_file:
+        argvs.extend(read_prefetch_file(args.prefetch_file))
+    if args.prefetch_learn or not args.prefetch_file:
+        argvs.extend(hot_queries(args.prefetch_top, args.prefetch_min_requests))
+
+    jobs = []
+    seen = set()
+    for argv in argvs:
+        key = tuple(argv)
+        if key in seen:
+            continue
+        seen.add(key)
+        try:
+            job = parser.parse_args(argv)
+        except SystemExit:
+            print(json.dumps({"prefetch_skipped": argv, "reason": "invalid arguments"}), file=sys.stderr)
+            continue
+        if not job.query or job.no_cache or job.prefetch:
+            continue
+        jobs.append(job)
+    return jobs
+
+
+def run_prefetch(parser: argparse.ArgumentParser, args: argparse.Namespace, config: Dict[str, Any]) -> None:
+    """Run one prefetch pass, or keep running when --prefetch-interval is set."""
+    indent = None if args.compact or args.prefetch_interval else 2
+    while True:
+        jobs = _build_prefetch_jobs(parser, args)
+        summary = prefetch(jobs, config, lead=args.prefetch_lead, concurrency=args.prefetch_concurrency)
+        print(json.dumps(summary, indent=indent, ensure_ascii=False), flush=True)
+        if not args.prefetch_interval:
+            return
+        next_due = summary["next_due_seconds"]
+        sleep_for = args.prefetch_interval if next_due is None else min(next_due, args.prefetch_interval)
+        try:
+            time.sleep(max(PREFETCH_MIN_SLEEP, sleep_for))
+        except KeyboardInterrupt:
+            return
+
+
+# =============================================================================
+# Query Log & Analytics
+# =============================================================================
+
+QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024  # rotate to query_log.jsonl.1 beyond 10 MB
+
+
+def query_hash(query: str) -> str:
+    """Short stable hash identifying a query without storing its text."""
+    return hashlib.sha256(query.strip().lower().encode("utf-8")).hexdigest()[:12]
+
+
+def append_query_log(
+    query: str,
+    result: Optional[Dict[str, Any]],
+    routing_info: Dict[str, Any],
+    latency_ms: int,
+) -> None:
+    """
+    Append one compact line describing a search to the query log.
+
+    A single small append per call; failures are ignored so logging can
+    never break a search. Disable with WSP_QUERY_LOG=0.
+    """
+    if os.environ.get("WSP_QUERY_LOG", "1") == "0":
+        return
+    entry = {
+        "ts": int(time.time()),
+        "qh": query_hash(query),
+        "p": routing_info.get("original_provider") or routing_info.get("provider"),
+        "sp": routing_info.get("provider"),
+        "auto": bool(routing_info.get("auto_routed")),
+        "conf": routing_info.get("confidence"),
+        "hit": bool(result and result.get("cached")),
+        "ms": latency_ms,
+        "n": len(result.get("results", [])) if result else 0,
+        "fb": bool(routing_info.get("fallback_used")),
+    }
+    if result is None:
+        entry["err"] = True
+    try:
+        _ensure_cache_dir()
+        if QUERY_LOG_FILE.exists() and QUERY_LOG_FILE.stat().st_size > QUERY_LOG_MAX_BYTES:
+            QUERY_LOG_FILE.replace(QUERY_LOG_FILE.with_name(QUERY_LOG_FILE.name + ".1"))
+        with open(QUERY_LOG_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+    except OSError:
+        pass
+
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _latency_summary(values: List[int]) -> Dict[str, Any]:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "p50_ms": _percentile(values, 50),
+        "p90_ms": _percentile(values, 90),
+        "p99_ms": _percentile(values, 99),
+        "mean_ms": round(sum(values) / len(values), 1) if values else None,
+    }
+
+
+def analyze_query_log(since_hours: Optional[float] = None, top: int = 10) -> Dict[str, Any]:
+    """
+    Aggregate the query log for cache sizing and routing tuning.
+
+    Args:
+        since_hours: Only include searches from the last N hours
+        top: Number of most repeated queries to report
+
+    Returns:
+        Dict with hit rate, per-provider latency percentiles, routing
+        distribution and the most repeated queries
+    """
+    if not QUERY_LOG_FILE.exists():
+        return {"entries": 0, "log_file": str(QUERY_LOG_FILE), "message": "No query log yet"}
+
+    cutoff = time.time() - since_hours * 3600 if since_hours else 0
+    entries = []
+    with open(QUERY_LOG_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if entry.get("ts", 0) >= cutoff:
+                entries.append(entry)
+
+    if not entries:
+        return {"entries": 0, "log_file": str(QUERY_LOG_FILE), "message": "No entries in window"}
+
+    total = len(entries)
+    hits = sum(1 for e in entries if e.get("hit"))
+    errors = sum(1 for e in entries if e.get("err"))
+    fallbacks = sum(1 for e in entries if e.get("fb"))
+
+    # Latency of real provider calls, per provider that actually served them
+    provider_latency: Dict[str, List[int]] = {}
+    hit_latency = []
+    for e in entries:
+        if e.get("hit"):
+            hit_latency.append(e.get("ms", 0))
+        elif not e.get("err"):
+            provider_latency.setdefault(e.get("sp") or "unknown", []).append(e.get("ms", 0))
+
+    # Routing distribution over auto-routed searches
+    routing: Dict[str, Dict[str, Any]] = {}
+    for e in entries:
+        if not e.get("auto"):
+            continue
+        bucket = routing.setdefault(e.get("p") or "unknown", {"count": 0, "low_confidence": 0, "_conf": []})
+        bucket["count"] += 1
+        if e.get("conf") is not None:
+            bucket["_conf"].append(e["conf"])
+            if e["conf"] < 0.4:
+                bucket["low_confidence"] += 1
+    auto_total = sum(b["count"] for b in routing.values()) or 1
+    for bucket in routing.values():
+        conf = bucket.pop("_conf")
+        bucket["share"] = round(bucket["count"] / auto_total, 3)
+        bucket["avg_confidence"] = round(sum(conf) / len(conf), 3) if conf else None
+
+    # Repeated queries; resolve text from the prefetch history where known
+    counts: Dict[str, Dict[str, int]] = {}
+    for e in entries:
+        c = counts.setdefault(e.get("qh", "?"), {"count": 0, "hits": 0})
+        c["count"] += 1
+        c["hits"] += 1 if e.get("hit") else 0
+    known = {query_hash(h["query"]): h["query"] for h in _load_query_history().values() if h.get("query")}
+    top_queries = [
+        {"query_hash": qh, "query": known.get(qh), **c}
+        for qh, c in sorted(counts.items(), key=lambda kv: kv[1]["count"], reverse=True)[:top]
+        if c["count"] > 1
+    ]
+
+    return {
+        "entries": total,
+        "window": {
+            "from": min(e.get("ts", 0) for e in entries),
+            "to": max(e.get("ts", 0) for e in entries),
+        },
+        "cache": {
+            "hit_rate": round(hits / total, 3),
+            "hits": hits,
+            "unique_queries": len(counts),
+            # Upper bound if every repeat were served from cache
+            "repeat_rate": round((total - len(counts)) / total, 3),
+            "hit_latency": _latency_summary(hit_latency),
+        },
+        "provider_latency": {p: _latency_summary(v) for p, v in sorted(provider_latency.items())},
+        "routing": dict(sorted(routing.items(), key=lambda kv: kv[1]["count"], reverse=True)),
+        "fallback_rate": round(fallbacks / total, 3),
+        "error_rate": round(errors / total, 3),
+        "top_queries": top_queries,
+        "log_file": str(QUERY_LOG_FILE),
+    }
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def build_parser(config: Dict[str, Any]) -> argparse.ArgumentParser:
+    """Build the CLI argument parser with config-driven defaults."""
+    parser = argparse.ArgumentParser(
+        description="Web Search Plus — Intelligent multi-provider search with smart auto-routing",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Intelligent Auto-Routing:
+  The query is analyzed using multi-signal detection to find the optimal provider:
+  
+  Shopping Intent → Serper (Google)
+    "how much", "price of", "buy", product+brand combos, deals, specs
+  
+  Research Intent → Tavily  
+    "how does", "explain", "what is", analysis, pros/cons, tutorials
+  
+  Discovery Intent → Exa (Neural)
+    "similar to", "companies like", "alternatives", URLs, startups, papers
+
+  Direct Answer Intent → Perplexity (via Kilo Gateway)
+    "what is", "current status", local events, synthesized up-to-date answers
+
+Examples:
+  python3 search.py -q "iPhone 16 Pro Max price"          # → Serper (shopping)
+  python3 search.py -q "how does HTTPS encryption work"   # → Tavily (research)
+  python3 search.py -q "startups similar to Notion"       # → Exa (discovery)
+  python3 search.py --explain-routing -q "your query"     # Debug routing
+  python3 search.py --prefetch --prefetch-file digest.txt # Warm cache before a digest run
+
+Full docs: See README.md and SKILL.md
+        """,
+    )
+    
+    # Common arguments
+    parser.add_argument(
+        "--provider", "-p", 
+        choices=["serper", "tavily", "exa", "perplexity", "you", "searxng", "auto"],
+        help="Search provider (auto=intelligent routing)"
+    )
+    parser.add_argument(
+        "--query", "-q", 
+        help="Search query"
+    )
+    parser.add_argument(
+        "--max-results", "-n", 
+        type=int, 
+        default=config.get("defaults", {}).get("max_results", 5),
+        help="Maximum results (default: 5)"
+    )
+    parser.add_argument(
+        "--images", 
+        action="store_true",
+        help="Include images (Serper/Tavily)"
+    )
+    
+    # Auto-routing options
+    parser.add_argument(
+        "--auto", "-a",
+        action="store_true",
+        help="Use intelligent auto-routing (default when no provider specified)"
+    )
+    parser.add_argument(
+        "--explain-routing",
+        action="store_true",
+        help="Show detailed routing analysis (debug mode)"
+    )
+    
+    # Serper-specific
+    serper_config = config.get("serper", {})
+    parser.add_argument("--country", default=serper_config.get("country", "us"))
+    parser.add_argument("--language", default=serper_config.get("language", "en"))
+    parser.add_argument(
+        "--type", 
+        dest="search_type", 
+        default=serper_config.get("type", "search"),
+        choices=["search", "news", "images", "videos", "places", "shopping"]
+    )
+    parser.add_argument(
+        "--time-range", 
+        choices=["hour", "day", "week", "month", "year"]
+    )
+    
+    # Tavily-specific
+    tavily_config = config.get("tavily", {})
+    parser.add_argument(
+        "--depth", 
+        default=tavily_config.get("depth", "basic"), 
+        choices=["basic", "advanced"]
+    )
+    parser.add_argument(
+        "--topic", 
+        default=tavily_config.get("topic", "general"), 
+        choices=["general", "news"]
+    )
+    parser.add_argument("--raw-content", action="store_true")
+    
+    # Exa-specific
+    exa_config = config.get("exa", {})
+    parser.add_argument(
+        "--exa-type", 
+        default=exa_config.get("type", "neural"), 
+        choices=["neural", "keyword"]
+    )
+    parser.add_argument(
+        "--category",
+        choices=[
+            "company", "research paper", "news", "pdf", "github", 
+            "tweet", "personal site", "linkedin profile"
+        ]
+    )
+    parser.add_argument("--start-date")
+    parser.add_argument("--end-date")
+    parser.add_argument("--similar-url")
+    
+    # You.com-specific
+    you_config = config.get("you", {})
+    parser.add_argument(
+        "--you-safesearch",
+        default=you_config.get("safesearch", "moderate"),
+        choices=["off", "moderate", "strict"],
+        help="You.com SafeSearch filter"
+    )
+    parser.add_argument(
+        "--freshness",
+        choices=["day", "week", "month", "year"],
+        help="Filter results by recency (You.com/Serper)"
+    )
+    parser.add_argument(
+        "--livecrawl",
+        choices=["web", "news", "all"],
+        help="You.com: fetch full page content"
+    )
+    parser.add_argument(
+        "--include-news",
+        action="store_true",
+        default=True,
+        help="You.com: include news results (default: true)"
+    )
+    
+    # SearXNG-specific
+    searxng_config = config.get("searxng", {})
+    parser.add_argument(
+        "--searxng-url",
+        default=searxng_config.get("instance_url"),
+        help="SearXNG instance URL (e.g., https://searx.example.com)"
+    )
+    parser.add_argument(
+        "--searxng-safesearch",
+        type=int,
+        default=searxng_config.get("safesearch", 0),
+        choices=[0, 1, 2],
+        help="SearXNG SafeSearch: 0=off, 1=moderate, 2=strict"
+    )
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        default=searxng_config.get("engines"),
+        help="SearXNG: specific engines to use (e.g., google bing duckduckgo)"
+    )
+    parser.add_argument(
+        "--categories",
+        nargs="+",
+        help="SearXNG: search categories (general, images, news, videos, etc.)"
+    )
+    
+    # Domain filters
+    parser.add_argument("--include-domains", nargs="+")
+    parser.add_argument("--exclude-domains", nargs="+")
+    
+    # Output
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument(
+        "--fields",
+        type=parse_fields,
+        default=config.get("defaults", {}).get("fields"),
+        help="Comma-separated result fields to return, e.g. title,url "
+             "(also limits what providers are asked for; add 'answer' to keep the summary answer)"
+    )
+    parser.add_argument(
+        "--snippet-chars",
+        type=int,
+        default=config.get("defaults", {}).get("snippet_chars"),
+        help="Truncate snippets to N characters (Exa fetches at most N characters)"
+    )
+    
+    # Caching options
+    parser.add_argument(
+        "--cache-ttl",
+        type=int,
+        default=DEFAULT_CACHE_TTL,
+        help=f"Cache TTL in seconds (default: {DEFAULT_CACHE_TTL} = 1 hour)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass cache (always fetch fresh results)"
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Clear all cached results and exit"
+    )
+    parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="Show cache statistics and exit"
+    )
+    
+    # Query log analytics
+    parser.add_argument(
+        "--analyze-log",
+        action="store_true",
+        help="Summarize the query log (hit rate, latency percentiles, routing) and exit"
+    )
+    parser.add_argument(
+        "--log-since",
+        type=float,
+        help="--analyze-log: only include the last N hours"
+    )
+    parser.add_argument(
+        "--log-top",
+        type=int,
+        default=10,
+        help="--analyze-log: number of top repeated queries to show (default: 10)"
+    )
+
+    # Cache warming
+    prefetch_config = config.get("prefetch", {})
+    parser.add_argument(
+        "--prefetch",
+        action="store_true",
+        help="Refresh cached results for recurring queries shortly before they expire, then exit"
+    )
+    parser.add_argument(
+        "--prefetch-file",
+        default=prefetch_config.get("query_file"),
+        help="Prefetch: file with one query (or set of search options) per line"
+    )
+    parser.add_argument(
+        "--prefetch-learn",
+        action="store_true",
+        help="Prefetch: also include hot queries learned from search history (default without --prefetch-file)"
+    )
+    parser.add_argument(
+        "--prefetch-top",
+        type=int,
+        default=prefetch_config.get("top", 20),
+        help="Prefetch: number of learned hot queries to keep warm (default: 20)"
+    )
+    parser.add_argument(
+        "--prefetch-min-requests",
+        type=int,
+        default=prefetch_config.get("min_requests", 2),
+        help="Prefetch: minimum times a query must have been requested to be learned (default: 2)"
+    )
+    parser.add_argument(
+        "--prefetch-lead",
+        type=int,
+        default=prefetch_config.get("lead_seconds", DEFAULT_PREFETCH_LEAD),
+        help=f"Prefetch: refresh entries this many seconds before expiry (default: {DEFAULT_PREFETCH_LEAD})"
+    )
+    parser.add_argument(
+        "--prefetch-concurrency",
+        type=int,
+        default=prefetch_config.get("concurrency", 4),
+        help="Prefetch: maximum parallel provider requests (default: 4)"
+    )
+    parser.add_argument(
+        "--prefetch-interval",
+        type=int,
+        default=None,
+        help="Prefetch: keep running, re-checking at most every N seconds (daemon mode)"
+    )
+
+    return parser
+
+
+def main():
+    config = load_config()
+    parser = build_parser(config)
+    args = parser.parse_args()
+    
+    # Handle cache management commands first (before query validation)
+    if args.clear_cache:
+        result = cache_clear()
+        indent = None if args.compact else 2
+        print(json.dumps(result, indent=indent, ensure_ascii=False))
+        return
+    
+    if args.cache_stats:
+        result = cache_stats()
+        indent = None if args.compact else 2
+        print(json.dumps(result, indent=indent, ensure_ascii=False))
+        return
+    
+    if args.analyze_log:
+        result = analyze_query_log(args.log_since, args.log_top)
+        indent = None if args.compact else 2
+        print(json.dumps(result, indent=indent, ensure_ascii=False))
+        return
+
+    if args.prefetch:
+        run_prefetch(parser, args, config)
+        return
+
+    if not args.query and not args.similar_url:
+        parser.error("--query is required (unless using --similar-url with Exa)")
+    
+    # Handle --explain-routing
+    if args.explain_routing:
+        if not args.query:
+            parser.error("--query is required for --explain-routing")
+        explanation = explain_routing(args.query, config)
+        indent = None if args.compact else 2
+        print(json.dumps(explanation, indent=indent, ensure_ascii=False))
+        return
+    
+    started = time.time()
+    result, error_result = run_search(args, config)
+    if args.query:
+        routing_info = (result or error_result).get("routing", {})
+        append_query_log(args.query, result, routing_info, int((time.time() - started) * 1000))
+
+    if result is not None:
+        if not args.no_cache and args.query:
+            record_query_history(sys.argv[1:], args.query, result["cached"])
+
+        indent = None if args.compact else 2
+        print(json.dumps(result, indent=indent, ensure_ascii=False, default=_json_default))
+    else:
         print(json.dumps(error_result, indent=2), file=sys.stderr)
         sys.exit(1)
 